@@ -28,15 +28,18 @@ class BaremetalCloudMixin(_normalize.Normalizer):
     @property
     def _baremetal_client(self):
         if 'baremetal' not in self._raw_clients:
-            client = self._get_raw_client('baremetal')
-            # Do this to force version discovery. We need to do that, because
-            # the endpoint-override trick we do for neutron because
-            # ironicclient just appends a /v1 won't work and will break
-            # keystoneauth - because ironic's versioned discovery endpoint
-            # is non-compliant and doesn't return an actual version dict.
-            client = self._get_versioned_client(
-                'baremetal', min_version=1, max_version='1.latest')
-            self._raw_clients['baremetal'] = client
+            with self._raw_clients_lock:
+                if 'baremetal' not in self._raw_clients:
+                    client = self._get_raw_client('baremetal')
+                    # Do this to force version discovery. We need to do that,
+                    # because the endpoint-override trick we do for neutron
+                    # because ironicclient just appends a /v1 won't work and
+                    # will break keystoneauth - because ironic's versioned
+                    # discovery endpoint is non-compliant and doesn't return
+                    # an actual version dict.
+                    client = self._get_versioned_client(
+                        'baremetal', min_version=1, max_version='1.latest')
+                    self._raw_clients['baremetal'] = client
         return self._raw_clients['baremetal']
 
     def list_nics(self):
@@ -262,7 +265,10 @@ class BaremetalCloudMixin(_normalize.Normalizer):
                 for count in utils.iterate_timeout(
                         timeout,
                         "Timeout waiting for node transition to "
-                        "available state"):
+                        "available state",
+                        wait=self._resource_poll_interval,
+                        max_wait=_utils._MAX_POLL_INTERVAL,
+                        jitter=_utils._POLL_JITTER):
 
                     machine = self.get_machine(machine['uuid'])
 
@@ -298,7 +304,10 @@ class BaremetalCloudMixin(_normalize.Normalizer):
                     for count in utils.iterate_timeout(
                             lock_timeout,
                             "Timeout waiting for reservation to clear "
-                            "before setting provide state"):
+                            "before setting provide state",
+                            wait=self._resource_poll_interval,
+                            max_wait=_utils._MAX_POLL_INTERVAL,
+                            jitter=_utils._POLL_JITTER):
                         machine = self.get_machine(machine['uuid'])
                         if (machine['reservation'] is None
                                 and machine['provision_state'] != 'enroll'):
@@ -23,12 +23,12 @@ from openstack import proxy
 from openstack import utils
 
 
+_VOLUME_STEADY_STATES = frozenset(('available', 'error', 'in-use'))
+
+
 def _no_pending_volumes(volumes):
     """If there are any volumes not in a steady state, don't cache"""
-    for volume in volumes:
-        if volume['status'] not in ('available', 'error', 'in-use'):
-            return False
-    return True
+    return all(v['status'] in _VOLUME_STEADY_STATES for v in volumes)
 
 
 class BlockStorageCloudMixin(_normalize.Normalizer):
@@ -56,7 +56,7 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
                     # calls and we just have context for the log here
                     self.log.debug(
                         "While listing volumes, could not find next link"
-                        " {link}.".format(link=data))
+                        " %s.", data)
                     raise
 
         if not cache:
@@ -84,8 +84,7 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
         else:
             self.log.debug(
                 "List volumes failed to retrieve all volumes after"
-                " {attempts} attempts. Returning what we found.".format(
-                    attempts=attempts))
+                " %s attempts. Returning what we found.", attempts)
         # list volumes didn't complete succesfully so just return what
         # we found
         return self._normalize_volumes(
@@ -148,6 +147,13 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
 
         return volume
 
+    def _get_volume_for_wait(self, volume_id):
+        """Get a volume by ID, or None once it has been deleted."""
+        try:
+            return self.get_volume_by_id(volume_id)
+        except exc.OpenStackCloudURINotFound:
+            return None
+
     def get_volume_type(self, name_or_id, filters=None):
         """Get a volume type by name or ID.
 
@@ -228,8 +234,11 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
             vol_id = volume['id']
             for count in utils.iterate_timeout(
                     timeout,
-                    "Timeout waiting for the volume to be available."):
-                volume = self.get_volume(vol_id)
+                    "Timeout waiting for the volume to be available.",
+                    wait=self._resource_poll_interval,
+                    max_wait=_utils._MAX_POLL_INTERVAL,
+                    jitter=_utils._POLL_JITTER):
+                volume = self._get_volume_for_wait(vol_id)
 
                 if not volume:
                     continue
@@ -306,7 +315,8 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
         :raises: OpenStackCloudException on operation error.
         """
 
-        self.list_volumes.invalidate(self)
+        # A stale listing is fine here: a volume that is already gone gets
+        # a 404 from the DELETE below, which is handled.
         volume = self.get_volume(name_or_id)
 
         if not volume:
@@ -327,28 +337,30 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
                         'volumes/{id}'.format(id=volume['id'])))
             except exc.OpenStackCloudURINotFound:
                 self.log.debug(
-                    "Volume {id} not found when deleting. Ignoring.".format(
-                        id=volume['id']))
+                    "Volume %s not found when deleting. Ignoring.",
+                    volume['id'])
                 return False
 
         self.list_volumes.invalidate(self)
         if wait:
             for count in utils.iterate_timeout(
                     timeout,
-                    "Timeout waiting for the volume to be deleted."):
+                    "Timeout waiting for the volume to be deleted.",
+                    wait=self._resource_poll_interval,
+                    max_wait=_utils._MAX_POLL_INTERVAL,
+                    jitter=_utils._POLL_JITTER):
 
-                if not self.get_volume(volume['id']):
+                if not self._get_volume_for_wait(volume['id']):
                     break
 
         return True
 
     def get_volumes(self, server, cache=True):
-        volumes = []
-        for volume in self.list_volumes(cache=cache):
-            for attach in volume['attachments']:
-                if attach['server_id'] == server['id']:
-                    volumes.append(volume)
-        return volumes
+        server_id = server['id']
+        return [
+            volume for volume in self.list_volumes(cache=cache)
+            if any(attach['server_id'] == server_id
+                   for attach in volume['attachments'])]
 
     def get_volume_limits(self, name_or_id=None):
         """ Get volume limits for a project
@@ -424,9 +436,12 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
         if wait:
             for count in utils.iterate_timeout(
                     timeout,
-                    "Timeout waiting for volume %s to detach." % volume['id']):
+                    "Timeout waiting for volume %s to detach." % volume['id'],
+                    wait=self._resource_poll_interval,
+                    max_wait=_utils._MAX_POLL_INTERVAL,
+                    jitter=_utils._POLL_JITTER):
                 try:
-                    vol = self.get_volume(volume['id'])
+                    vol = self.get_volume_by_id(volume['id'])
                 except Exception:
                     self.log.debug(
                         "Error getting volume info %s", volume['id'],
@@ -434,6 +449,7 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
                     continue
 
                 if vol['status'] == 'available':
+                    self.list_volumes.invalidate(self)
                     return
 
                 if vol['status'] == 'error':
@@ -491,19 +507,18 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
                                                server_id=server['id']))
 
         if wait:
-            for count in utils.iterate_timeout(
-                    timeout,
-                    "Timeout waiting for volume %s to attach." % volume['id']):
-                try:
-                    self.list_volumes.invalidate(self)
-                    vol = self.get_volume(volume['id'])
-                except Exception:
-                    self.log.debug(
-                        "Error getting volume info %s", volume['id'],
-                        exc_info=True)
-                    continue
-
+            for vol in _utils._poll_tolerating_transient(
+                    lambda: self.get_volume_by_id(volume['id']),
+                    utils.iterate_timeout(
+                        timeout,
+                        "Timeout waiting for volume %s to attach." % (
+                            volume['id']),
+                        wait=self._resource_poll_interval,
+                        max_wait=_utils._MAX_POLL_INTERVAL,
+                        jitter=_utils._POLL_JITTER),
+                    "volume %s" % volume['id']):
                 if self.get_volume_attach_device(vol, server['id']):
+                    self.list_volumes.invalidate(self)
                     break
 
                 # TODO(Shrews) check to see if a volume can be in error status
@@ -520,16 +535,16 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
         name = kwargs.pop('name', kwargs.pop('display_name', None))
         description = kwargs.pop('description',
                                  kwargs.pop('display_description', None))
+        if not (name or description):
+            return kwargs
+        if self.block_storage._version_matches(2):
+            name_key, description_key = 'name', 'description'
+        else:
+            name_key, description_key = 'display_name', 'display_description'
         if name:
-            if self.block_storage._version_matches(2):
-                kwargs['name'] = name
-            else:
-                kwargs['display_name'] = name
+            kwargs[name_key] = name
         if description:
-            if self.block_storage._version_matches(2):
-                kwargs['description'] = description
-            else:
-                kwargs['display_description'] = description
+            kwargs[description_key] = description
         return kwargs
 
     @_utils.valid_kwargs('name', 'display_name',
@@ -570,11 +585,16 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
             snapshot_id = snapshot['id']
             for count in utils.iterate_timeout(
                     timeout,
-                    "Timeout waiting for the volume snapshot to be available."
-            ):
-                snapshot = self.get_volume_snapshot_by_id(snapshot_id)
+                    "Timeout waiting for the volume snapshot to be available.",
+                    wait=self._resource_poll_interval,
+                    max_wait=_utils._MAX_POLL_INTERVAL,
+                    jitter=_utils._POLL_JITTER):
+                # Only the status matters until the wait is over, so skip
+                # normalizing every intermediate poll
+                snapshot = self._get_volume_snapshot_data(snapshot_id)
 
                 if snapshot['status'] == 'available':
+                    snapshot = self._normalize_volume(snapshot)
                     break
 
                 if snapshot['status'] == 'error':
@@ -595,14 +615,25 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
         param: snapshot_id: ID of the volume snapshot.
 
         """
+        return self._normalize_volume(
+            self._get_volume_snapshot_data(snapshot_id))
+
+    def _get_volume_snapshot_data(self, snapshot_id):
+        """Get the raw, un-normalized data of a volume snapshot by ID."""
         resp = self.block_storage.get(
             '/snapshots/{snapshot_id}'.format(snapshot_id=snapshot_id))
         data = proxy._json_response(
             resp,
             error_message="Error getting snapshot "
                           "{snapshot_id}".format(snapshot_id=snapshot_id))
-        return self._normalize_volume(
-            self._get_and_munchify('snapshot', data))
+        return self._get_and_munchify('snapshot', data)
+
+    def _get_volume_snapshot_for_wait(self, snapshot_id):
+        """Get a volume snapshot by ID, or None once it has been deleted."""
+        try:
+            return self._get_volume_snapshot_data(snapshot_id)
+        except exc.OpenStackCloudURINotFound:
+            return None
 
     def get_volume_snapshot(self, name_or_id, filters=None):
         """Get a volume by name or ID.
@@ -674,7 +705,10 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
             backup_id = backup['id']
             msg = ("Timeout waiting for the volume backup {} to be "
                    "available".format(backup_id))
-            for _ in utils.iterate_timeout(timeout, msg):
+            for _ in utils.iterate_timeout(
+                    timeout, msg, wait=self._resource_poll_interval,
+                    max_wait=_utils._MAX_POLL_INTERVAL,
+                    jitter=_utils._POLL_JITTER):
                 backup = self.get_volume_backup(backup_id)
 
                 if backup['status'] == 'available':
@@ -768,7 +802,10 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
         proxy._json_response(resp, error_message=msg)
         if wait:
             msg = "Timeout waiting for the volume backup to be deleted."
-            for count in utils.iterate_timeout(timeout, msg):
+            for count in utils.iterate_timeout(
+                    timeout, msg, wait=self._resource_poll_interval,
+                    max_wait=_utils._MAX_POLL_INTERVAL,
+                    jitter=_utils._POLL_JITTER):
                 if not self.get_volume_backup(volume_backup['id']):
                     break
 
@@ -802,8 +839,12 @@ class BlockStorageCloudMixin(_normalize.Normalizer):
         if wait:
             for count in utils.iterate_timeout(
                     timeout,
-                    "Timeout waiting for the volume snapshot to be deleted."):
-                if not self.get_volume_snapshot(volumesnapshot['id']):
+                    "Timeout waiting for the volume snapshot to be deleted.",
+                    wait=self._resource_poll_interval,
+                    max_wait=_utils._MAX_POLL_INTERVAL,
+                    jitter=_utils._POLL_JITTER):
+                if not self._get_volume_snapshot_for_wait(
+                        volumesnapshot['id']):
                     break
 
         return True
@@ -26,9 +26,11 @@ class ClusteringCloudMixin(_normalize.Normalizer):
     @property
     def _clustering_client(self):
         if 'clustering' not in self._raw_clients:
-            clustering_client = self._get_versioned_client(
-                'clustering', min_version=1, max_version='1.latest')
-            self._raw_clients['clustering'] = clustering_client
+            with self._raw_clients_lock:
+                if 'clustering' not in self._raw_clients:
+                    clustering_client = self._get_versioned_client(
+                        'clustering', min_version=1, max_version='1.latest')
+                    self._raw_clients['clustering'] = clustering_client
         return self._raw_clients['clustering']
 
     def create_cluster(self, name, profile, config=None, desired_capacity=0,
@@ -222,7 +224,10 @@ class ClusteringCloudMixin(_normalize.Normalizer):
         value = []
 
         for count in utils.iterate_timeout(
-                timeout, "Timeout waiting for cluster policy to detach"):
+                timeout, "Timeout waiting for cluster policy to detach",
+                wait=self._resource_poll_interval,
+                max_wait=_utils._MAX_POLL_INTERVAL,
+                jitter=_utils._POLL_JITTER):
 
             # TODO(bjjohnson) This logic will wait until there are no policies.
             # Since we're detaching a specific policy, checking to make sure
@@ -532,7 +537,10 @@ class ClusteringCloudMixin(_normalize.Normalizer):
             return True
 
         for count in utils.iterate_timeout(
-                timeout, "Timeout waiting for cluster receiver to delete"):
+                timeout, "Timeout waiting for cluster receiver to delete",
+                wait=self._resource_poll_interval,
+                max_wait=_utils._MAX_POLL_INTERVAL,
+                jitter=_utils._POLL_JITTER):
 
             receiver = self.get_cluster_receiver_by_id(receiver_id)
 
@@ -25,8 +25,10 @@ class CoeCloudMixin(_normalize.Normalizer):
     @property
     def _container_infra_client(self):
         if 'container-infra' not in self._raw_clients:
-            self._raw_clients['container-infra'] = self._get_raw_client(
-                'container-infra')
+            with self._raw_clients_lock:
+                if 'container-infra' not in self._raw_clients:
+                    raw_client = self._get_raw_client('container-infra')
+                    self._raw_clients['container-infra'] = raw_client
         return self._raw_clients['container-infra']
 
     @_utils.cache_on_arguments()
@@ -99,9 +101,9 @@ class CoeCloudMixin(_normalize.Normalizer):
         :raises: ``OpenStackCloudException`` if something goes wrong during
             the OpenStack API call
         """
-        error_message = ("Error creating cluster of name"
-                         " {cluster_name}".format(cluster_name=name))
-        with _utils.shade_exceptions(error_message):
+        with _utils.shade_exceptions(
+                "Error creating cluster of name {cluster_name}",
+                cluster_name=name):
             body = kwargs.copy()
             body['name'] = name
             body['cluster_template_id'] = cluster_template_id
@@ -167,7 +169,7 @@ class CoeCloudMixin(_normalize.Normalizer):
             return cluster
 
         with _utils.shade_exceptions(
-                "Error updating COE cluster {0}".format(name_or_id)):
+                "Error updating COE cluster {name}", name=name_or_id):
             self._container_infra_client.patch(
                 '/clusters/{id}'.format(id=cluster['id']),
                 json=patches)
@@ -203,9 +205,9 @@ class CoeCloudMixin(_normalize.Normalizer):
 
         :raises: OpenStackCloudException on operation error.
         """
-        error_message = ("Error signing certs for cluster"
-                         " {cluster_id}".format(cluster_id=cluster_id))
-        with _utils.shade_exceptions(error_message):
+        with _utils.shade_exceptions(
+                "Error signing certs for cluster {cluster_id}",
+                cluster_id=cluster_id):
             body = {}
             body['cluster_uuid'] = cluster_id
             body['csr'] = csr
@@ -307,10 +309,9 @@ class CoeCloudMixin(_normalize.Normalizer):
         :raises: ``OpenStackCloudException`` if something goes wrong during
             the OpenStack API call
         """
-        error_message = ("Error creating cluster template of name"
-                         " {cluster_template_name}".format(
-                             cluster_template_name=name))
-        with _utils.shade_exceptions(error_message):
+        with _utils.shade_exceptions(
+                "Error creating cluster template of name"
+                " {cluster_template_name}", cluster_template_name=name):
             body = kwargs.copy()
             body['name'] = name
             body['image_id'] = image_id
@@ -397,7 +398,7 @@ class CoeCloudMixin(_normalize.Normalizer):
             return cluster_template
 
         with _utils.shade_exceptions(
-                "Error updating cluster template {0}".format(name_or_id)):
+                "Error updating cluster template {name}", name=name_or_id):
             if getattr(self._container_infra_client,
                        '_has_magnum_after_newton', False):
                 self._container_infra_client.patch(
@@ -14,8 +14,8 @@
 # We can't just use list, because sphinx gets confused by
 # openstack.resource.Resource.list and openstack.resource2.Resource.list
 import base64
+import concurrent.futures
 import datetime
-import functools
 import iso8601
 import operator
 import threading
@@ -30,13 +30,23 @@ from openstack import exceptions
 from openstack import proxy
 from openstack import utils
 
+# Normalized server attributes that nova matches exactly, with the same
+# values, when used as list filters. Others like key_name, name or
+# availability_zone are matched by nova as regular expressions or
+# substrings, which would not agree with local filtering.
+_SERVER_PUSHDOWN_FILTERS = frozenset((
+    'project_id', 'status', 'task_state', 'user_id', 'vm_state'))
+
 
 class ComputeCloudMixin(_normalize.Normalizer):
 
     def __init__(self):
         self._servers = None
-        self._servers_time = 0
+        # Ages are measured on the monotonic clock, whose zero point is
+        # arbitrary, so start out infinitely stale rather than at 0.
+        self._servers_time = float('-inf')
         self._servers_lock = threading.Lock()
+        self._servers_future = None
 
     @property
     def _compute_region(self):
@@ -61,10 +71,13 @@ class ComputeCloudMixin(_normalize.Normalizer):
             contains this string as a substring.
         """
         flavors = self.list_flavors(get_extra=get_extra)
-        for flavor in sorted(flavors, key=operator.itemgetter('ram')):
+        candidates = (
+            flavor for flavor in flavors
             if (flavor['ram'] >= ram
-                    and (not include or include in flavor['name'])):
-                return flavor
+                and (not include or include in flavor['name'])))
+        flavor = min(candidates, key=operator.itemgetter('ram'), default=None)
+        if flavor is not None:
+            return flavor
         raise exc.OpenStackCloudException(
             "Could not find a flavor with {ram} and '{include}'".format(
                 ram=ram, include=include))
@@ -72,8 +85,8 @@ class ComputeCloudMixin(_normalize.Normalizer):
     @_utils.cache_on_arguments()
     def _nova_extensions(self):
         extensions = set()
-        data = proxy._json_response(
-            self.compute.get('/extensions'),
+        data = self._get_revalidated(
+            self.compute, '/extensions',
             error_message="Error fetching extension list for nova")
 
         for extension in self._get_and_munchify('extensions', data):
@@ -96,8 +109,17 @@ class ComputeCloudMixin(_normalize.Normalizer):
     def search_servers(
             self, name_or_id=None, filters=None, detailed=False,
             all_projects=False, bare=False):
+        # Let nova narrow the listing on the attributes it can filter by
+        # exactly. The full filters are still applied locally, so nova
+        # ignoring one (e.g. an admin-only filter) only costs payload.
+        pushdown = None
+        if isinstance(filters, dict):
+            pushdown = {
+                k: v for k, v in filters.items()
+                if k in _SERVER_PUSHDOWN_FILTERS and isinstance(v, str)}
         servers = self.list_servers(
-            detailed=detailed, all_projects=all_projects, bare=bare)
+            detailed=detailed, all_projects=all_projects, bare=bare,
+            filters=pushdown or None)
         return _utils._filter_list(servers, name_or_id, filters)
 
     def search_server_groups(self, name_or_id=None, filters=None):
@@ -159,9 +181,8 @@ class ComputeCloudMixin(_normalize.Normalizer):
         :returns: A list of flavor ``munch.Munch``.
 
         """
-        data = proxy._json_response(
-            self.compute.get(
-                '/flavors/detail', params=dict(is_public='None')),
+        data = self._get_revalidated(
+            self.compute, '/flavors/detail', params=dict(is_public='None'),
             error_message="Error fetching flavor list")
         flavors = self._normalize_flavors(
             self._get_and_munchify('flavors', data))
@@ -316,25 +337,39 @@ class ComputeCloudMixin(_normalize.Normalizer):
                 filters=filters,
             )
 
-        if (time.time() - self._servers_time) >= self._SERVER_AGE:
+        if (time.monotonic() - self._servers_time) >= self._SERVER_AGE:
             # Since we're using cached data anyway, we don't need to
-            # have more than one thread actually submit the list
-            # servers task.  Let the first one submit it while holding
-            # a lock, and the non-blocking acquire method will cause
-            # subsequent threads to just skip this and use the old
-            # data until it succeeds.
-            # Initially when we never got data, block to retrieve some data.
-            first_run = self._servers is None
-            if self._servers_lock.acquire(first_run):
+            # have more than one thread actually fetch the server list.
+            # The first one to notice the data is stale publishes a future
+            # for the refresh. Others use the old data until it completes,
+            # or wait on the future when there is no data yet, so a cold
+            # cache is only ever fetched once at a time.
+            with self._servers_lock:
+                future = self._servers_future
+                refresh = future is None
+                if refresh:
+                    future = concurrent.futures.Future()
+                    self._servers_future = future
+            if refresh:
                 try:
-                    if not (first_run and self._servers is not None):
-                        self._servers = self._list_servers(
-                            detailed=detailed,
-                            all_projects=all_projects,
-                            bare=bare)
-                        self._servers_time = time.time()
-                finally:
-                    self._servers_lock.release()
+                    servers = self._list_servers(
+                        detailed=detailed,
+                        all_projects=all_projects,
+                        bare=bare)
+                except BaseException as e:
+                    # Whatever stopped the refresh, let the next caller try
+                    # again and don't leave waiters blocked on the future.
+                    with self._servers_lock:
+                        self._servers_future = None
+                    future.set_exception(e)
+                    raise
+                with self._servers_lock:
+                    self._servers = servers
+                    self._servers_time = time.monotonic()
+                    self._servers_future = None
+                future.set_result(servers)
+            elif self._servers is None:
+                future.result()
         # Wrap the return with filter_list so that if filters were passed
         # but we were batching/caching and thus always fetching the whole
         # list from the cloud, we still return a filtered list.
@@ -343,17 +378,17 @@ class ComputeCloudMixin(_normalize.Normalizer):
     def _list_servers(self, detailed=False, all_projects=False, bare=False,
                       filters=None):
         filters = filters or {}
-        servers = [
+        # Normalize and expand each server as the pages stream in, rather
+        # than holding an intermediate list of every normalized server.
+        return [
             # TODO(mordred) Add original_names=False here and update the
             # normalize file for server. Then, just remove the normalize call
             # and the to_munch call.
-            self._normalize_server(server._to_munch())
+            self._expand_server(
+                self._normalize_server(server._to_munch()), detailed, bare)
             for server in self.compute.servers(
                 all_projects=all_projects, allow_unknown_params=True,
-                **filters)]
-        return [
-            self._expand_server(server, detailed, bare)
-            for server in servers
+                **filters)
         ]
 
     def list_server_groups(self):
@@ -441,9 +476,9 @@ class ComputeCloudMixin(_normalize.Normalizer):
             found.
 
         """
-        search_func = functools.partial(
-            self.search_flavors, get_extra=get_extra)
-        return _utils._get_entity(self, search_func, name_or_id, filters)
+        return _utils._get_entity(
+            self, self.search_flavors, name_or_id, filters,
+            get_extra=get_extra)
 
     def get_flavor_by_id(self, id, get_extra=False):
         """ Get a flavor by ID
@@ -545,10 +580,9 @@ class ComputeCloudMixin(_normalize.Normalizer):
                   found.
 
         """
-        searchfunc = functools.partial(self.search_servers,
-                                       detailed=detailed, bare=True,
-                                       all_projects=all_projects)
-        server = _utils._get_entity(self, searchfunc, name_or_id, filters)
+        server = _utils._get_entity(
+            self, self.search_servers, name_or_id, filters,
+            detailed=detailed, bare=True, all_projects=all_projects)
         return self._expand_server(server, detailed, bare)
 
     def _expand_server(self, server, detailed, bare):
@@ -842,16 +876,16 @@ class ComputeCloudMixin(_normalize.Normalizer):
                 network = [network]
             for net_name in network:
                 if isinstance(net_name, dict) and 'id' in net_name:
-                    network_obj = net_name
+                    network_id = net_name['id']
                 else:
-                    network_obj = self.get_network(name_or_id=net_name)
-                if not network_obj:
+                    network_id = self._get_network_id(net_name)
+                if not network_id:
                     raise exc.OpenStackCloudException(
                         'Network {network} is not a valid network in'
                         ' {cloud}:{region}'.format(
                             network=network,
                             cloud=self.name, region=self._compute_region))
-                nics.append({'net-id': network_obj['id']})
+                nics.append({'net-id': network_id})
 
             kwargs['nics'] = nics
         if not network and ('nics' not in kwargs or not kwargs['nics']):
@@ -869,12 +903,11 @@ class ComputeCloudMixin(_normalize.Normalizer):
                 nic.pop('net-name', None)
             elif 'net-name' in nic:
                 net_name = nic.pop('net-name')
-                nic_net = self.get_network(net_name)
-                if not nic_net:
+                net['uuid'] = self._get_network_id(net_name)
+                if not net['uuid']:
                     raise exc.OpenStackCloudException(
                         "Requested network {net} could not be found.".format(
                             net=net_name))
-                net['uuid'] = nic_net['id']
             for ip_key in ('v4-fixed-ip', 'v6-fixed-ip', 'fixed_ip'):
                 fixed_ip = nic.pop(ip_key, None)
                 if fixed_ip and net.get('fixed_ip'):
@@ -934,6 +967,9 @@ class ComputeCloudMixin(_normalize.Normalizer):
                                   microversion=microversion))
             server = self._get_and_munchify('server', data)
             admin_pass = server.get('adminPass') or kwargs.get('admin_pass')
+            # The cached server list can't contain the new server, so make
+            # sure the next list_servers call fetches a fresh one.
+            self._servers_time = self._servers_time - self._SERVER_AGE
             if not wait:
                 # This is a direct get call to skip the list_servers
                 # cache which has absolutely no chance of containing the
@@ -974,6 +1010,16 @@ class ComputeCloudMixin(_normalize.Normalizer):
         else:
             return kwargs
 
+        # The image lookup and the volume listing don't depend on each
+        # other, so when both have to go to the cloud, list the volumes in
+        # the background while the image is being looked up.
+        volume_index_future = None
+        if (boot_from_volume and not boot_volume
+                and not isinstance(image, dict)
+                and any(isinstance(volume, str) for volume in volumes)):
+            volume_index_future = self._pool_executor.submit(
+                self._get_volume_index)
+
         # If we have boot_from_volume but no root volume, then we're
         # booting an image from volume
         if boot_volume:
@@ -1027,8 +1073,25 @@ class ComputeCloudMixin(_normalize.Normalizer):
                 u'uuid': kwargs['imageRef'],
             }
             kwargs['block_device_mapping_v2'].append(block_mapping)
+        # Resolve names and ids against a single listing rather than
+        # letting each get_volume call list and scan the volumes again.
+        volume_index = None
         for volume in volumes:
-            volume_obj = self.get_volume(volume)
+            volume_obj = None
+            if isinstance(volume, str):
+                if volume_index is None:
+                    if volume_index_future:
+                        volume_index = volume_index_future.result()
+                    else:
+                        volume_index = self._get_volume_index()
+                matches = volume_index.get(volume, [])
+                if len(matches) > 1:
+                    raise exc.OpenStackCloudException(
+                        "Multiple matches found for %s" % volume)
+                if matches:
+                    volume_obj = matches[0]
+            if not volume_obj:
+                volume_obj = self.get_volume(volume)
             if not volume_obj:
                 raise exc.OpenStackCloudException(
                     'Volume {volume} is not a valid volume'
@@ -1047,6 +1110,15 @@ class ComputeCloudMixin(_normalize.Normalizer):
             self.list_volumes.invalidate(self)
         return kwargs
 
+    def _get_volume_index(self):
+        """Map the id and name of each volume to the volumes carrying it."""
+        index = {}
+        for volume in self.list_volumes():
+            index.setdefault(volume['id'], []).append(volume)
+            if volume['name'] and volume['name'] != volume['id']:
+                index.setdefault(volume['name'], []).append(volume)
+        return index
+
     def wait_for_server(
             self, server, auto_ip=True, ips=None, ip_pool=None,
             reuse=True, timeout=180, nat_destination=None):
@@ -1060,20 +1132,20 @@ class ComputeCloudMixin(_normalize.Normalizer):
         timeout_message = "Timeout waiting for the server to come up."
         start_time = time.time()
 
-        # There is no point in iterating faster than the list_servers cache
-        for count in utils.iterate_timeout(
-                timeout,
-                timeout_message,
-                # if _SERVER_AGE is 0 we still want to wait a bit
-                # to be friendly with the server.
-                wait=self._SERVER_AGE or 2):
-            try:
-                # Use the get_server call so that the list_servers
-                # cache can be leveraged
-                server = self.get_server(server_id)
-            except Exception:
-                continue
-            if not server:
+        # A freshly created server is usually not in the list_servers
+        # cache yet, so fetch just this one.
+        for server in _utils._poll_tolerating_transient(
+                lambda: self.get_server_by_id(server_id),
+                utils.iterate_timeout(
+                    timeout,
+                    timeout_message,
+                    # if _SERVER_AGE is 0 we still want to wait a bit
+                    # to be friendly with the server.
+                    wait=self._SERVER_AGE or 2,
+                    max_wait=_utils._MAX_POLL_INTERVAL,
+                    jitter=_utils._POLL_JITTER),
+                "server %s" % server_id):
+            if not server or server['status'] not in ('ACTIVE', 'ERROR'):
                 continue
 
             # We have more work to do, but the details of that are
@@ -1155,15 +1227,16 @@ class ComputeCloudMixin(_normalize.Normalizer):
                 self._normalize_server(server), bare=bare, detailed=detailed)
 
         admin_pass = server.get('adminPass') or admin_pass
-        for count in utils.iterate_timeout(
-                timeout,
-                "Timeout waiting for server {0} to "
-                "rebuild.".format(server_id),
-                wait=self._SERVER_AGE):
-            try:
-                server = self.get_server(server_id, bare=True)
-            except Exception:
-                continue
+        for server in _utils._poll_tolerating_transient(
+                lambda: self.get_server(server_id, bare=True),
+                utils.iterate_timeout(
+                    timeout,
+                    "Timeout waiting for server {0} to "
+                    "rebuild.".format(server_id),
+                    wait=self._SERVER_AGE,
+                    max_wait=_utils._MAX_POLL_INTERVAL,
+                    jitter=_utils._POLL_JITTER),
+                "server %s" % server_id):
             if not server:
                 continue
 
@@ -1291,24 +1364,33 @@ class ComputeCloudMixin(_normalize.Normalizer):
             raise
 
         if not wait:
+            # Reset the list servers cache time so that the next list
+            # server call sees the server going away
+            self._servers_time = self._servers_time - self._SERVER_AGE
             return True
 
         # If the server has volume attachments, or if it has booted
         # from volume, deleting it will change volume state so we will
         # need to invalidate the cache. Avoid the extra API call if
-        # caching is not enabled.
+        # caching is not enabled, or if the server already says which
+        # volumes it has attached.
         reset_volume_cache = False
-        if (self.cache_enabled
-                and self.has_service('volume')
-                and self.get_volumes(server)):
-            reset_volume_cache = True
+        if self.cache_enabled and self.has_service('volume'):
+            volumes = server.get(
+                'volumes',
+                server.get('os-extended-volumes:volumes_attached'))
+            if volumes is None:
+                volumes = self.get_volumes(server)
+            reset_volume_cache = bool(volumes)
 
         for count in utils.iterate_timeout(
                 timeout,
                 "Timed out waiting for server to get deleted.",
                 # if _SERVER_AGE is 0 we still want to wait a bit
                 # to be friendly with the server.
-                wait=self._SERVER_AGE or 2):
+                wait=self._SERVER_AGE or 2,
+                max_wait=_utils._MAX_POLL_INTERVAL,
+                jitter=_utils._POLL_JITTER):
             with _utils.shade_exceptions("Error in deleting server"):
                 server = self.get_server(server['id'], bare=True)
                 if not server:
@@ -1412,8 +1494,8 @@ class ComputeCloudMixin(_normalize.Normalizer):
 
         :raises: OpenStackCloudException on operation error.
         """
-        with _utils.shade_exceptions("Failed to create flavor {name}".format(
-                name=name)):
+        with _utils.shade_exceptions(
+                "Failed to create flavor {name}", name=name):
             payload = {
                 'disk': disk,
                 'OS-FLV-EXT-DATA:ephemeral': ephemeral,
@@ -1491,9 +1573,9 @@ class ComputeCloudMixin(_normalize.Normalizer):
     def _mod_flavor_access(self, action, flavor_id, project_id):
         """Common method for adding and removing flavor access
         """
-        with _utils.shade_exceptions("Error trying to {action} access from "
-                                     "flavor ID {flavor}".format(
-                                         action=action, flavor=flavor_id)):
+        with _utils.shade_exceptions(
+                "Error trying to {action} access from flavor ID {flavor}",
+                action=action, flavor=flavor_id):
             endpoint = '/flavors/{id}/action'.format(id=flavor_id)
             access = {'tenant': project_id}
             access_key = '{action}TenantAccess'.format(action=action)
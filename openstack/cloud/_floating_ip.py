@@ -13,6 +13,7 @@
 # import types so that we can reference ListType in sphinx param declarations.
 # We can't just use list, because sphinx gets confused by
 # openstack.resource.Resource.list and openstack.resource2.Resource.list
+import collections
 import ipaddress
 # import jsonpatch
 import threading
@@ -46,8 +47,19 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
                 self._floating_ip_source = self._floating_ip_source.lower()
 
         self._floating_ips = None
-        self._floating_ips_time = 0
+        # Ages are measured on the monotonic clock, whose zero point is
+        # arbitrary, so start out infinitely stale rather than at 0.
+        self._floating_ips_time = float('-inf')
         self._floating_ips_lock = threading.Lock()
+        # Set once neutron has answered 404 for floating IPs, so that later
+        # listings go straight to nova instead of failing over every time.
+        self._neutron_floating_ips_missing = False
+
+        # Reusing a floating IP means finding an unattached one and then
+        # attaching it. Callers drawing from the same pool must not
+        # interleave those steps, or they end up picking the same address.
+        self._floating_ip_pool_locks = collections.defaultdict(
+            threading.Lock)
 
         self._floating_network_by_router = None
         self._floating_network_by_router_run = False
@@ -119,11 +131,13 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
         return _utils._get_entity(self, 'floating_ip', id, filters)
 
     def _list_floating_ips(self, filters=None):
-        if self._use_neutron_floating():
+        use_neutron = self._use_neutron_floating()
+        if use_neutron and not self._neutron_floating_ips_missing:
             try:
                 return self._normalize_floating_ips(
                     self._neutron_list_floating_ips(filters))
             except exc.OpenStackCloudURINotFound as e:
+                self._neutron_floating_ips_missing = True
                 # Nova-network don't support server-side floating ips
                 # filtering, so it's safer to return and empty list than
                 # to fallback to Nova which may return more results that
@@ -155,12 +169,15 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
                     "Something went wrong talking to neutron API: "
                     "'%(msg)s'. Trying with Nova.", {'msg': str(e)})
                 # Fall-through, trying with Nova
-        else:
-            if filters:
-                raise ValueError(
-                    "Nova-network don't support server-side floating ips "
-                    "filtering. Use the search_floatting_ips method instead"
-                )
+        elif filters:
+            if use_neutron:
+                # Neutron is known not to have floating ips, and nova
+                # can't filter them, see above.
+                return []
+            raise ValueError(
+                "Nova-network don't support server-side floating ips "
+                "filtering. Use the search_floatting_ips method instead"
+            )
 
         floating_ips = self._nova_list_floating_ips()
         return self._normalize_floating_ips(floating_ips)
@@ -198,7 +215,7 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
         if filters and self._FLOAT_AGE == 0:
             return self._list_floating_ips(filters)
 
-        if (time.time() - self._floating_ips_time) >= self._FLOAT_AGE:
+        if (time.monotonic() - self._floating_ips_time) >= self._FLOAT_AGE:
             # Since we're using cached data anyway, we don't need to
             # have more than one thread actually submit the list
             # floating ips task.  Let the first one submit it while holding
@@ -211,7 +228,7 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
                 try:
                     if not (first_run and self._floating_ips is not None):
                         self._floating_ips = self._list_floating_ips()
-                        self._floating_ips_time = time.time()
+                        self._floating_ips_time = time.monotonic()
                 finally:
                     self._floating_ips_lock.release()
         # Wrap the return with filter_list so that if filters were passed
@@ -260,27 +277,7 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
             # tenant. This is the default behaviour of Nova
             project_id = self.current_project_id
 
-        if network:
-            if isinstance(network, str):
-                network = [network]
-
-            # Use given list to get first matching external network
-            floating_network_id = None
-            for net in network:
-                for ext_net in self.get_external_ipv4_floating_networks():
-                    if net in (ext_net['name'], ext_net['id']):
-                        floating_network_id = ext_net['id']
-                        break
-                if floating_network_id:
-                    break
-
-            if floating_network_id is None:
-                raise exc.OpenStackCloudResourceNotFound(
-                    "unable to find external network {net}".format(
-                        net=network)
-                )
-        else:
-            floating_network_id = self._get_floating_network_id()
+        floating_network_id = self._get_floating_network_id(network)
 
         filters = {
             'port': None,
@@ -288,7 +285,13 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
             'location': {'project': {'id': project_id}},
         }
 
-        floating_ips = self._list_floating_ips()
+        # Let neutron narrow the listing down to the network and project.
+        # Whether a floating IP is attached can't be expressed as a query,
+        # so that (and a re-check of the rest) still happens locally.
+        floating_ips = self._list_floating_ips(filters={
+            'floating_network_id': floating_network_id,
+            'project_id': project_id,
+        })
         available_ips = _utils._filter_list(
             floating_ips, name_or_id=None, filters=filters)
         if available_ips:
@@ -316,8 +319,7 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
         """
 
         with _utils.shade_exceptions(
-                "Unable to create floating IP in pool {pool}".format(
-                    pool=pool)):
+                "Unable to create floating IP in pool {pool}", pool=pool):
             if pool is None:
                 pools = self.list_floating_ip_pools()
                 if not pools:
@@ -390,7 +392,48 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
         )
         return f_ips[0]
 
-    def _get_floating_network_id(self):
+    def _resolve_floating_ip_pool(self, network):
+        """Work out which pool floating IPs for network come from.
+
+        Reusing floating IPs from a pool is serialised on a lock per pool,
+        so a network given by name or by ID, or left for us to pick, has to
+        map to the same key.
+
+        :param network: Name or ID of the network or nova pool, or None.
+
+        :returns: A tuple of the key for _floating_ip_pool_locks and the
+                  network to pass on to available_floating_ip.
+        """
+        if self._use_neutron_floating():
+            try:
+                return self._get_floating_network_id(network), network
+            except exc.OpenStackCloudURINotFound:
+                # available_floating_ip falls back to nova in this case.
+                return network, network
+        if network is None:
+            pools = self.list_floating_ip_pools()
+            if not pools:
+                raise exc.OpenStackCloudResourceNotFound(
+                    "unable to find a floating ip pool")
+            network = pools[0]['name']
+        return network, network
+
+    def _get_floating_network_id(self, network=None):
+        if network:
+            if isinstance(network, str):
+                network = [network]
+
+            # Use given list to get first matching external network
+            for net in network:
+                for ext_net in self.get_external_ipv4_floating_networks():
+                    if net in (ext_net['name'], ext_net['id']):
+                        return ext_net['id']
+
+            raise exc.OpenStackCloudResourceNotFound(
+                "unable to find external network {net}".format(
+                    net=network)
+            )
+
         # Get first existing external IPv4 network
         networks = self.get_external_ipv4_floating_networks()
         if networks:
@@ -510,7 +553,9 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
                             timeout,
                             "Timeout waiting for the floating IP"
                             " to be ACTIVE",
-                            wait=self._FLOAT_AGE):
+                            wait=self._FLOAT_AGE,
+                            max_wait=_utils._MAX_POLL_INTERVAL,
+                            jitter=_utils._POLL_JITTER):
                         fip = self.get_floating_ip(fip_id)
                         if fip and fip['status'] == 'ACTIVE':
                             break
@@ -542,8 +587,7 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
 
     def _nova_create_floating_ip(self, pool=None):
         with _utils.shade_exceptions(
-                "Unable to create floating IP in pool {pool}".format(
-                    pool=pool)):
+                "Unable to create floating IP in pool {pool}", pool=pool):
             if pool is None:
                 pools = self.list_floating_ip_pools()
                 if not pools:
@@ -717,23 +761,32 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
         else:
             # Nova network
             self._nova_attach_ip_to_server(
-                server_id=server['id'], floating_ip_id=floating_ip['id'],
+                server_id=server['id'], floating_ip=floating_ip,
                 fixed_address=fixed_address)
 
         if wait:
-            # Wait for the address to be assigned to the server
-            server_id = server['id']
-            for _ in utils.iterate_timeout(
-                    timeout,
-                    "Timeout waiting for the floating IP to be attached.",
-                    wait=self._SERVER_AGE):
-                server = self.get_server_by_id(server_id)
-                ext_ip = meta.get_server_ip(
-                    server, ext_tag='floating', public=True)
-                if ext_ip == floating_ip['floating_ip_address']:
-                    return server
+            return self._wait_for_floating_ip_attach(
+                server, floating_ip, timeout)
         return server
 
+    def _wait_for_floating_ip_attach(self, server, floating_ip, timeout):
+        """Wait for a floating IP to show up on a server.
+
+        :returns: The refreshed server ``munch.Munch``
+        """
+        server_id = server['id']
+        for _ in utils.iterate_timeout(
+                timeout,
+                "Timeout waiting for the floating IP to be attached.",
+                wait=self._SERVER_AGE,
+                max_wait=_utils._MAX_POLL_INTERVAL,
+                jitter=_utils._POLL_JITTER):
+            server = self.get_server_by_id(server_id)
+            ext_ip = meta.get_server_ip(
+                server, ext_tag='floating', public=True)
+            if ext_ip == floating_ip['floating_ip_address']:
+                return server
+
     def _neutron_attach_ip_to_server(
             self, server, floating_ip, fixed_address=None,
             nat_destination=None):
@@ -760,17 +813,12 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
                                ip=floating_ip['id'],
                                server_id=server['id'])))
 
-    def _nova_attach_ip_to_server(self, server_id, floating_ip_id,
+    def _nova_attach_ip_to_server(self, server_id, floating_ip,
                                   fixed_address=None):
-        f_ip = self.get_floating_ip(
-            id=floating_ip_id)
-        if f_ip is None:
-            raise exc.OpenStackCloudException(
-                "unable to find floating IP {0}".format(floating_ip_id))
         error_message = "Error attaching IP {ip} to instance {id}".format(
-            ip=floating_ip_id, id=server_id)
+            ip=floating_ip['id'], id=server_id)
         body = {
-            'address': f_ip['floating_ip_address']
+            'address': floating_ip['floating_ip_address']
         }
         if fixed_address:
             body['fixed_address'] = fixed_address
@@ -860,18 +908,28 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
         :returns: the updated server ``munch.Munch``
         """
         if reuse:
-            f_ip = self.available_floating_ip(network=network)
-        else:
-            start_time = time.time()
-            f_ip = self.create_floating_ip(
-                server=server,
-                network=network, nat_destination=nat_destination,
-                wait=wait, timeout=timeout)
-            timeout = timeout - (time.time() - start_time)
-            # Wait for cache invalidation time so that we don't try
-            # to attach the FIP a second time below
-            time.sleep(self._SERVER_AGE)
-            server = self.get_server(server.id)
+            lock_key, network = self._resolve_floating_ip_pool(network)
+            with self._floating_ip_pool_locks[lock_key]:
+                f_ip = self.available_floating_ip(network=network)
+                server = self._attach_ip_to_server(
+                    server=server, floating_ip=f_ip,
+                    fixed_address=fixed_address,
+                    nat_destination=nat_destination)
+            if wait:
+                server = self._wait_for_floating_ip_attach(
+                    server, f_ip, timeout)
+            return server
+
+        start_time = time.time()
+        f_ip = self.create_floating_ip(
+            server=server,
+            network=network, nat_destination=nat_destination,
+            wait=wait, timeout=timeout)
+        timeout = timeout - (time.time() - start_time)
+        # Wait for cache invalidation time so that we don't try
+        # to attach the FIP a second time below
+        time.sleep(self._SERVER_AGE)
+        server = self.get_server(server.id)
 
         # We run attach as a second call rather than in the create call
         # because there are code flows where we will not have an attached
@@ -888,7 +946,8 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
         """Attach a list of IPs to a server.
 
         :param server: a server object
-        :param ips: list of floating IP addresses or a single address
+        :param ips: list of floating IP addresses or a single address. Only
+                    the first address of a list is attached.
         :param wait: (optional) Wait for the address to appear as assigned
                      to the server. Defaults to False.
         :param timeout: (optional) Seconds to wait, defaults to 60.
@@ -900,10 +959,7 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
 
         :raises: ``OpenStackCloudException``, on operation error.
         """
-        if type(ips) == list:
-            ip = ips[0]
-        else:
-            ip = ips
+        ip = ips[0] if isinstance(ips, (list, tuple)) else ips
         f_ip = self.get_floating_ip(
             id=None, filters={'floating_ip_address': ip})
         return self._attach_ip_to_server(
@@ -937,20 +993,25 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
         return server['interface_ip'] or None
 
     def _add_auto_ip(self, server, wait=False, timeout=60, reuse=True):
-        skip_attach = False
-        created = False
         if reuse:
-            f_ip = self.available_floating_ip(server=server)
-        else:
-            start_time = time.time()
-            f_ip = self.create_floating_ip(
-                server=server, wait=wait, timeout=timeout)
-            timeout = timeout - (time.time() - start_time)
-            if server:
-                # This gets passed in for both nova and neutron
-                # but is only meaningful for the neutron logic branch
-                skip_attach = True
-            created = True
+            lock_key, network = self._resolve_floating_ip_pool(None)
+            with self._floating_ip_pool_locks[lock_key]:
+                f_ip = self.available_floating_ip(
+                    network=network, server=server)
+                server = self._attach_ip_to_server(
+                    server=server, floating_ip=f_ip)
+            if wait:
+                server = self._wait_for_floating_ip_attach(
+                    server, f_ip, timeout)
+            return server
+
+        start_time = time.time()
+        f_ip = self.create_floating_ip(
+            server=server, wait=wait, timeout=timeout)
+        timeout = timeout - (time.time() - start_time)
+        # This gets passed in for both nova and neutron
+        # but is only meaningful for the neutron logic branch
+        skip_attach = bool(server)
 
         try:
             # We run attach as a second call rather than in the create call
@@ -962,7 +1023,7 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
                 server=server, floating_ip=f_ip, wait=wait, timeout=timeout,
                 skip_attach=skip_attach)
         except exc.OpenStackCloudTimeout:
-            if self._use_neutron_floating() and created:
+            if self._use_neutron_floating():
                 # We are here because we created an IP on the port
                 # It failed. Delete so as not to leak an unmanaged
                 # resource
@@ -1076,6 +1137,8 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
             timeout = self._PORT_AGE * 2
         else:
             timeout = None
+        # This waits out the port listing cache, so it polls at the cache
+        # age for at most two ages rather than backing off.
         for count in utils.iterate_timeout(
                 timeout,
                 "Timeout waiting for port to show up in list",
@@ -1138,13 +1201,13 @@ class FloatingIPCloudMixin(_normalize.Normalizer):
                     key=lambda p: p.get('created_at', 0),
                     reverse=True):
                 for address in port.get('fixed_ips', list()):
+                    # Only IPv4 addresses parse, so there is no need to
+                    # build a generic address and check its version
                     try:
-                        ip = ipaddress.ip_address(address['ip_address'])
+                        ipaddress.IPv4Address(address['ip_address'])
                     except Exception:
                         continue
-                    if ip.version == 4:
-                        fixed_address = address['ip_address']
-                        return port, fixed_address
+                    return port, address['ip_address']
             raise exc.OpenStackCloudException(
                 "unable to find a free fixed IPv4 address for server "
                 "{0}".format(server['id']))
@@ -13,6 +13,7 @@
 # import types so that we can reference ListType in sphinx param declarations.
 # We can't just use list, because sphinx gets confused by
 # openstack.resource.Resource.list and openstack.resource2.Resource.list
+import functools
 import types  # noqa
 
 import munch
@@ -28,8 +29,10 @@ class IdentityCloudMixin(_normalize.Normalizer):
     @property
     def _identity_client(self):
         if 'identity' not in self._raw_clients:
-            self._raw_clients['identity'] = self._get_versioned_client(
-                'identity', min_version=2, max_version='3.latest')
+            with self._raw_clients_lock:
+                if 'identity' not in self._raw_clients:
+                    self._raw_clients['identity'] = self._get_versioned_client(
+                        'identity', min_version=2, max_version='3.latest')
         return self._raw_clients['identity']
 
     @_utils.cache_on_arguments()
@@ -101,8 +104,7 @@ class IdentityCloudMixin(_normalize.Normalizer):
     def update_project(self, name_or_id, enabled=None, domain_id=None,
                        **kwargs):
         with _utils.shade_exceptions(
-                "Error in updating project {project}".format(
-                    project=name_or_id)):
+                "Error in updating project {project}", project=name_or_id):
             proj = self.get_project(name_or_id, domain_id=domain_id)
             if not proj:
                 raise exc.OpenStackCloudException(
@@ -120,14 +122,15 @@ class IdentityCloudMixin(_normalize.Normalizer):
                     '/tenants/' + proj['id'], json={'tenant': kwargs})
                 project = self._get_and_munchify('tenant', data)
             project = self._normalize_project(project)
-        self.list_projects.invalidate(self)
+        self.list_projects.replace_item(self, project)
+        self._project_param_cache.clear()
         return project
 
     def create_project(
             self, name, description=None, domain_id=None, enabled=True):
         """Create a project."""
         with _utils.shade_exceptions(
-                "Error in creating project {project}".format(project=name)):
+                "Error in creating project {project}", project=name):
             project_ref = self._get_domain_id_param_dict(domain_id)
             project_ref.update({'name': name,
                                 'description': description,
@@ -141,6 +144,7 @@ class IdentityCloudMixin(_normalize.Normalizer):
             project = self._normalize_project(
                 self._get_and_munchify(key, data))
         self.list_projects.invalidate(self)
+        self._project_param_cache.clear()
         return project
 
     def delete_project(self, name_or_id, domain_id=None):
@@ -157,8 +161,7 @@ class IdentityCloudMixin(_normalize.Normalizer):
         """
 
         with _utils.shade_exceptions(
-                "Error in deleting project {project}".format(
-                    project=name_or_id)):
+                "Error in deleting project {project}", project=name_or_id):
             project = self.get_project(name_or_id, domain_id=domain_id)
             if project is None:
                 self.log.debug(
@@ -170,6 +173,7 @@ class IdentityCloudMixin(_normalize.Normalizer):
             else:
                 self._identity_client.delete('/tenants/' + project['id'])
 
+        self._project_param_cache.clear()
         return True
 
     @_utils.valid_kwargs('domain_id', 'name')
@@ -255,7 +259,6 @@ class IdentityCloudMixin(_normalize.Normalizer):
     @_utils.valid_kwargs('name', 'email', 'enabled', 'domain_id', 'password',
                          'description', 'default_project')
     def update_user(self, name_or_id, **kwargs):
-        self.list_users.invalidate(self)
         user_kwargs = {}
         if 'domain_id' in kwargs and kwargs['domain_id']:
             user_kwargs['domain_id'] = kwargs['domain_id']
@@ -272,8 +275,8 @@ class IdentityCloudMixin(_normalize.Normalizer):
             password = kwargs.pop('password', None)
             if password is not None:
                 with _utils.shade_exceptions(
-                        "Error updating password for {user}".format(
-                            user=name_or_id)):
+                        "Error updating password for {user}",
+                        user=name_or_id):
                     error_msg = "Error updating password for user {}".format(
                         name_or_id)
                     data = self._identity_client.put(
@@ -295,8 +298,9 @@ class IdentityCloudMixin(_normalize.Normalizer):
                 error_message="Error in updating user {}".format(name_or_id))
 
         user = self._get_and_munchify('user', data)
-        self.list_users.invalidate(self)
-        return _utils.normalize_users([user])[0]
+        user = _utils.normalize_users([user])[0]
+        self.list_users.replace_item(self, user)
+        return user
 
     def create_user(
             self, name, password=None, email=None, default_project=None,
@@ -321,12 +325,9 @@ class IdentityCloudMixin(_normalize.Normalizer):
 
     @_utils.valid_kwargs('domain_id')
     def delete_user(self, name_or_id, **kwargs):
-        # TODO(mordred) Why are we invalidating at the TOP?
-        self.list_users.invalidate(self)
         user = self.get_user(name_or_id, **kwargs)
         if not user:
-            self.log.debug(
-                "User {0} not found for deleting".format(name_or_id))
+            self.log.debug("User %s not found for deleting", name_or_id)
             return False
 
         # TODO(mordred) Extra GET only needed to support keystoneclient.
@@ -409,6 +410,47 @@ class IdentityCloudMixin(_normalize.Normalizer):
             '/groups/{g}/users/{u}'.format(g=group['id'], u=user['id']),
             error_message=error_msg)
 
+    def add_users_to_groups(self, memberships):
+        """Add several users to groups.
+
+        Users and groups are resolved from a single listing of each rather
+        than looked up once per membership. Every membership is resolved
+        before any of them is added, and they are then added concurrently.
+
+        :param memberships: An iterable of ``(user_name_or_id,
+            group_name_or_id)`` tuples.
+
+        :raises: ``OpenStackCloudException`` if a user or group is not found,
+            in which case no membership is added, or if something goes wrong
+            during the OpenStack API calls
+        """
+        users = self.list_users()
+        groups = self.list_groups()
+
+        calls = {}
+        for name_or_id, group_name_or_id in memberships:
+            user = self._get_listed_entity(users, 'User', name_or_id)
+            group = self._get_listed_entity(
+                groups, 'Group', group_name_or_id)
+            url = '/groups/{g}/users/{u}'.format(g=group['id'], u=user['id'])
+            error_msg = "Error adding user {user} to group {group}".format(
+                user=name_or_id, group=group_name_or_id)
+            calls[url] = functools.partial(
+                self._identity_client.put, url, error_message=error_msg)
+
+        _utils._run_concurrently(
+            self._pool_executor, calls, "Error adding users to groups")
+
+    def _get_listed_entity(self, entities, kind, name_or_id):
+        entities = _utils._filter_list(entities, name_or_id, None)
+        if not entities:
+            raise exc.OpenStackCloudException(
+                '{kind} {name} not found'.format(kind=kind, name=name_or_id))
+        if len(entities) > 1:
+            raise exc.OpenStackCloudException(
+                "Multiple matches found for %s" % name_or_id)
+        return entities[0]
+
     @_utils.valid_kwargs('type', 'service_type', 'description')
     def create_service(self, name, enabled=True, **kwargs):
         """Create a service.
@@ -1416,7 +1458,10 @@ class IdentityCloudMixin(_normalize.Normalizer):
         if wait:
             for count in utils.iterate_timeout(
                     timeout,
-                    "Timeout waiting for role to be granted"):
+                    "Timeout waiting for role to be granted",
+                    wait=self._resource_poll_interval,
+                    max_wait=_utils._MAX_POLL_INTERVAL,
+                    jitter=_utils._POLL_JITTER):
                 if self.list_role_assignments(filters=filters):
                     break
         return True
@@ -1495,7 +1540,10 @@ class IdentityCloudMixin(_normalize.Normalizer):
         if wait:
             for count in utils.iterate_timeout(
                     timeout,
-                    "Timeout waiting for role to be revoked"):
+                    "Timeout waiting for role to be revoked",
+                    wait=self._resource_poll_interval,
+                    max_wait=_utils._MAX_POLL_INTERVAL,
+                    jitter=_utils._POLL_JITTER):
                 if not self.list_role_assignments(filters=filters):
                     break
         return True
@@ -21,12 +21,12 @@ from openstack.cloud import _utils
 from openstack import utils
 
 
+_IMAGE_STEADY_STATES = frozenset(('active', 'deleted', 'killed'))
+
+
 def _no_pending_images(images):
     """If there are any images not in a steady state, don't cache"""
-    for image in images:
-        if image.status not in ('active', 'deleted', 'killed'):
-            return False
-    return True
+    return all(i.status in _IMAGE_STEADY_STATES for i in images)
 
 
 class ImageCloudMixin(_normalize.Normalizer):
@@ -37,15 +37,19 @@ class ImageCloudMixin(_normalize.Normalizer):
     @property
     def _raw_image_client(self):
         if 'raw-image' not in self._raw_clients:
-            image_client = self._get_raw_client('image')
-            self._raw_clients['raw-image'] = image_client
+            with self._raw_clients_lock:
+                if 'raw-image' not in self._raw_clients:
+                    image_client = self._get_raw_client('image')
+                    self._raw_clients['raw-image'] = image_client
         return self._raw_clients['raw-image']
 
     @property
     def _image_client(self):
         if 'image' not in self._raw_clients:
-            self._raw_clients['image'] = self._get_versioned_client(
-                'image', min_version=1, max_version='2.latest')
+            with self._raw_clients_lock:
+                if 'image' not in self._raw_clients:
+                    self._raw_clients['image'] = self._get_versioned_client(
+                        'image', min_version=1, max_version='2.latest')
         return self._raw_clients['image']
 
     def search_images(self, name_or_id=None, filters=None):
@@ -66,21 +70,18 @@ class ImageCloudMixin(_normalize.Normalizer):
         if show_all:
             filter_deleted = False
         # First, try to actually get images from glance, it's more efficient
-        images = []
         params = {}
-        image_list = []
         if self._is_client_version('image', 2):
             if show_all:
                 params['member_status'] = 'all'
-        image_list = list(self.image.images(**params))
-
-        for image in image_list:
-            # The cloud might return DELETED for invalid images.
-            # While that's cute and all, that's an implementation detail.
-            if not filter_deleted:
-                images.append(image)
-            elif image.status.lower() != 'deleted':
-                images.append(image)
+
+        # Filter while the pages are being consumed rather than holding the
+        # whole unfiltered catalog in memory first.
+        # The cloud might return DELETED for invalid images.
+        # While that's cute and all, that's an implementation detail.
+        images = [
+            image for image in self.image.images(**params)
+            if not filter_deleted or image.status.lower() != 'deleted']
         return self._normalize_images(images)
 
     def get_image(self, name_or_id, filters=None):
@@ -119,6 +120,17 @@ class ImageCloudMixin(_normalize.Normalizer):
 
         return image
 
+    def _get_image_for_wait(self, image_id):
+        """Fetch one image by ID, or None if it doesn't exist (anymore).
+
+        The wait loops only care about a single image, so they use this
+        rather than re-listing the whole catalog on every poll.
+        """
+        try:
+            return self.get_image_by_id(image_id)
+        except exc.OpenStackCloudResourceNotFound:
+            return None
+
     def download_image(
             self, name_or_id, output_path=None, output_file=None,
             chunk_size=1024):
@@ -180,12 +192,15 @@ class ImageCloudMixin(_normalize.Normalizer):
     def wait_for_image(self, image, timeout=3600):
         image_id = image['id']
         for count in utils.iterate_timeout(
-                timeout, "Timeout waiting for image to snapshot"):
-            self.list_images.invalidate(self)
-            image = self.get_image(image_id)
+                timeout, "Timeout waiting for image to snapshot",
+                wait=self._resource_poll_interval,
+                max_wait=_utils._MAX_POLL_INTERVAL,
+                jitter=_utils._POLL_JITTER):
+            image = self._get_image_for_wait(image_id)
             if not image:
                 continue
             if image['status'] == 'active':
+                self.list_images.invalidate(self)
                 return image
             elif image['status'] == 'error':
                 raise exc.OpenStackCloudException(
@@ -223,9 +238,11 @@ class ImageCloudMixin(_normalize.Normalizer):
         if wait:
             for count in utils.iterate_timeout(
                     timeout,
-                    "Timeout waiting for the image to be deleted."):
-                self._get_cache(None).invalidate()
-                if self.get_image(image.id) is None:
+                    "Timeout waiting for the image to be deleted.",
+                    wait=self._resource_poll_interval,
+                    max_wait=_utils._MAX_POLL_INTERVAL,
+                    jitter=_utils._POLL_JITTER):
+                if self._get_image_for_wait(image.id) is None:
                     break
         return True
 
@@ -307,14 +324,17 @@ class ImageCloudMixin(_normalize.Normalizer):
                 wait=wait, timeout=timeout,
                 allow_duplicates=allow_duplicates, meta=meta, **kwargs)
 
-        self._get_cache(None).invalidate()
+        self.list_images.invalidate(self)
         if not wait:
             return image
         try:
             for count in utils.iterate_timeout(
                     timeout,
-                    "Timeout waiting for the image to finish."):
-                image_obj = self.get_image(image.id)
+                    "Timeout waiting for the image to finish.",
+                    wait=self._resource_poll_interval,
+                    max_wait=_utils._MAX_POLL_INTERVAL,
+                    jitter=_utils._POLL_JITTER):
+                image_obj = self._get_image_for_wait(image.id)
                 if image_obj and image_obj.status not in ('queued', 'saving'):
                     return image_obj
         except exc.OpenStackCloudTimeout:
@@ -13,6 +13,7 @@
 # import types so that we can reference ListType in sphinx param declarations.
 # We can't just use list, because sphinx gets confused by
 # openstack.resource.Resource.list and openstack.resource2.Resource.list
+import functools
 import time
 import threading
 import types  # noqa
@@ -23,12 +24,43 @@ from openstack.cloud import _utils
 from openstack import exceptions
 from openstack import proxy
 
+# Owners of the ports through which a router is attached to its internal
+# subnets, in the order list_router_interfaces returns them.
+_ROUTER_INTERFACE_OWNERS = (
+    'network:router_interface',
+    'network:router_interface_distributed',
+    'network:ha_router_replicated_interface',
+)
+
+# Body keys of the optional create_subnet and update_subnet arguments, in
+# the order the methods list the values
+_CREATE_SUBNET_OPTIONAL_KEYS = (
+    'cidr', 'name', 'tenant_id', 'allocation_pools', 'gateway_ip',
+    'dns_nameservers', 'host_routes', 'ipv6_ra_mode', 'ipv6_address_mode',
+    'prefixlen',
+)
+_UPDATE_SUBNET_OPTIONAL_KEYS = (
+    'name', 'gateway_ip', 'allocation_pools', 'dns_nameservers',
+    'host_routes',
+)
+
+# Optional arguments create_port and create_ports accept for a port
+_CREATE_PORT_KWARGS = (
+    'name', 'admin_state_up', 'mac_address', 'fixed_ips', 'subnet_id',
+    'ip_address', 'security_groups', 'allowed_address_pairs',
+    'extra_dhcp_opts', 'device_owner', 'device_id', 'binding:vnic_type',
+    'binding:profile', 'port_security_enabled', 'qos_policy_id',
+    'binding:host_id',
+)
+
 
 class NetworkCloudMixin(_normalize.Normalizer):
 
     def __init__(self):
         self._ports = None
-        self._ports_time = 0
+        # Ages are measured on the monotonic clock, whose zero point is
+        # arbitrary, so start out infinitely stale rather than at 0.
+        self._ports_time = float('-inf')
         self._ports_lock = threading.Lock()
 
     @_utils.cache_on_arguments()
@@ -125,10 +157,8 @@ class NetworkCloudMixin(_normalize.Normalizer):
         # If the cloud is running nova-network, just return an empty list.
         if not self.has_service('network'):
             return []
-        # Translate None from search interface to empty {} for kwargs below
-        if not filters:
-            filters = {}
-        data = self.network.get("/networks.json", params=filters)
+        data = self._get_revalidated(
+            self.network, "/networks.json", params=filters)
         return self._get_and_munchify('networks', data)
 
     def list_routers(self, filters=None):
@@ -141,9 +171,6 @@ class NetworkCloudMixin(_normalize.Normalizer):
         # If the cloud is running nova-network, just return an empty list.
         if not self.has_service('network'):
             return []
-        # Translate None from search interface to empty {} for kwargs below
-        if not filters:
-            filters = {}
         resp = self.network.get("/routers.json", params=filters)
         data = proxy._json_response(
             resp,
@@ -160,9 +187,17 @@ class NetworkCloudMixin(_normalize.Normalizer):
         # If the cloud is running nova-network, just return an empty list.
         if not self.has_service('network'):
             return []
-        # Translate None from search interface to empty {} for kwargs below
-        if not filters:
-            filters = {}
+        # Only the unfiltered listing, which is what lookups by name or ID
+        # go through, is cached. Pushed down filters are one-off queries.
+        if filters:
+            return self._list_subnets(filters)
+        return self._list_all_subnets()
+
+    @_utils.cache_on_arguments()
+    def _list_all_subnets(self):
+        return self._list_subnets()
+
+    def _list_subnets(self, filters=None):
         data = self.network.get("/subnets.json", params=filters)
         return self._get_and_munchify('subnets', data)
 
@@ -178,7 +213,7 @@ class NetworkCloudMixin(_normalize.Normalizer):
         if filters and self._PORT_AGE == 0:
             return self._list_ports(filters)
 
-        if (time.time() - self._ports_time) >= self._PORT_AGE:
+        if (time.monotonic() - self._ports_time) >= self._PORT_AGE:
             # Since we're using cached data anyway, we don't need to
             # have more than one thread actually submit the list
             # ports task.  Let the first one submit it while holding
@@ -190,14 +225,14 @@ class NetworkCloudMixin(_normalize.Normalizer):
             if self._ports_lock.acquire(first_run):
                 try:
                     if not (first_run and self._ports is not None):
-                        self._ports = self._list_ports({})
-                        self._ports_time = time.time()
+                        self._ports = self._list_ports(None)
+                        self._ports_time = time.monotonic()
                 finally:
                     self._ports_lock.release()
         # Wrap the return with filter_list so that if filters were passed
         # but we were batching/caching and thus always fetching the whole
         # list from the cloud, we still return a filtered list.
-        return _utils._filter_list(self._ports, None, filters or {})
+        return _utils._filter_list(self._ports, None, filters)
 
     def _list_ports(self, filters):
         # If the cloud is running nova-network, just return an empty list.
@@ -261,9 +296,6 @@ class NetworkCloudMixin(_normalize.Normalizer):
             raise exc.OpenStackCloudUnavailableExtension(
                 'QoS extension is not available on target cloud')
 
-        # Translate None from search interface to empty {} for kwargs below
-        if not filters:
-            filters = {}
         resp = self.network.get("/qos/rule-types.json", params=filters)
         data = proxy._json_response(
             resp,
@@ -306,9 +338,6 @@ class NetworkCloudMixin(_normalize.Normalizer):
         if not self._has_neutron_extension('qos'):
             raise exc.OpenStackCloudUnavailableExtension(
                 'QoS extension is not available on target cloud')
-        # Translate None from search interface to empty {} for kwargs below
-        if not filters:
-            filters = {}
         resp = self.network.get("/qos/policies.json", params=filters)
         data = proxy._json_response(
             resp,
@@ -628,11 +657,37 @@ class NetworkCloudMixin(_normalize.Normalizer):
         exceptions.raise_from_response(self.network.delete(
             "/networks/{network_id}.json".format(network_id=network['id'])))
 
-        # Reset cache so the deleted network is removed
+        # Reset cache so the deleted network, and the subnets neutron
+        # deleted along with it, are removed
         self._reset_network_caches()
+        self._list_all_subnets.invalidate(self)
 
         return True
 
+    def delete_networks(self, name_or_ids):
+        """Delete several networks concurrently.
+
+        The networks are resolved from a single listing and then deleted in
+        parallel. A failure to delete one of them doesn't stop the others.
+
+        :param name_or_ids: An iterable of network names or IDs.
+
+        :returns: A dict mapping each name or ID to True if the network was
+            deleted, or False if it wasn't found.
+
+        :raises: OpenStackCloudException if a name matches several networks,
+            in which case nothing is deleted, or if any of the deletions
+            failed.
+        """
+        try:
+            return self._delete_neutron_resources(
+                'network', self.list_networks(), name_or_ids)
+        finally:
+            # Reset cache so the deleted networks, and their subnets, are
+            # removed
+            self._reset_network_caches()
+            self._list_all_subnets.invalidate(self)
+
     def set_network_quotas(self, name_or_id, **kwargs):
         """ Set a network quota in a project
 
@@ -1305,10 +1360,6 @@ class NetworkCloudMixin(_normalize.Normalizer):
                 "QoS policy {name_or_id} not Found.".format(
                     name_or_id=policy_name_or_id))
 
-        # Translate None from search interface to empty {} for kwargs below
-        if not filters:
-            filters = {}
-
         resp = self.network.get(
             "/qos/policies/{policy_id}/bandwidth_limit_rules.json".format(
                 policy_id=policy['id']),
@@ -1467,9 +1518,8 @@ class NetworkCloudMixin(_normalize.Normalizer):
                 format(policy=policy['id'], rule=rule_id)))
         except exc.OpenStackCloudURINotFound:
             self.log.debug(
-                "QoS bandwidth limit rule {rule_id} not found in policy "
-                "{policy_id}. Ignoring.".format(rule_id=rule_id,
-                                                policy_id=policy['id']))
+                "QoS bandwidth limit rule %s not found in policy %s."
+                " Ignoring.", rule_id, policy['id'])
             return False
 
         return True
@@ -1514,10 +1564,6 @@ class NetworkCloudMixin(_normalize.Normalizer):
                 "QoS policy {name_or_id} not Found.".format(
                     name_or_id=policy_name_or_id))
 
-        # Translate None from search interface to empty {} for kwargs below
-        if not filters:
-            filters = {}
-
         resp = self.network.get(
             "/qos/policies/{policy_id}/dscp_marking_rules.json".format(
                 policy_id=policy['id']),
@@ -1654,9 +1700,8 @@ class NetworkCloudMixin(_normalize.Normalizer):
                 format(policy=policy['id'], rule=rule_id)))
         except exc.OpenStackCloudURINotFound:
             self.log.debug(
-                "QoS DSCP marking rule {rule_id} not found in policy "
-                "{policy_id}. Ignoring.".format(rule_id=rule_id,
-                                                policy_id=policy['id']))
+                "QoS DSCP marking rule %s not found in policy %s."
+                " Ignoring.", rule_id, policy['id'])
             return False
 
         return True
@@ -1703,10 +1748,6 @@ class NetworkCloudMixin(_normalize.Normalizer):
                 "QoS policy {name_or_id} not Found.".format(
                     name_or_id=policy_name_or_id))
 
-        # Translate None from search interface to empty {} for kwargs below
-        if not filters:
-            filters = {}
-
         resp = self.network.get(
             "/qos/policies/{policy_id}/minimum_bandwidth_rules.json".format(
                 policy_id=policy['id']),
@@ -1847,9 +1888,8 @@ class NetworkCloudMixin(_normalize.Normalizer):
                 format(policy=policy['id'], rule=rule_id)))
         except exc.OpenStackCloudURINotFound:
             self.log.debug(
-                "QoS minimum bandwidth rule {rule_id} not found in policy "
-                "{policy_id}. Ignoring.".format(rule_id=rule_id,
-                                                policy_id=policy['id']))
+                "QoS minimum bandwidth rule %s not found in policy %s."
+                " Ignoring.", rule_id, policy['id'])
             return False
 
         return True
@@ -1929,19 +1969,19 @@ class NetworkCloudMixin(_normalize.Normalizer):
 
         :returns: A list of port ``munch.Munch`` objects.
         """
-        # Find only router interface and gateway ports, ignore L3 HA ports etc.
-        router_interfaces = self.search_ports(filters={
-            'device_id': router['id'],
-            'device_owner': 'network:router_interface'}
-        ) + self.search_ports(filters={
-            'device_id': router['id'],
-            'device_owner': 'network:router_interface_distributed'}
-        ) + self.search_ports(filters={
-            'device_id': router['id'],
-            'device_owner': 'network:ha_router_replicated_interface'})
-        router_gateways = self.search_ports(filters={
-            'device_id': router['id'],
-            'device_owner': 'network:router_gateway'})
+        # Fetch all of the router's ports at once and sort them by owner
+        # locally, rather than asking for each kind of port separately.
+        by_owner = {owner: [] for owner in _ROUTER_INTERFACE_OWNERS}
+        by_owner['network:router_gateway'] = []
+        for port in self.search_ports(filters={'device_id': router['id']}):
+            # Find only router interface and gateway ports, ignore L3 HA
+            # ports etc.
+            if port.get('device_owner') in by_owner:
+                by_owner[port['device_owner']].append(port)
+        router_interfaces = [
+            port for owner in _ROUTER_INTERFACE_OWNERS
+            for port in by_owner[owner]]
+        router_gateways = by_owner['network:router_gateway']
         ports = router_interfaces + router_gateways
 
         if interface_type:
@@ -2100,6 +2140,50 @@ class NetworkCloudMixin(_normalize.Normalizer):
 
         return True
 
+    def delete_routers(self, name_or_ids):
+        """Delete several logical routers concurrently.
+
+        The routers are resolved from a single listing and then deleted in
+        parallel. A failure to delete one of them doesn't stop the others.
+
+        :param name_or_ids: An iterable of router names or IDs.
+
+        :returns: A dict mapping each name or ID to True if the router was
+            deleted, or False if it wasn't found.
+
+        :raises: OpenStackCloudException if a name matches several routers,
+            in which case nothing is deleted, or if any of the deletions
+            failed.
+        """
+        return self._delete_neutron_resources(
+            'router', self.list_routers(), name_or_ids)
+
+    def _delete_neutron_resources(self, resource, listing, name_or_ids):
+        results = {}
+        ids = {}
+        for name_or_id in name_or_ids:
+            matches = _utils._filter_list(listing, name_or_id, None)
+            if len(matches) > 1:
+                raise exc.OpenStackCloudException(
+                    "Multiple matches found for %s" % name_or_id)
+            results[name_or_id] = bool(matches)
+            if matches:
+                ids[name_or_id] = matches[0]['id']
+
+        def _delete(name_or_id, id):
+            exceptions.raise_from_response(
+                self.network.delete(
+                    "/{resource}s/{id}.json".format(resource=resource, id=id)),
+                error_message="Error deleting {resource} {name}".format(
+                    resource=resource, name=name_or_id))
+
+        _utils._run_concurrently(
+            self._pool_executor,
+            {name_or_id: functools.partial(_delete, name_or_id, id)
+             for name_or_id, id in ids.items()},
+            "Error deleting {resource}s".format(resource=resource))
+        return results
+
     def create_subnet(self, network_name_or_id, cidr=None, ip_version=4,
                       enable_dhcp=False, subnet_name=None, tenant_id=None,
                       allocation_pools=None,
@@ -2181,12 +2265,12 @@ class NetworkCloudMixin(_normalize.Normalizer):
         """
 
         if tenant_id is not None:
-            filters = {'tenant_id': tenant_id}
+            network = self.get_network(
+                network_name_or_id, {'tenant_id': tenant_id})
+            network_id = network['id'] if network else None
         else:
-            filters = None
-
-        network = self.get_network(network_name_or_id, filters)
-        if not network:
+            network_id = self._get_network_id(network_name_or_id)
+        if not network_id:
             raise exc.OpenStackCloudException(
                 "Network %s not found." % network_name_or_id)
 
@@ -2214,38 +2298,24 @@ class NetworkCloudMixin(_normalize.Normalizer):
         # The body of the neutron message for the subnet we wish to create.
         # This includes attributes that are required or have defaults.
         subnet = dict({
-            'network_id': network['id'],
+            'network_id': network_id,
             'ip_version': ip_version,
             'enable_dhcp': enable_dhcp,
         }, **kwargs)
 
         # Add optional attributes to the message.
-        if cidr:
-            subnet['cidr'] = cidr
-        if subnet_name:
-            subnet['name'] = subnet_name
-        if tenant_id:
-            subnet['tenant_id'] = tenant_id
-        if allocation_pools:
-            subnet['allocation_pools'] = allocation_pools
-        if gateway_ip:
-            subnet['gateway_ip'] = gateway_ip
+        values = (cidr, subnet_name, tenant_id, allocation_pools, gateway_ip,
+                  dns_nameservers, host_routes, ipv6_ra_mode,
+                  ipv6_address_mode, prefixlen)
+        subnet.update(
+            {k: v for k, v in zip(_CREATE_SUBNET_OPTIONAL_KEYS, values) if v})
         if disable_gateway_ip:
             subnet['gateway_ip'] = None
-        if dns_nameservers:
-            subnet['dns_nameservers'] = dns_nameservers
-        if host_routes:
-            subnet['host_routes'] = host_routes
-        if ipv6_ra_mode:
-            subnet['ipv6_ra_mode'] = ipv6_ra_mode
-        if ipv6_address_mode:
-            subnet['ipv6_address_mode'] = ipv6_address_mode
-        if prefixlen:
-            subnet['prefixlen'] = prefixlen
         if use_default_subnetpool:
             subnet['use_default_subnetpool'] = True
 
         response = self.network.post("/subnets.json", json={"subnet": subnet})
+        self._list_all_subnets.invalidate(self)
 
         return self._get_and_munchify('subnet', response)
 
@@ -2262,13 +2332,22 @@ class NetworkCloudMixin(_normalize.Normalizer):
 
         :raises: OpenStackCloudException on operation error.
         """
-        subnet = self.get_subnet(name_or_id)
-        if not subnet:
+        subnet_id = self._get_direct_neutron_id(name_or_id)
+        if subnet_id is None:
+            subnet = self.get_subnet(name_or_id)
+            if not subnet:
+                self.log.debug("Subnet %s not found for deleting", name_or_id)
+                return False
+            subnet_id = subnet['id']
+
+        try:
+            exceptions.raise_from_response(self.network.delete(
+                "/subnets/{subnet_id}.json".format(subnet_id=subnet_id)))
+        except exc.OpenStackCloudResourceNotFound:
             self.log.debug("Subnet %s not found for deleting", name_or_id)
             return False
-
-        exceptions.raise_from_response(self.network.delete(
-            "/subnets/{subnet_id}.json".format(subnet_id=subnet['id'])))
+        finally:
+            self._list_all_subnets.invalidate(self)
         return True
 
     def update_subnet(self, name_or_id, subnet_name=None, enable_dhcp=None,
@@ -2324,21 +2403,14 @@ class NetworkCloudMixin(_normalize.Normalizer):
         :returns: The updated subnet object.
         :raises: OpenStackCloudException on operation error.
         """
-        subnet = {}
-        if subnet_name:
-            subnet['name'] = subnet_name
+        values = (subnet_name, gateway_ip, allocation_pools, dns_nameservers,
+                  host_routes)
+        subnet = {k: v for k, v in zip(_UPDATE_SUBNET_OPTIONAL_KEYS, values)
+                  if v}
         if enable_dhcp is not None:
             subnet['enable_dhcp'] = enable_dhcp
-        if gateway_ip:
-            subnet['gateway_ip'] = gateway_ip
         if disable_gateway_ip:
             subnet['gateway_ip'] = None
-        if allocation_pools:
-            subnet['allocation_pools'] = allocation_pools
-        if dns_nameservers:
-            subnet['dns_nameservers'] = dns_nameservers
-        if host_routes:
-            subnet['host_routes'] = host_routes
 
         if not subnet:
             self.log.debug("No subnet data to update")
@@ -2348,22 +2420,24 @@ class NetworkCloudMixin(_normalize.Normalizer):
             raise exc.OpenStackCloudException(
                 'arg:disable_gateway_ip is not allowed with arg:gateway_ip')
 
-        curr_subnet = self.get_subnet(name_or_id)
-        if not curr_subnet:
-            raise exc.OpenStackCloudException(
-                "Subnet %s not found." % name_or_id)
+        subnet_id = self._get_direct_neutron_id(name_or_id)
+        if subnet_id is None:
+            curr_subnet = self.get_subnet(name_or_id)
+            if not curr_subnet:
+                raise exc.OpenStackCloudException(
+                    "Subnet %s not found." % name_or_id)
+            subnet_id = curr_subnet['id']
 
         response = self.network.put(
-            "/subnets/{subnet_id}.json".format(subnet_id=curr_subnet['id']),
+            "/subnets/{subnet_id}.json".format(subnet_id=subnet_id),
             json={"subnet": subnet})
+        if response.status_code == 404:
+            raise exc.OpenStackCloudException(
+                "Subnet %s not found." % name_or_id)
+        self._list_all_subnets.invalidate(self)
         return self._get_and_munchify('subnet', response)
 
-    @_utils.valid_kwargs('name', 'admin_state_up', 'mac_address', 'fixed_ips',
-                         'subnet_id', 'ip_address', 'security_groups',
-                         'allowed_address_pairs', 'extra_dhcp_opts',
-                         'device_owner', 'device_id', 'binding:vnic_type',
-                         'binding:profile', 'port_security_enabled',
-                         'qos_policy_id', 'binding:host_id')
+    @_utils.valid_kwargs(*_CREATE_PORT_KWARGS)
     def create_port(self, network_id, **kwargs):
         """Create a port
 
@@ -2429,6 +2503,40 @@ class NetworkCloudMixin(_normalize.Normalizer):
                 network_id))
         return self._get_and_munchify('port', data)
 
+    def create_ports(self, ports):
+        """Create several ports at once
+
+        All of the ports are created in a single bulk request to neutron,
+        which either creates all of them or none. This needs neutron's
+        ``allow_bulk`` option, which is on by default.
+
+        :param list ports:
+            A list of dicts, each holding the arguments that
+            :meth:`create_port` accepts, including ``network_id``.
+
+        :returns: A list of ``munch.Munch`` describing the created ports, in
+            the order they were given.
+
+        :raises: ``OpenStackCloudException`` on operation error.
+        """
+        ports = list(ports)
+        for port in ports:
+            if 'network_id' not in port:
+                raise exc.OpenStackCloudException(
+                    "network_id is required for every port")
+            for k in port:
+                if k != 'network_id' and k not in _CREATE_PORT_KWARGS:
+                    raise TypeError(
+                        "create_ports() got an unexpected port argument "
+                        "'{arg}'".format(arg=k))
+        if not ports:
+            return []
+
+        data = proxy._json_response(
+            self.network.post("/ports.json", json={'ports': ports}),
+            error_message="Error creating ports")
+        return self._get_and_munchify('ports', data)
+
     @_utils.valid_kwargs('name', 'admin_state_up', 'fixed_ips',
                          'security_groups', 'allowed_address_pairs',
                          'extra_dhcp_opts', 'device_owner', 'device_id',
@@ -2489,16 +2597,23 @@ class NetworkCloudMixin(_normalize.Normalizer):
 
         :raises: OpenStackCloudException on operation error.
         """
-        port = self.get_port(name_or_id=name_or_id)
-        if port is None:
+        port_id = self._get_direct_neutron_id(name_or_id)
+        if port_id is None:
+            port = self.get_port(name_or_id=name_or_id)
+            if port is None:
+                raise exc.OpenStackCloudException(
+                    "failed to find port '{port}'".format(port=name_or_id))
+            port_id = port['id']
+
+        try:
+            data = proxy._json_response(
+                self.network.put(
+                    "/ports/{port_id}.json".format(port_id=port_id),
+                    json={"port": kwargs}),
+                error_message="Error updating port {0}".format(name_or_id))
+        except exc.OpenStackCloudResourceNotFound:
             raise exc.OpenStackCloudException(
                 "failed to find port '{port}'".format(port=name_or_id))
-
-        data = proxy._json_response(
-            self.network.put(
-                "/ports/{port_id}.json".format(port_id=port['id']),
-                json={"port": kwargs}),
-            error_message="Error updating port {0}".format(name_or_id))
         return self._get_and_munchify('port', data)
 
     def delete_port(self, name_or_id):
@@ -2510,17 +2625,33 @@ class NetworkCloudMixin(_normalize.Normalizer):
 
         :raises: OpenStackCloudException on operation error.
         """
-        port = self.get_port(name_or_id=name_or_id)
-        if port is None:
+        port_id = self._get_direct_neutron_id(name_or_id)
+        if port_id is None:
+            port = self.get_port(name_or_id=name_or_id)
+            if port is None:
+                self.log.debug("Port %s not found for deleting", name_or_id)
+                return False
+            port_id = port['id']
+
+        try:
+            exceptions.raise_from_response(
+                self.network.delete(
+                    "/ports/{port_id}.json".format(port_id=port_id)),
+                error_message="Error deleting port {0}".format(name_or_id))
+        except exc.OpenStackCloudResourceNotFound:
             self.log.debug("Port %s not found for deleting", name_or_id)
             return False
-
-        exceptions.raise_from_response(
-            self.network.delete(
-                "/ports/{port_id}.json".format(port_id=port['id'])),
-            error_message="Error deleting port {0}".format(name_or_id))
         return True
 
+    def _get_direct_neutron_id(self, name_or_id):
+        # With use_direct_get, UUID-like values are taken to be IDs, just as
+        # they are for lookups. Writes can then go straight to the resource
+        # and let a 404 tell that it's missing, instead of fetching it first.
+        if (getattr(self, 'use_direct_get', False)
+                and _utils._is_uuid_like(name_or_id)):
+            return name_or_id
+        return None
+
     def _get_port_ids(self, name_or_id_list, filters=None):
         """
         Takes a list of port names or ids, retrieves ports and returns a list
@@ -2542,8 +2673,12 @@ class NetworkCloudMixin(_normalize.Normalizer):
             ids_list.append(port['id'])
         return ids_list
 
-    def _build_external_gateway_info(self, ext_gateway_net_id, enable_snat,
+    @staticmethod
+    def _build_external_gateway_info(ext_gateway_net_id, enable_snat,
                                      ext_fixed_ips):
+        if (not ext_gateway_net_id and enable_snat is None
+                and not ext_fixed_ips):
+            return None
         info = {}
         if ext_gateway_net_id:
             info['network_id'] = ext_gateway_net_id
@@ -14,11 +14,16 @@
 # We can't just use list, because sphinx gets confused by
 # openstack.resource.Resource.list and openstack.resource2.Resource.list
 import threading
+import time
 import types  # noqa
 
 from openstack.cloud import exc
 from openstack.cloud import _normalize
 
+# Seconds to remember which network a name or ID given to create_server
+# resolved to.
+_NETWORK_ID_AGE = 300
+
 
 class NetworkCommonCloudMixin(_normalize.Normalizer):
     """Shared networking functions used by FloatingIP, Network, Compute classes
@@ -61,6 +66,8 @@ class NetworkCommonCloudMixin(_normalize.Normalizer):
             self._nat_source_network = None
             self._default_network_network = None
             self._network_list_stamp = False
+            # name or ID -> (network ID, monotonic time of the lookup)
+            self._network_ids = {}
 
     def _set_interesting_networks(self):
         external_ipv4_networks = []
@@ -287,6 +294,27 @@ class NetworkCommonCloudMixin(_normalize.Normalizer):
         self._find_interesting_networks()
         return self._nat_source_network
 
+    def _get_network_id(self, name_or_id):
+        """Return the ID of a network, or None if it can't be found.
+
+        Servers and subnets tend to be created on the same few networks
+        over and over, so the answer is remembered for a while rather than
+        looking the network up again every time.
+        """
+        now = time.monotonic()
+        with self._networks_lock:
+            cached = self._network_ids.get(name_or_id)
+        if cached and now - cached[1] < _NETWORK_ID_AGE:
+            return cached[0]
+
+        network = self.get_network(name_or_id=name_or_id)
+        if not network:
+            return None
+        with self._networks_lock:
+            self._network_ids[name_or_id] = (network['id'], now)
+            self._network_ids[network['id']] = (network['id'], now)
+        return network['id']
+
     def get_default_network(self):
         """Return the network that is configured to be the default interface.
 
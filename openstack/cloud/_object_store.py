@@ -33,21 +33,33 @@ from openstack import proxy
 DEFAULT_OBJECT_SEGMENT_SIZE = 1073741824  # 1GB
 # This halves the current default for Swift
 DEFAULT_MAX_FILE_SIZE = (5 * 1024 * 1024 * 1024 + 2) / 2
+# Large enough that hashlib does the work (without the GIL) rather than the
+# read loop, small enough not to matter for memory
+HASH_CHUNK_SIZE = 1024 * 1024  # 1MB
 
 
 OBJECT_CONTAINER_ACLS = {
     'public': '.r:*,.rlistings',
     'private': '',
 }
+_OBJECT_CONTAINER_ACCESS_BY_ACL = {
+    acl: access for access, acl in OBJECT_CONTAINER_ACLS.items()}
 
 
 class ObjectStoreCloudMixin(_normalize.Normalizer):
 
+    def __init__(self):
+        # (max_file_size, min_segment_size) of the cluster, which does not
+        # change under us, so it is only looked up once per connection.
+        self._object_segment_limits = None
+
     @property
     def _object_store_client(self):
         if 'object-store' not in self._raw_clients:
-            raw_client = self._get_raw_client('object-store')
-            self._raw_clients['object-store'] = raw_client
+            with self._raw_clients_lock:
+                if 'object-store' not in self._raw_clients:
+                    raw_client = self._get_raw_client('object-store')
+                    self._raw_clients['object-store'] = raw_client
         return self._raw_clients['object-store']
 
     def list_containers(self, full_listing=True, prefix=None):
@@ -188,41 +200,56 @@ class ObjectStoreCloudMixin(_normalize.Normalizer):
         if not container:
             raise exc.OpenStackCloudException("Container not found: %s" % name)
         acl = container.get('x-container-read', '')
-        for key, value in OBJECT_CONTAINER_ACLS.items():
-            # Convert to string for the comparison because swiftclient
-            # returns byte values as bytes sometimes and apparently ==
-            # on bytes doesn't work like you'd think
-            if str(acl) == str(value):
-                return key
-        raise exc.OpenStackCloudException(
-            "Could not determine container access for ACL: %s." % acl)
+        try:
+            # Convert to string for the lookup because swiftclient
+            # returns byte values as bytes sometimes
+            return _OBJECT_CONTAINER_ACCESS_BY_ACL[str(acl)]
+        except KeyError:
+            raise exc.OpenStackCloudException(
+                "Could not determine container access for ACL: %s." % acl)
 
     def _get_file_hashes(self, filename):
-        file_key = "{filename}:{mtime}".format(
-            filename=filename,
-            mtime=os.stat(filename).st_mtime)
-        if file_key not in self._file_hash_cache:
+        # A file rewritten within the mtime resolution of the filesystem
+        # usually changes size too, and one replaced by another file (say a
+        # copy that kept its mtime) changes inode, so key on all of them.
+        stat = os.stat(filename)
+        file_key = (filename, stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        hashes = self._file_hash_cache.get(file_key)
+        if hashes is None and self._file_hash_store:
+            stored = self._file_hash_store.get(
+                os.path.abspath(filename), stat)
+            if stored:
+                hashes = dict(md5=stored[0], sha256=stored[1])
+                self._file_hash_cache[file_key] = hashes
+        if hashes is None:
             self.log.debug(
                 'Calculating hashes for %(filename)s', {'filename': filename})
-            (md5, sha256) = (None, None)
             with open(filename, 'rb') as file_obj:
                 (md5, sha256) = self._calculate_data_hashes(file_obj)
-            self._file_hash_cache[file_key] = dict(
-                md5=md5, sha256=sha256)
+            hashes = dict(md5=md5, sha256=sha256)
+            self._file_hash_cache[file_key] = hashes
+            if self._file_hash_store:
+                self._file_hash_store.set(
+                    os.path.abspath(filename), stat, md5, sha256)
             self.log.debug(
                 "Image file %(filename)s md5:%(md5)s sha256:%(sha256)s",
-                {'filename': filename,
-                 'md5': self._file_hash_cache[file_key]['md5'],
-                 'sha256': self._file_hash_cache[file_key]['sha256']})
-        return (self._file_hash_cache[file_key]['md5'],
-                self._file_hash_cache[file_key]['sha256'])
+                {'filename': filename, 'md5': md5, 'sha256': sha256})
+        return (hashes['md5'], hashes['sha256'])
 
     def _calculate_data_hashes(self, data):
         md5 = hashlib.md5()
         sha256 = hashlib.sha256()
 
-        if hasattr(data, 'read'):
-            for chunk in iter(lambda: data.read(8192), b''):
+        if hasattr(data, 'readinto'):
+            # Read every chunk into the same buffer instead of allocating
+            # a new bytes object for each one.
+            buf = bytearray(HASH_CHUNK_SIZE)
+            view = memoryview(buf)
+            for size in iter(lambda: data.readinto(buf), 0):
+                md5.update(view[:size])
+                sha256.update(view[:size])
+        elif hasattr(data, 'read'):
+            for chunk in iter(lambda: data.read(HASH_CHUNK_SIZE), b''):
                 md5.update(chunk)
                 sha256.update(chunk)
         else:
@@ -250,35 +277,39 @@ class ObjectStoreCloudMixin(_normalize.Normalizer):
         """Get a segment size that will work given capabilities"""
         if segment_size is None:
             segment_size = DEFAULT_OBJECT_SEGMENT_SIZE
-        min_segment_size = 0
+        if self._object_segment_limits is None:
+            self._object_segment_limits = self._get_object_segment_limits()
+        server_max_file_size, min_segment_size = self._object_segment_limits
+
+        if segment_size > server_max_file_size:
+            return server_max_file_size
+        if segment_size < min_segment_size:
+            return min_segment_size
+        return segment_size
+
+    def _get_object_segment_limits(self):
         try:
             caps = self.get_object_capabilities()
         except exc.OpenStackCloudHTTPError as e:
             if e.response.status_code in (404, 412):
-                server_max_file_size = DEFAULT_MAX_FILE_SIZE
                 self.log.info(
                     "Swift capabilities not supported. "
                     "Using default max file size.")
-            else:
-                raise
-        else:
-            server_max_file_size = caps.get('swift', {}).get('max_file_size',
-                                                             0)
-            min_segment_size = caps.get('slo', {}).get('min_segment_size', 0)
-
-        if segment_size > server_max_file_size:
-            return server_max_file_size
-        if segment_size < min_segment_size:
-            return min_segment_size
-        return segment_size
+                return DEFAULT_MAX_FILE_SIZE, 0
+            raise
+        return (
+            caps.get('swift', {}).get('max_file_size', 0),
+            caps.get('slo', {}).get('min_segment_size', 0))
 
     def is_object_stale(
-            self, container, name, filename, file_md5=None, file_sha256=None):
+            self, container, name, filename=None, file_md5=None,
+            file_sha256=None):
         """Check to see if an object matches the hashes of a file.
 
         :param container: Name of the container.
         :param name: Name of the object.
-        :param filename: Path to the file.
+        :param filename: Path to the file. Only read when neither hash
+            is given.
         :param file_md5:
             Pre-calculated md5 of the file contents. Defaults to None which
             means calculate locally.
@@ -289,17 +320,22 @@ class ObjectStoreCloudMixin(_normalize.Normalizer):
         metadata = self.get_object_metadata(container, name)
         if not metadata:
             self.log.debug(
-                "swift stale check, no object: {container}/{name}".format(
-                    container=container, name=name))
+                "swift stale check, no object: %s/%s", container, name)
             return True
 
-        if not (file_md5 or file_sha256):
-            (file_md5, file_sha256) = self._get_file_hashes(filename)
         md5_key = metadata.get(
             self._OBJECT_MD5_KEY, metadata.get(self._SHADE_OBJECT_MD5_KEY, ''))
         sha256_key = metadata.get(
             self._OBJECT_SHA256_KEY, metadata.get(
                 self._SHADE_OBJECT_SHA256_KEY, ''))
+        if not (md5_key or sha256_key):
+            # Nothing to compare against, so don't bother hashing the file
+            self.log.debug(
+                "swift stale check, no checksums: %s/%s", container, name)
+            return True
+
+        if filename and not (file_md5 or file_sha256):
+            (file_md5, file_sha256) = self._get_file_hashes(filename)
         up_to_date = self._hashes_up_to_date(
             md5=file_md5, sha256=file_sha256,
             md5_key=md5_key, sha256_key=sha256_key)
@@ -433,7 +469,9 @@ class ObjectStoreCloudMixin(_normalize.Normalizer):
         segment_size = self.get_object_segment_size(segment_size)
         file_size = os.path.getsize(filename)
 
-        if self.is_object_stale(container, name, filename, md5, sha256):
+        if self.is_object_stale(
+                container, name, filename,
+                file_md5=md5, file_sha256=sha256):
 
             self.log.debug(
                 "swift uploading %(filename)s to %(endpoint)s",
@@ -23,11 +23,8 @@ from openstack.cloud import _utils
 
 def _no_pending_stacks(stacks):
     """If there are any stacks not in a steady state, don't cache"""
-    for stack in stacks:
-        status = stack['stack_status']
-        if '_COMPLETE' not in status and '_FAILED' not in status:
-            return False
-    return True
+    return all(s['stack_status'].endswith(('_COMPLETE', '_FAILED'))
+               for s in stacks)
 
 
 class OrchestrationCloudMixin(_normalize.Normalizer):
@@ -35,8 +32,10 @@ class OrchestrationCloudMixin(_normalize.Normalizer):
     @property
     def _orchestration_client(self):
         if 'orchestration' not in self._raw_clients:
-            raw_client = self._get_raw_client('orchestration')
-            self._raw_clients['orchestration'] = raw_client
+            with self._raw_clients_lock:
+                if 'orchestration' not in self._raw_clients:
+                    raw_client = self._get_raw_client('orchestration')
+                    self._raw_clients['orchestration'] = raw_client
         return self._raw_clients['orchestration']
 
     def get_template_contents(
@@ -90,9 +89,11 @@ class OrchestrationCloudMixin(_normalize.Normalizer):
             environment_files=environment_files
         ))
         self.orchestration.create_stack(name=name, **params)
+        self.list_stacks.invalidate(self)
         if wait:
             event_utils.poll_for_events(self, stack_name=name,
                                         action='CREATE')
+            self.list_stacks.invalidate(self)
         return self.get_stack(name)
 
     def update_stack(
@@ -145,12 +146,14 @@ class OrchestrationCloudMixin(_normalize.Normalizer):
 
         # Not to cause update of ID field pass stack as dict
         self.orchestration.update_stack(stack={'id': name_or_id}, **params)
+        self.list_stacks.invalidate(self)
 
         if wait:
             event_utils.poll_for_events(self,
                                         name_or_id,
                                         action='UPDATE',
                                         marker=marker)
+            self.list_stacks.invalidate(self)
         return self.get_stack(name_or_id)
 
     def delete_stack(self, name_or_id, wait=False):
@@ -164,6 +167,18 @@ class OrchestrationCloudMixin(_normalize.Normalizer):
         :raises: ``OpenStackCloudException`` if something goes wrong during
             the OpenStack API call
         """
+        if not wait and _utils._is_uuid_like(name_or_id):
+            # Heat deletes by ID directly, so there's no need to look the
+            # stack up first; a 404 tells us it wasn't there.
+            try:
+                self.orchestration.delete_stack(
+                    name_or_id, ignore_missing=False)
+            except exc.OpenStackCloudResourceNotFound:
+                self.log.debug("Stack %s not found for deleting", name_or_id)
+                return False
+            self.list_stacks.invalidate(self)
+            return True
+
         stack = self.get_stack(name_or_id, resolve_outputs=False)
         if stack is None:
             self.log.debug("Stack %s not found for deleting", name_or_id)
@@ -176,6 +191,7 @@ class OrchestrationCloudMixin(_normalize.Normalizer):
             marker = events[0].id if events else None
 
         self.orchestration.delete_stack(stack)
+        self.list_stacks.invalidate(self)
 
         if wait:
             try:
@@ -190,6 +206,7 @@ class OrchestrationCloudMixin(_normalize.Normalizer):
                 raise exc.OpenStackCloudException(
                     "Failed to delete stack {id}: {reason}".format(
                         id=name_or_id, reason=stack['stack_status_reason']))
+            self.list_stacks.invalidate(self)
 
         return True
 
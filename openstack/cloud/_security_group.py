@@ -14,6 +14,7 @@
 # We can't just use list, because sphinx gets confused by
 # openstack.resource.Resource.list and openstack.resource2.Resource.list
 # import jsonpatch
+import functools
 import types  # noqa
 
 from openstack.cloud import exc
@@ -22,6 +23,13 @@ from openstack.cloud import _utils
 from openstack import exceptions
 from openstack import proxy
 
+# Port range nova uses for a rule when no ports are given for the protocol
+_NOVA_DEFAULT_PORTS = {
+    'icmp': (-1, -1),
+    'tcp': (1, 65535),
+    'udp': (1, 65535),
+}
+
 
 class SecurityGroupCloudMixin(_normalize.Normalizer):
 
@@ -298,75 +306,152 @@ class SecurityGroupCloudMixin(_normalize.Normalizer):
                 "Security group %s not found." % secgroup_name_or_id)
 
         if self._use_neutron_secgroups():
-            # NOTE: Nova accepts -1 port numbers, but Neutron accepts None
-            # as the equivalent value.
-            rule_def = {
-                'security_group_id': secgroup['id'],
-                'port_range_min':
-                    None if port_range_min == -1 else port_range_min,
-                'port_range_max':
-                    None if port_range_max == -1 else port_range_max,
-                'protocol': protocol,
-                'remote_ip_prefix': remote_ip_prefix,
-                'remote_group_id': remote_group_id,
-                'direction': direction,
-                'ethertype': ethertype
-            }
-            if project_id is not None:
-                rule_def['tenant_id'] = project_id
-
+            rule_def = self._neutron_secgroup_rule_def(
+                secgroup['id'], port_range_min=port_range_min,
+                port_range_max=port_range_max, protocol=protocol,
+                remote_ip_prefix=remote_ip_prefix,
+                remote_group_id=remote_group_id, direction=direction,
+                ethertype=ethertype, project_id=project_id)
             return self.network.create_security_group_rule(
                 **rule_def
             )
         else:
-            # NOTE: Neutron accepts None for protocol. Nova does not.
-            if protocol is None:
-                raise exc.OpenStackCloudException('Protocol must be specified')
-
-            if direction == 'egress':
-                self.log.debug(
-                    'Rule creation failed: Nova does not support egress rules'
-                )
-                raise exc.OpenStackCloudException(
-                    'No support for egress rules')
-
-            # NOTE: Neutron accepts None for ports, but Nova requires -1
-            # as the equivalent value for ICMP.
-            #
-            # For TCP/UDP, if both are None, Neutron allows this and Nova
-            # represents this as all ports (1-65535). Nova does not accept
-            # None values, so to hide this difference, we will automatically
-            # convert to the full port range. If only a single port value is
-            # specified, it will error as normal.
-            if protocol == 'icmp':
-                if port_range_min is None:
-                    port_range_min = -1
-                if port_range_max is None:
-                    port_range_max = -1
-            elif protocol in ['tcp', 'udp']:
-                if port_range_min is None and port_range_max is None:
-                    port_range_min = 1
-                    port_range_max = 65535
-
-            security_group_rule_dict = dict(security_group_rule=dict(
-                parent_group_id=secgroup['id'],
-                ip_protocol=protocol,
-                from_port=port_range_min,
-                to_port=port_range_max,
-                cidr=remote_ip_prefix,
-                group_id=remote_group_id
+            return self._create_nova_secgroup_rule(
+                secgroup['id'], port_range_min=port_range_min,
+                port_range_max=port_range_max, protocol=protocol,
+                remote_ip_prefix=remote_ip_prefix,
+                remote_group_id=remote_group_id, direction=direction,
+                ethertype=ethertype, project_id=project_id)
+
+    def _create_nova_secgroup_rule(self, secgroup_id,
+                                   port_range_min=None,
+                                   port_range_max=None,
+                                   protocol=None,
+                                   remote_ip_prefix=None,
+                                   remote_group_id=None,
+                                   direction='ingress',
+                                   ethertype='IPv4',
+                                   project_id=None):
+        # NOTE: Neutron accepts None for protocol. Nova does not.
+        if protocol is None:
+            raise exc.OpenStackCloudException('Protocol must be specified')
+
+        if direction == 'egress':
+            self.log.debug(
+                'Rule creation failed: Nova does not support egress rules'
+            )
+            raise exc.OpenStackCloudException(
+                'No support for egress rules')
+
+        # NOTE: Neutron accepts None for ports, but Nova requires -1
+        # as the equivalent value for ICMP.
+        #
+        # For TCP/UDP, if both are None, Neutron allows this and Nova
+        # represents this as all ports (1-65535). Nova does not accept
+        # None values, so to hide this difference, we will automatically
+        # convert to the full port range. If only a single port value is
+        # specified, it will error as normal.
+        if port_range_min is None and port_range_max is None:
+            port_range_min, port_range_max = _NOVA_DEFAULT_PORTS.get(
+                protocol, (None, None))
+        elif protocol == 'icmp':
+            if port_range_min is None:
+                port_range_min = -1
+            if port_range_max is None:
+                port_range_max = -1
+
+        security_group_rule_dict = dict(security_group_rule=dict(
+            parent_group_id=secgroup_id,
+            ip_protocol=protocol,
+            from_port=port_range_min,
+            to_port=port_range_max,
+            cidr=remote_ip_prefix,
+            group_id=remote_group_id
+        ))
+        if project_id is not None:
+            security_group_rule_dict[
+                'security_group_rule']['tenant_id'] = project_id
+        data = proxy._json_response(
+            self.compute.post(
+                '/os-security-group-rules',
+                json=security_group_rule_dict
             ))
-            if project_id is not None:
-                security_group_rule_dict[
-                    'security_group_rule']['tenant_id'] = project_id
-            data = proxy._json_response(
-                self.compute.post(
-                    '/os-security-group-rules',
-                    json=security_group_rule_dict
-                ))
         return self._normalize_secgroup_rule(
             self._get_and_munchify('security_group_rule', data))
 
+    def create_security_group_rules(self, rules):
+        """Create several security group rules at once
+
+        Each security group is looked up only once. With neutron all of the
+        rules are then created in a single bulk request. Nova has no bulk
+        API, so there the rules are created one by one.
+
+        :param list rules:
+            A list of dicts, each holding the arguments that
+            :meth:`create_security_group_rule` accepts, including
+            ``secgroup_name_or_id``.
+
+        :returns: A list of ``munch.Munch`` representing the new security
+            group rules.
+
+        :raises: OpenStackCloudException on operation error.
+        """
+        # Security groups not supported
+        if not self._has_secgroups():
+            raise exc.OpenStackCloudUnavailableFeature(
+                "Unavailable feature: security groups"
+            )
+
+        secgroup_ids = {}
+        group_rules = []
+        for rule in rules:
+            rule = dict(rule)
+            name_or_id = rule.pop('secgroup_name_or_id')
+            if name_or_id not in secgroup_ids:
+                secgroup = self.get_security_group(name_or_id)
+                if not secgroup:
+                    raise exc.OpenStackCloudException(
+                        "Security group %s not found." % name_or_id)
+                secgroup_ids[name_or_id] = secgroup['id']
+            group_rules.append((secgroup_ids[name_or_id], rule))
+
+        if not self._use_neutron_secgroups():
+            return [self._create_nova_secgroup_rule(secgroup_id, **rule)
+                    for secgroup_id, rule in group_rules]
+
+        rule_defs = [self._neutron_secgroup_rule_def(secgroup_id, **rule)
+                     for secgroup_id, rule in group_rules]
+        if not rule_defs:
+            return []
+        return list(self.network.create_security_group_rules(rule_defs))
+
+    def _neutron_secgroup_rule_def(self, secgroup_id,
+                                   port_range_min=None,
+                                   port_range_max=None,
+                                   protocol=None,
+                                   remote_ip_prefix=None,
+                                   remote_group_id=None,
+                                   direction='ingress',
+                                   ethertype='IPv4',
+                                   project_id=None):
+        # NOTE: Nova accepts -1 port numbers, but Neutron accepts None
+        # as the equivalent value.
+        rule_def = {
+            'security_group_id': secgroup_id,
+            'port_range_min':
+                None if port_range_min == -1 else port_range_min,
+            'port_range_max':
+                None if port_range_max == -1 else port_range_max,
+            'protocol': protocol,
+            'remote_ip_prefix': remote_ip_prefix,
+            'remote_group_id': remote_group_id,
+            'direction': direction,
+            'ethertype': ethertype
+        }
+        if project_id is not None:
+            rule_def['tenant_id'] = project_id
+        return rule_def
+
     def delete_security_group_rule(self, rule_id):
         """Delete a security group rule
 
@@ -401,6 +486,43 @@ class SecurityGroupCloudMixin(_normalize.Normalizer):
 
             return True
 
+    def delete_security_group_rules(self, rule_ids):
+        """Delete several security group rules concurrently.
+
+        The rules are deleted in parallel on the connection's thread pool. A
+        failure to delete one of them doesn't stop the others.
+
+        :param rule_ids: An iterable of security group rule IDs.
+
+        :returns: A dict mapping each rule ID to True if the rule was
+            deleted, or False if it wasn't found.
+
+        :raises: OpenStackCloudException if any of the deletions failed.
+        :raises: OpenStackCloudUnavailableFeature if security groups are
+                 not supported on this cloud.
+        """
+        # Security groups not supported
+        if not self._has_secgroups():
+            raise exc.OpenStackCloudUnavailableFeature(
+                "Unavailable feature: security groups"
+            )
+
+        def _delete(rule_id):
+            try:
+                return self.delete_security_group_rule(rule_id)
+            except exceptions.ResourceNotFound:
+                return False
+            except exc.OpenStackCloudException as e:
+                raise exc.OpenStackCloudException(
+                    "Error deleting security group rule {rule_id}: "
+                    "{error}".format(rule_id=rule_id, error=e))
+
+        return _utils._run_concurrently(
+            self._pool_executor,
+            {rule_id: functools.partial(_delete, rule_id)
+             for rule_id in rule_ids},
+            "Error deleting security group rules")
+
     def _has_secgroups(self):
         if not self.secgroup_source:
             return False
@@ -12,19 +12,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import contextlib
+import collections
+import collections.abc
 import fnmatch
 import functools
 import inspect
 import jmespath
 import munch
 import netifaces
+import os
 import re
+import sqlite3
 import sre_constants
+import threading
 import time
 import uuid
 
 from decorator import decorator
+import keystoneauth1.exceptions
 
 from openstack import _log
 from openstack.cloud import exc
@@ -32,6 +37,18 @@ from openstack.cloud import meta
 
 _decorated_methods = []
 
+# Characters that make a name_or_id a glob pattern for fnmatch
+_GLOB_CHARS = re.compile(r'[*?[]')
+
+# Ceiling, in seconds, for wait loops that back off between polls. Every
+# loop waiting on a resource through the API backs off to this, with
+# _POLL_JITTER; loops that poll local state or a cache age do not.
+_MAX_POLL_INTERVAL = 30
+# Fraction by which those polls are randomly spread out
+_POLL_JITTER = 0.2
+# Consecutive transient errors a wait loop puts up with before giving up
+_MAX_POLL_FAILURES = 5
+
 
 def _make_unicode(input):
     """Turn an input into unicode unconditionally
@@ -92,6 +109,15 @@ def _filter_list(data, name_or_id, filters):
     if name_or_id:
         # name_or_id might already be unicode
         name_or_id = _make_unicode(name_or_id)
+    if name_or_id and not _GLOB_CHARS.search(name_or_id):
+        # Without any wildcards the pattern can only match exactly, which
+        # is by far the common case (every get_* call), so skip building
+        # and running the regex for each entry.
+        data = [
+            e for e in data
+            if (_make_unicode(e.get('id', None)) == name_or_id
+                or _make_unicode(e.get('name', None)) == name_or_id)]
+    elif name_or_id:
         identifier_matches = []
         bad_pattern = False
         try:
@@ -129,29 +155,35 @@ def _filter_list(data, name_or_id, filters):
     if isinstance(filters, str):
         return jmespath.search(filters, data)
 
-    def _dict_filter(f, d):
-        if not d:
-            return False
-        for key in f.keys():
-            if isinstance(f[key], dict):
-                if not _dict_filter(f[key], d.get(key, None)):
-                    return False
-            elif d.get(key, None) != f[key]:
+    predicate = _compile_filter(filters)
+    return [e for e in data if predicate(e)]
+
+
+def _compile_filter(filters):
+    """Turn a dict of filters into a predicate on a single entry.
+
+    The filter dict is walked once up front, splitting plain key/value
+    comparisons from nested dicts, so that checking each entry doesn't
+    have to re-inspect the type of every filter value.
+    """
+    plain = []
+    nested = []
+    for key, value in filters.items():
+        if isinstance(value, dict):
+            nested.append((key, _compile_filter(value)))
+        else:
+            plain.append((key, value))
+
+    def predicate(d):
+        for key, value in plain:
+            if d.get(key, None) != value:
+                return False
+        for key, sub_predicate in nested:
+            sub = d.get(key, None)
+            if not sub or not sub_predicate(sub):
                 return False
         return True
-
-    filtered = []
-    for e in data:
-        filtered.append(e)
-        for key in filters.keys():
-            if isinstance(filters[key], dict):
-                if not _dict_filter(filters[key], e.get(key, None)):
-                    filtered.pop()
-                    break
-            elif e.get(key, None) != filters[key]:
-                filtered.pop()
-                break
-    return filtered
+    return predicate
 
 
 def _get_entity(cloud, resource, name_or_id, filters, **kwargs):
@@ -359,16 +391,22 @@ def valid_kwargs(*valid_args):
     # def my_func(self, mandatory_arg1, mandatory_arg2, **kwargs):
     #   ...
     #
-    @decorator
-    def func_wrapper(func, *args, **kwargs):
-        argspec = inspect.getargspec(func)
-        for k in kwargs:
-            if k not in argspec.args[1:] and k not in valid_args:
-                raise TypeError(
-                    "{f}() got an unexpected keyword argument "
-                    "'{arg}'".format(f=inspect.stack()[1][3], arg=k))
-        return func(*args, **kwargs)
-    return func_wrapper
+    def _valid_kwargs(func):
+        # The accepted names are fixed per function, so work them out once
+        # here rather than inspecting the function on every call.
+        argspec = inspect.getfullargspec(func)
+        allowed = frozenset(valid_args).union(
+            argspec.args[1:], argspec.kwonlyargs)
+
+        def func_wrapper(func, *args, **kwargs):
+            for k in kwargs:
+                if k not in allowed:
+                    raise TypeError(
+                        "{f}() got an unexpected keyword argument "
+                        "'{arg}'".format(f=func.__name__, arg=k))
+            return func(*args, **kwargs)
+        return decorator(func_wrapper, func)
+    return _valid_kwargs
 
 
 def _func_wrap(f):
@@ -398,7 +436,21 @@ def cache_on_arguments(*cache_on_args, **cache_on_kwargs):
                 _cache_name).cache_on_arguments()(func).invalidate(
                     *args, **kwargs)
 
+        def replace_item(obj, item, *args, **kwargs):
+            # Splice an updated entry into a cached listing instead of
+            # dropping the whole listing when only one entry changed.
+            cached = obj._get_cache(
+                _cache_name).cache_on_arguments()(func)
+            items = cached.get(*args, **kwargs)
+            if not isinstance(items, list):
+                # Nothing cached (or expired) for these arguments
+                return
+            cached.set(
+                [item if i['id'] == item['id'] else i for i in items],
+                *args, **kwargs)
+
         _cache_decorator.invalidate = invalidate
+        _cache_decorator.replace_item = replace_item
         _cache_decorator.func = func
         _decorated_methods.append(func.__name__)
 
@@ -406,12 +458,13 @@ def cache_on_arguments(*cache_on_args, **cache_on_kwargs):
     return _inner_cache_on_arguments
 
 
-@contextlib.contextmanager
-def shade_exceptions(error_message=None):
+class shade_exceptions(object):
     """Context manager for dealing with shade exceptions.
 
     :param string error_message: String to use for the exception message
         content on non-OpenStackCloudExceptions.
+    :param fields: Values to format error_message with. The message is only
+        formatted when an exception is actually wrapped.
 
     Useful for avoiding wrapping shade OpenStackCloudException exceptions
     within themselves. Code called from within the context may throw such
@@ -421,13 +474,28 @@ def shade_exceptions(error_message=None):
     be wrapped and the exception message will be appended to the given error
     message.
     """
-    try:
-        yield
-    except exc.OpenStackCloudException:
-        raise
-    except Exception as e:
+
+    # This wraps most cloud calls, so it is a plain class rather than a
+    # contextlib.contextmanager, which sets up a generator on every use.
+    __slots__ = ('error_message', 'fields')
+
+    def __init__(self, error_message=None, **fields):
+        self.error_message = error_message
+        self.fields = fields
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None or not issubclass(exc_type, Exception):
+            return False
+        if issubclass(exc_type, exc.OpenStackCloudException):
+            return False
+        error_message = self.error_message
         if error_message is None:
-            error_message = str(e)
+            error_message = str(exc_value)
+        elif self.fields:
+            error_message = error_message.format(**self.fields)
         raise exc.OpenStackCloudException(error_message)
 
 
@@ -549,6 +617,73 @@ def _call_client_and_retry(client, url, retry_on=None,
         return ret_val
 
 
+def _poll_tolerating_transient(poll, timeouts, what):
+    """Call poll once per step of a wait loop, waiting out transient errors.
+
+    Only server side and connection errors may go away on their own, so
+    only those are retried, and no more than _MAX_POLL_FAILURES times in a
+    row. Anything else (a deleted resource, a permission problem) is raised
+    right away.
+
+    :param poll: Callable returning the current state of the resource.
+    :param timeouts: The iterable driving the wait loop, usually from
+                     :func:`openstack.utils.iterate_timeout`.
+    :param string what: Description of the resource for the debug log.
+
+    :returns: A generator of the results of each successful poll.
+    """
+    log = _log.setup_logging('openstack')
+    failures = 0
+    for count in timeouts:
+        try:
+            result = poll()
+        except (exc.OpenStackCloudHTTPError,
+                keystoneauth1.exceptions.ConnectionError) as e:
+            status_code = getattr(e, 'status_code', None)
+            failures += 1
+            if ((status_code and status_code < 500)
+                    or failures >= _MAX_POLL_FAILURES):
+                raise
+            log.debug("Error getting %s info", what, exc_info=True)
+            continue
+        failures = 0
+        yield result
+
+
+def _run_concurrently(executor, calls, error_message):
+    """Run several calls on executor and collect their results.
+
+    Every call is run even if some of them fail. Each failure is expected
+    to say which item it was for.
+
+    :param executor: The executor to submit the calls to.
+    :param dict calls: Mapping of keys to callables taking no argument.
+    :param string error_message: Start of the message of the exception
+                                 raised when several calls fail.
+
+    :returns: A dict mapping each key to the result of its call.
+
+    :raises: The OpenStackCloudException of the failed call if only one
+             failed, or one listing all of the failures if several did.
+    """
+    futures = {key: executor.submit(call) for key, call in calls.items()}
+    results = {}
+    errors = []
+    for key, future in futures.items():
+        try:
+            results[key] = future.result()
+        except exc.OpenStackCloudException as e:
+            errors.append(e)
+    if len(errors) == 1:
+        raise errors[0]
+    if errors:
+        raise exc.OpenStackCloudException(
+            "{message}: {errors}".format(
+                message=error_message,
+                errors='; '.join(str(e) for e in errors)))
+    return results
+
+
 def parse_range(value):
     """Parse a numerical range string.
 
@@ -704,6 +839,114 @@ class FileSegment:
         self._file.seek(self.offset, 0)
 
 
+class BoundedDict(collections.abc.MutableMapping):
+    """Mapping that evicts its least recently used entries past maxsize."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = collections.OrderedDict()
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class FileHashStore(object):
+    """md5 and sha256 hashes of local files, kept in a SQLite database.
+
+    Lets the hashes of a large file outlive the process that computed them,
+    so uploading the same file again from a new process only needs its
+    stat to match. The store is best effort: errors reading or writing the
+    database are logged and the hashes are simply computed again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.log = _log.setup_logging('openstack.cloud')
+        # One connection serves every thread, taking turns on the lock.
+        self._lock = threading.Lock()
+        self._conn = None
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            try:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS file_hashes ('
+                    'path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER,'
+                    ' ino INTEGER, md5 TEXT, sha256 TEXT)')
+            except sqlite3.Error:
+                conn.close()
+                raise
+        except (OSError, sqlite3.Error) as e:
+            self.log.debug(
+                "Could not open file hashes in %s: %s", self.path, e)
+            return
+        self._conn = conn
+
+    def get(self, path, stat):
+        """Return the (md5, sha256) stored for path, if stat still matches.
+
+        :param path: Absolute path of the file.
+        :param stat: Current ``os.stat_result`` of the file.
+        """
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT mtime_ns, size, ino, md5, sha256'
+                    ' FROM file_hashes WHERE path = ?', (path,)).fetchone()
+        except sqlite3.Error as e:
+            self.log.debug(
+                "Could not read file hashes from %s: %s", self.path, e)
+            return None
+        if row and tuple(row[:3]) == (
+                stat.st_mtime_ns, stat.st_size, stat.st_ino):
+            return row[3], row[4]
+        return None
+
+    def set(self, path, stat, md5, sha256):
+        """Store the hashes of path as of stat."""
+        if self._conn is None:
+            return
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO file_hashes'
+                    ' VALUES (?, ?, ?, ?, ?, ?)',
+                    (path, stat.st_mtime_ns, stat.st_size, stat.st_ino,
+                     md5, sha256))
+        except sqlite3.Error as e:
+            self.log.debug(
+                "Could not write file hashes to %s: %s", self.path, e)
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
 def _format_uuid_string(string):
     return (string.replace('urn:', '')
                   .replace('uuid:', '')
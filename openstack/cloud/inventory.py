@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import functools
+import concurrent.futures
 
 from openstack.config import loader
 from openstack import connection
@@ -61,16 +61,36 @@ class OpenStackInventory:
                    all_projects=False):
         hostvars = []
 
-        for cloud in self.clouds:
+        def _list_servers(cloud):
             try:
-                # Cycle on servers
-                for server in cloud.list_servers(detailed=expand,
-                                                 all_projects=all_projects):
-                    hostvars.append(server)
+                return cloud.list_servers(detailed=expand,
+                                          all_projects=all_projects)
             except exceptions.OpenStackCloudException:
                 # Don't fail on one particular cloud as others may work
                 if fail_on_cloud_config:
                     raise
+                return []
+
+        # Each cloud is independent, so list them all at once and only
+        # pay for the slowest one. map keeps the configured cloud order.
+        # The clouds may themselves be using their own pools to list, so
+        # this pool is separate from theirs, but it is held to the same
+        # pool_executor_max_workers limit.
+        if len(self.clouds) > 1:
+            max_workers = min(
+                [len(self.clouds)] + [
+                    int(cloud.config.config.get(
+                        'pool_executor_max_workers', 5))
+                    for cloud in self.clouds])
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max_workers) as executor:
+                results = list(executor.map(_list_servers, self.clouds))
+        else:
+            results = [_list_servers(cloud) for cloud in self.clouds]
+
+        # Cycle on servers
+        for servers in results:
+            hostvars.extend(servers)
 
         return hostvars
 
@@ -79,8 +99,5 @@ class OpenStackInventory:
         return _utils._filter_list(hosts, name_or_id, filters)
 
     def get_host(self, name_or_id, filters=None, expand=True):
-        if expand:
-            func = self.search_hosts
-        else:
-            func = functools.partial(self.search_hosts, expand=False)
-        return _utils._get_entity(self, func, name_or_id, filters)
+        return _utils._get_entity(
+            self, self.search_hosts, name_or_id, filters, expand=expand)
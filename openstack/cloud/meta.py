@@ -239,6 +239,8 @@ def find_best_address(addresses, public=False, cloud_public=True):
         # of private ip addresses
         for address in addresses:
             try:
+                # Local socket probes rather than API calls, so these
+                # don't back off like the resource wait loops.
                 for count in utils.iterate_timeout(
                         5, "Timeout waiting for %s" % address, wait=0.1):
                     # Return the first one that is reachable
@@ -267,7 +269,7 @@ def find_best_address(addresses, public=False, cloud_public=True):
             "The cloud returned multiple addresses %s:, and we could not "
             "connect to port 22 on either. That might be what you wanted, "
             "but we have no clue what's going on, so we picked the first one "
-            "%s" % (addresses, addresses[0]))
+            "%s", addresses, addresses[0])
     return addresses[0]
 
 
@@ -11,14 +11,17 @@
 # limitations under the License.
 import copy
 import functools
+import os
 import queue
+import threading
+import time
 # import types so that we can reference ListType in sphinx param declarations.
 # We can't just use list, because sphinx gets confused by
 # openstack.resource.Resource.list and openstack.resource2.Resource.list
 import types  # noqa
+import urllib.parse
 import warnings
 
-import dogpile.cache
 import munch
 import requests.models
 import requestsexceptions
@@ -40,6 +43,9 @@ from openstack import utils
 DEFAULT_SERVER_AGE = 5
 DEFAULT_PORT_AGE = 5
 DEFAULT_FLOAT_AGE = 5
+DEFAULT_OBJECT_CACHE_SIZE = 4096
+# Seconds a resolved project is reused for without looking it up again.
+_PROJECT_PARAM_AGE = 300
 _CONFIG_DOC_URL = _floating_ip._CONFIG_DOC_URL
 
 DEFAULT_OBJECT_SEGMENT_SIZE = _object_store.DEFAULT_OBJECT_SEGMENT_SIZE
@@ -48,6 +54,55 @@ DEFAULT_MAX_FILE_SIZE = _object_store.DEFAULT_MAX_FILE_SIZE
 OBJECT_CONTAINER_ACLS = _object_store.OBJECT_CONTAINER_ACLS
 
 
+def _fake_invalidate(unused):
+    pass
+
+
+def _fake_replace_item(unused, item):
+    pass
+
+
+class _FakeCache:
+    def invalidate(self):
+        pass
+
+
+# Stateless stand-in used by every cloud that has caching disabled
+_FAKE_CACHE = _FakeCache()
+
+_CACHED_METHOD_NAMES = {}
+
+
+def _get_cached_method_names(cls):
+    """Return the names of the cache decorated methods of a class.
+
+    Which methods are decorated is fixed per class, so this is worked out
+    once rather than on every construction of an uncached cloud.
+    """
+    names = _CACHED_METHOD_NAMES.get(cls)
+    if names is None:
+        names = []
+        for method in set(_utils._decorated_methods):
+            meth_obj = getattr(cls, method, None)
+            if (hasattr(meth_obj, 'invalidate')
+                    and hasattr(meth_obj, 'func')):
+                names.append(method)
+        names = _CACHED_METHOD_NAMES[cls] = tuple(names)
+    return names
+
+
+# Whether this host has a default IPv6 route. It's a property of the host
+# rather than of any cloud, so it is looked up once per process.
+_LOCAL_IPV6 = None
+
+
+def _get_local_ipv6():
+    global _LOCAL_IPV6
+    if _LOCAL_IPV6 is None:
+        _LOCAL_IPV6 = _utils.localhost_supports_ipv6()
+    return _LOCAL_IPV6
+
+
 class _OpenStackCloudMixin:
     """Represent a connection to an OpenStack Cloud.
 
@@ -104,6 +159,7 @@ class _OpenStackCloudMixin:
         cache_arguments = self.config.get_cache_arguments()
 
         self._resource_caches = {}
+        self._cache_key_generators = {}
 
         if cache_class != 'dogpile.cache.null':
             self.cache_enabled = True
@@ -123,31 +179,24 @@ class _OpenStackCloudMixin:
         else:
             self.cache_enabled = False
 
-            def _fake_invalidate(unused):
-                pass
-
-            class _FakeCache:
-                def invalidate(self):
-                    pass
-
             # Don't cache list_servers if we're not caching things.
             # Replace this with a more specific cache configuration
             # soon.
             self._SERVER_AGE = 0
             self._PORT_AGE = 0
             self._FLOAT_AGE = 0
-            self._cache = _FakeCache()
+            self._cache = _FAKE_CACHE
             # Undecorate cache decorated methods. Otherwise the call stacks
             # wind up being stupidly long and hard to debug
-            for method in _utils._decorated_methods:
-                meth_obj = getattr(self, method, None)
-                if not meth_obj:
-                    continue
-                if (hasattr(meth_obj, 'invalidate')
-                        and hasattr(meth_obj, 'func')):
-                    new_func = functools.partial(meth_obj.func, self)
-                    new_func.invalidate = _fake_invalidate
-                    setattr(self, method, new_func)
+            for method in _get_cached_method_names(type(self)):
+                func = getattr(self, method).func
+                # Bound methods look attributes up on the function they
+                # wrap, which is shared by every instance, so the no-op
+                # invalidate goes on a wrapper of this instance's own.
+                undecorated = functools.partial(func, self)
+                undecorated.invalidate = _fake_invalidate
+                undecorated.replace_item = _fake_replace_item
+                setattr(self, method, undecorated)
 
         # If server expiration time is set explicitly, use that. Otherwise
         # fall back to whatever it was before
@@ -158,15 +207,52 @@ class _OpenStackCloudMixin:
         self._FLOAT_AGE = self.config.get_cache_resource_expiration(
             'floating_ip', self._FLOAT_AGE)
 
-        self._container_cache = dict()
-        self._file_hash_cache = dict()
+        # Seconds between polls when waiting on a resource to change state.
+        # None leaves iterate_timeout at its own default.
+        self._resource_poll_interval = self.config.config.get(
+            'resource_poll_interval')
+
+        # Long lived processes can touch a great many containers and files,
+        # so only remember the most recently used ones.
+        object_cache_size = int(self.config.config.get(
+            'object_cache_size', DEFAULT_OBJECT_CACHE_SIZE))
+        self._container_cache = _utils.BoundedDict(object_cache_size)
+        self._file_hash_cache = _utils.BoundedDict(object_cache_size)
+        # With caching configured, also keep file hashes on disk so that
+        # later processes uploading the same files don't rehash them.
+        self._file_hash_store = None
+        cache_path = self.config.get_cache_path()
+        if self.cache_enabled and cache_path:
+            self._file_hash_store = _utils.FileHashStore(
+                os.path.join(cache_path, 'file_hashes.sqlite'))
+        # Bodies of listings fetched with _get_revalidated, keyed by request,
+        # along with the ETag they were served with.
+        self._etag_cache = _utils.BoundedDict(object_cache_size)
 
         # self.__pool_executor = None
 
         self._raw_clients = {}
+        # Guards construction of the adapters in _raw_clients so that
+        # concurrent callers don't each run version discovery.
+        self._raw_clients_lock = threading.RLock()
+        self._client_api_versions = {}
+        self._project_param_cache = _utils.BoundedDict(object_cache_size)
+        self._service_availability = {}
 
-        self._local_ipv6 = (
-            _utils.localhost_supports_ipv6() if not self.force_ipv4 else False)
+        self.__local_ipv6 = None
+
+    @property
+    def _local_ipv6(self):
+        # Only needed when working out server addresses, so don't read the
+        # routing table for every cloud that gets constructed.
+        if self.__local_ipv6 is None:
+            self.__local_ipv6 = (
+                _get_local_ipv6() if not self.force_ipv4 else False)
+        return self.__local_ipv6
+
+    @_local_ipv6.setter
+    def _local_ipv6(self, value):
+        self.__local_ipv6 = value
 
     def connect_as(self, **kwargs):
         """Make a new OpenStackCloud object with new auth context.
@@ -317,6 +403,9 @@ class _OpenStackCloudMixin:
         return new_conn
 
     def _make_cache(self, cache_class, expiration_time, arguments):
+        # import late since caching is off by default and dogpile.cache is
+        # one of the slower imports on the connection path
+        import dogpile.cache
         return dogpile.cache.make_region(
             function_key_generator=self._make_cache_key
         ).configure(
@@ -325,20 +414,25 @@ class _OpenStackCloudMixin:
             arguments=arguments)
 
     def _make_cache_key(self, namespace, fn):
+        # cache_on_arguments asks for a key generator on every call of a
+        # cached method, so hand back the same one for a given method.
         fname = fn.__name__
+        generate_key = self._cache_key_generators.get((namespace, fname))
+        if generate_key:
+            return generate_key
+
         if namespace is None:
             name_key = self.name
         else:
             name_key = '%s:%s' % (self.name, namespace)
+        prefix = '%s_%s_' % (name_key, fname)
 
         def generate_key(*args, **kwargs):
-            arg_key = ','.join(args)
-            kw_keys = sorted(kwargs.keys())
             kwargs_key = ','.join(
-                ['%s:%s' % (k, kwargs[k]) for k in kw_keys if k != 'cache'])
-            ans = "_".join(
-                [str(name_key), fname, arg_key, kwargs_key])
-            return ans
+                '%s:%s' % (k, kwargs[k]) for k in sorted(kwargs)
+                if k != 'cache')
+            return prefix + ','.join(args) + '_' + kwargs_key
+        self._cache_key_generators[(namespace, fname)] = generate_key
         return generate_key
 
     def _get_cache(self, resource_name):
@@ -402,6 +496,8 @@ class _OpenStackCloudMixin:
                 prometheus_counter=self.config.get_prometheus_counter(),
                 prometheus_histogram=self.config.get_prometheus_histogram(),
                 influxdb_client=self.config.get_influxdb_client(),
+                status_code_retries=self.config.get_status_code_retries(
+                    service_type),
                 min_version=request_min_version,
                 max_version=request_max_version)
             if adapter.get_endpoint():
@@ -414,6 +510,8 @@ class _OpenStackCloudMixin:
             interface=self.config.get_interface(service_type),
             endpoint_override=self.config.get_endpoint(service_type),
             region_name=self.config.get_region_name(service_type),
+            status_code_retries=self.config.get_status_code_retries(
+                service_type),
             min_version=min_version,
             max_version=max_version)
 
@@ -452,32 +550,95 @@ class _OpenStackCloudMixin:
             interface=self.config.get_interface(service_type),
             endpoint_override=self.config.get_endpoint(
                 service_type) or endpoint_override,
-            region_name=self.config.get_region_name(service_type))
+            region_name=self.config.get_region_name(service_type),
+            status_code_retries=self.config.get_status_code_retries(
+                service_type))
 
     def _is_client_version(self, client, version):
         client_name = '_{client}_client'.format(
             client=client.replace('-', '_'))
         client = getattr(self, client_name)
-        return client._version_matches(version)
+        # Identity calls check the keystone version on nearly every
+        # operation. The adapters live in _raw_clients for the life of the
+        # cloud, so remember the version each one detected.
+        cached = self._client_api_versions.get(client_name)
+        if cached is None or cached[0] is not client:
+            cached = (client, client.get_api_major_version())
+            self._client_api_versions[client_name] = cached
+        api_version = cached[1]
+        if api_version:
+            return api_version[0] == version
+        return False
+
+    def warmup(self, services=('compute', 'block-storage', 'network',
+                               'image')):
+        """Discover service endpoints concurrently ahead of first use.
+
+        Each service proxy resolves its endpoint from the catalog and runs
+        version discovery the first time it is touched. Tools that use
+        several services pay for those round trips one after another;
+        this runs them in parallel on the connection's thread pool.
+
+        :param services: Iterable of service types to prepare.
+        """
+        futures = [
+            self._pool_executor.submit(
+                getattr, self, service_type.replace('-', '_'))
+            for service_type in services]
+        for future in futures:
+            future.result()
+
+    def list_all(self, resources):
+        """Run several resource listings concurrently.
+
+        :param resources: Iterable of resource names, such as ``servers`` or
+            ``networks``. Each name is listed with the matching
+            ``list_<name>`` method, called without arguments.
+
+        :returns: A dict mapping each resource name to its listing.
+
+        :raises: ``OpenStackCloudException`` if a resource name has no list
+            method, or if any of the listings fails.
+        """
+        calls = {}
+        for resource in resources:
+            call = getattr(self, 'list_{0}'.format(resource), None)
+            if not callable(call):
+                raise exc.OpenStackCloudException(
+                    "Cannot list unknown resource {0}".format(resource))
+            calls[resource] = call
+        futures = {
+            resource: self._pool_executor.submit(call)
+            for resource, call in calls.items()}
+        return {
+            resource: future.result()
+            for resource, future in futures.items()}
 
     @property
     def _application_catalog_client(self):
         if 'application-catalog' not in self._raw_clients:
-            self._raw_clients['application-catalog'] = self._get_raw_client(
-                'application-catalog')
+            with self._raw_clients_lock:
+                if 'application-catalog' not in self._raw_clients:
+                    raw_client = self._get_raw_client('application-catalog')
+                    self._raw_clients['application-catalog'] = raw_client
         return self._raw_clients['application-catalog']
 
     @property
     def _database_client(self):
         if 'database' not in self._raw_clients:
-            self._raw_clients['database'] = self._get_raw_client('database')
+            with self._raw_clients_lock:
+                if 'database' not in self._raw_clients:
+                    raw_client = self._get_raw_client('database')
+                    self._raw_clients['database'] = raw_client
         return self._raw_clients['database']
 
     @property
     def _raw_image_client(self):
         if 'raw-image' not in self._raw_clients:
-            image_client = self._get_raw_client('image')
-            self._raw_clients['raw-image'] = image_client
+            with self._raw_clients_lock:
+                if 'raw-image' not in self._raw_clients:
+                    image_client = self._get_raw_client('image')
+                    self._raw_clients['raw-image'] = image_client
         return self._raw_clients['raw-image']
 
     def pprint(self, resource):
@@ -566,7 +727,10 @@ class _OpenStackCloudMixin:
             domain_id=None,
             domain_name=None,
         )
-        if not project_id or project_id == self.current_project_id:
+        # Every normalized resource comes through here, so only ask the
+        # session (which checks the token expiry) once.
+        current_project_id = self.current_project_id
+        if not project_id or project_id == current_project_id:
             # If we don't have a project_id parameter, it means a user is
             # directly asking what the current state is.
             # Alternately, if we have one, that means we're calling this
@@ -578,7 +742,7 @@ class _OpenStackCloudMixin:
             # an object from a different project, so adding info from the
             # current token would be wrong.
             auth_args = self.config.config.get('auth', {})
-            project_info['id'] = self.current_project_id
+            project_info['id'] = current_project_id
             project_info['name'] = auth_args.get('project_name')
             project_info['domain_id'] = auth_args.get('project_domain_id')
             project_info['domain_name'] = auth_args.get('project_domain_name')
@@ -613,13 +777,23 @@ class _OpenStackCloudMixin:
 
     def _get_project_id_param_dict(self, name_or_id):
         if name_or_id:
+            # Bulk user creation resolves the same project over and over.
+            # The project calls clear this when projects change, and
+            # entries expire in case they were changed by someone else.
+            cached = self._project_param_cache.get(name_or_id)
+            now = time.monotonic()
+            if cached is not None and now - cached[0] < _PROJECT_PARAM_AGE:
+                return dict(cached[1])
             project = self.get_project(name_or_id)
             if not project:
+                self._project_param_cache.pop(name_or_id, None)
                 return {}
             if self._is_client_version('identity', 3):
-                return {'default_project_id': project['id']}
+                param = {'default_project_id': project['id']}
             else:
-                return {'tenant_id': project['id']}
+                param = {'tenant_id': project['id']}
+            self._project_param_cache[name_or_id] = (now, param)
+            return dict(param)
         else:
             return {}
 
@@ -679,24 +853,57 @@ class _OpenStackCloudMixin:
         :returns: A list subset of the original data set.
         :raises: OpenStackCloudException on invalid range expressions.
         """
-        filtered = []
+        filtered = None
 
         for key, range_value in filters.items():
             # We always want to operate on the full data set so that
             # calculations for minimum and maximum are correct.
             results = _utils.range_filter(data, key, range_value)
 
-            if not filtered:
+            if filtered is None:
                 # First set of results
                 filtered = results
             else:
                 # The combination of all searches should be the intersection of
                 # all result sets from each search. So adjust the current set
                 # of filtered data by computing its intersection with the
-                # latest result set.
-                filtered = [r for r in results for f in filtered if r == f]
+                # latest result set. range_filter returns members of data
+                # itself, so match on object identity with a set lookup
+                # instead of comparing every pair of dicts.
+                filtered_ids = {id(f) for f in filtered}
+                filtered = [r for r in results if id(r) in filtered_ids]
 
-        return filtered
+            if not filtered:
+                # Nothing can match the remaining searches either
+                return []
+
+        return filtered or []
+
+    def _get_revalidated(self, client, url, params=None, error_message=None):
+        """GET a json document, revalidating it with its last ETag.
+
+        If an earlier response for the same request carried an ETag it is
+        sent back as If-None-Match, and a 304 answer is served from the body
+        remembered alongside it. Services that don't send ETags simply get
+        a plain GET.
+        """
+        # Filter values may be lists or dicts, so key on the encoded query
+        # string rather than on the (possibly unhashable) params themselves.
+        key = (client.service_type, url,
+               urllib.parse.urlencode(sorted(params.items()), doseq=True)
+               if params else None)
+        cached = self._etag_cache.get(key)
+        headers = {'If-None-Match': cached[0]} if cached else None
+        response = client.get(url, params=params, headers=headers)
+        if cached and response.status_code == 304:
+            return cached[1]
+        data = proxy._json_response(response, error_message=error_message)
+        etag = response.headers.get('ETag')
+        if etag and isinstance(data, dict):
+            self._etag_cache[key] = (etag, data)
+        else:
+            self._etag_cache.pop(key, None)
+        return data
 
     def _get_and_munchify(self, key, data):
         """Wrapper around meta.get_and_munchify.
@@ -742,14 +949,19 @@ class _OpenStackCloudMixin:
                     " per config", {'service_key': service_key})
                 self._disable_warnings[service_key] = True
             return False
-        try:
-            endpoint = self.get_session_endpoint(service_key)
-        except exc.OpenStackCloudException:
-            return False
-        if endpoint:
-            return True
-        else:
-            return False
+        # Hot paths such as the network and floating IP calls ask this on
+        # every call, and the answer comes from the catalog, which doesn't
+        # change for the life of the cloud object.
+        available = self._service_availability.get(service_key)
+        if available is None:
+            try:
+                endpoint = self.get_session_endpoint(service_key)
+            except exc.OpenStackCloudException:
+                # Could be transient (e.g. auth), so don't remember it
+                return False
+            available = bool(endpoint)
+            self._service_availability[service_key] = available
+        return available
 
     def project_cleanup(
         self,
@@ -823,6 +1035,7 @@ class _OpenStackCloudMixin:
             else:
                 dep_graph.node_done(service)
 
+        # Only checks local state, so there is no API to back off from.
         for count in utils.iterate_timeout(
                 timeout=wait_timeout,
                 message="Timeout waiting for cleanup to finish",
@@ -836,6 +1049,6 @@ def cleanup_task(graph, service, fn):
         fn()
     except Exception:
         log = _log.setup_logging('openstack.project_cleanup')
-        log.exception('Error in the %s cleanup function' % service)
+        log.exception('Error in the %s cleanup function', service)
     finally:
         graph.node_done(service)
@@ -13,6 +13,8 @@
 # under the License.
 
 import copy
+import functools
+import importlib
 import os.path
 import warnings
 import urllib
@@ -23,18 +25,6 @@ from keystoneauth1.loading import adapter as ks_load_adap
 from keystoneauth1 import session as ks_session
 import os_service_types
 import requestsexceptions
-try:
-    import statsd
-except ImportError:
-    statsd = None
-try:
-    import prometheus_client
-except ImportError:
-    prometheus_client = None
-try:
-    import influxdb
-except ImportError:
-    influxdb = None
 
 
 from openstack import version as openstack_version
@@ -57,6 +47,23 @@ SCOPE_KEYS = {
 # Sentinel for nonexistence
 _ENOENT = object()
 
+# How many keep-alive connections requests pools per host by default
+_DEFAULT_CONNECTION_POOL_SIZE = 10
+
+
+@functools.lru_cache(maxsize=None)
+def _optional_module(name):
+    """Import an optional metrics library, or return None if it's missing.
+
+    These are only needed once a cloud region hands out clients, and statsd
+    and influxdb only when they're configured, so they aren't imported along
+    with openstack itself.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
 
 def _make_key(key, service_type):
     if not service_type:
@@ -190,8 +197,8 @@ def from_conf(conf, session=None, service_types=None, **kwargs):
                       "for project '{project}' (service type "
                       "'{service_type}'): {exception}".format(
                           project=project_name, service_type=st, exception=e))
-            _logger.warning("Disabling service '{service_type}': "
-                            "{reason}".format(service_type=st, reason=reason))
+            _logger.warning(
+                "Disabling service '%s': %s", st, reason)
             _disable_service(config_dict, st, reason=reason)
             continue
         # Load them into config_dict under keys prefixed by ${service_type}_
@@ -586,8 +593,8 @@ class CloudRegion:
             # cert verification
             if not verify:
                 self.log.debug(
-                    "Turning off SSL warnings for {full_name}"
-                    " since verify=False".format(full_name=self.full_name))
+                    "Turning off SSL warnings for %s since verify=False",
+                    self.full_name)
             requestsexceptions.squelch_warnings(insecure_requests=not verify)
             self._keystone_session = self._session_constructor(
                 auth=self._auth,
@@ -597,6 +604,7 @@ class CloudRegion:
                 collect_timing=self.config.get('timing'),
                 discovery_cache=self._discovery_cache)
             self.insert_user_agent()
+            self._size_connection_pools()
             # Using old keystoneauth with new os-client-config fails if
             # we pass in app_name and app_version. Those are not essential,
             # nor a reason to bump our minimum, so just test for the session
@@ -607,6 +615,29 @@ class CloudRegion:
                 self._keystone_session.app_version = self._app_version
         return self._keystone_session
 
+    def _size_connection_pools(self):
+        # requests keeps at most _DEFAULT_CONNECTION_POOL_SIZE idle
+        # keep-alive connections per host. Callers issuing more concurrent
+        # requests than that to a single endpoint would see the extra
+        # connections closed after each use and pay for a fresh TCP and TLS
+        # handshake every time.
+        pool_size = self.config.get('connection_pool_size')
+        if not pool_size:
+            # Without an explicit size, make room for the connection's own
+            # thread pool so the bulk helpers running on it don't overflow
+            # the default pools.
+            workers = int(self.config.get('pool_executor_max_workers') or 0)
+            if workers > _DEFAULT_CONNECTION_POOL_SIZE:
+                pool_size = workers
+        requests_session = getattr(self._keystone_session, 'session', None)
+        if not pool_size or requests_session is None:
+            return
+        pool_size = int(pool_size)
+        for scheme in ('https://', 'http://'):
+            requests_session.mount(
+                scheme, ks_session.TCPKeepAliveAdapter(
+                    pool_connections=pool_size, pool_maxsize=pool_size))
+
     def get_service_catalog(self):
         """Helper method to grab the service catalog."""
         return self._auth.get_access(self.get_session()).service_catalog
@@ -995,32 +1026,34 @@ class CloudRegion:
             'concurrency', service_type=service_type)
 
     def get_statsd_client(self):
-        if not statsd:
-            return None
         statsd_args = {}
         if self._statsd_host:
             statsd_args['host'] = self._statsd_host
         if self._statsd_port:
             statsd_args['port'] = self._statsd_port
-        if statsd_args:
-            try:
-                return statsd.StatsClient(**statsd_args)
-            except Exception:
-                self.log.warning('Cannot establish connection to statsd')
-                return None
-        else:
+        if not statsd_args:
+            return None
+        statsd = _optional_module('statsd')
+        if not statsd:
+            return None
+        try:
+            return statsd.StatsClient(**statsd_args)
+        except Exception:
+            self.log.warning('Cannot establish connection to statsd')
             return None
 
     def get_statsd_prefix(self):
         return self._statsd_prefix or 'openstack.api'
 
     def get_prometheus_registry(self):
+        prometheus_client = _optional_module('prometheus_client')
         if not self._collector_registry and prometheus_client:
             self._collector_registry = prometheus_client.REGISTRY
         return self._collector_registry
 
     def get_prometheus_histogram(self):
         registry = self.get_prometheus_registry()
+        prometheus_client = _optional_module('prometheus_client')
         if not registry or not prometheus_client:
             return
         # We have to hide a reference to the histogram on the registry
@@ -1041,6 +1074,7 @@ class CloudRegion:
 
     def get_prometheus_counter(self):
         registry = self.get_prometheus_registry()
+        prometheus_client = _optional_module('prometheus_client')
         if not registry or not prometheus_client:
             return
         counter = getattr(registry, '_openstacksdk_counter', None)
@@ -1091,6 +1125,7 @@ class CloudRegion:
         for key in ['host', 'username', 'password', 'database', 'timeout']:
             if key in self._influxdb_config:
                 influx_args[key] = self._influxdb_config[key]
+        influxdb = _optional_module('influxdb')
         if influxdb and influx_args:
             try:
                 return influxdb.InfluxDBClient(**influx_args)
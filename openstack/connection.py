@@ -176,6 +176,7 @@ try to find it and if that fails, you would create it::
 Additional information about the services can be found in the
 :ref:`service-proxies` documentation.
 """
+import threading
 import warnings
 import weakref
 
@@ -394,6 +395,7 @@ class Connection(
         self._session = None
         self._proxies = {}
         self.__pool_executor = pool_executor
+        self.__pool_executor_lock = threading.Lock()
         self._global_request_id = global_request_id
         self.use_direct_get = use_direct_get
         self.strict_mode = strict
@@ -520,14 +522,22 @@ class Connection(
     @property
     def _pool_executor(self):
         if not self.__pool_executor:
-            self.__pool_executor = concurrent.futures.ThreadPoolExecutor(
-                max_workers=5)
+            with self.__pool_executor_lock:
+                if not self.__pool_executor:
+                    max_workers = int(self.config.config.get(
+                        'pool_executor_max_workers', 5))
+                    self.__pool_executor = (
+                        concurrent.futures.ThreadPoolExecutor(
+                            max_workers=max_workers))
         return self.__pool_executor
 
     def close(self):
         """Release any resources held open."""
         if self.__pool_executor:
             self.__pool_executor.shutdown()
+            # Let a later concurrent call start a fresh pool rather than
+            # submitting to one that has been shut down.
+            self.__pool_executor = None
 
     def set_global_request_id(self, global_request_id):
         self._global_request_id = global_request_id
@@ -13,6 +13,7 @@ import abc
 import os
 
 
+from openstack.cloud import _utils
 from openstack import exceptions
 from openstack import proxy
 
@@ -209,7 +210,7 @@ class BaseImageProxy(proxy.Proxy, metaclass=abc.ABCMeta):
         else:
             image_kwargs['name'] = name
             image = self._create_image(**image_kwargs)
-        self._connection._get_cache(None).invalidate()
+        self._connection.list_images.invalidate(self._connection)
         return image
 
     @abc.abstractmethod
@@ -252,10 +253,19 @@ class BaseImageProxy(proxy.Proxy, metaclass=abc.ABCMeta):
         if not meta:
             meta = {}
 
+        # Resolve the ramdisk and kernel against a single listing of the
+        # images rather than one listing each.
+        images = None
+        if any(kwargs.get(k) for k in ('ramdisk', 'kernel')):
+            images = self._connection.list_images()
         img_props = {}
-        for k, v in iter(kwargs.items()):
+        for k, v in kwargs.items():
             if v and k in ['ramdisk', 'kernel']:
-                v = self._connection.get_image_id(v)
+                matches = _utils._filter_list(images, v, None)
+                if len(matches) > 1:
+                    raise exceptions.SDKException(
+                        "Multiple matches found for %s" % v)
+                v = matches[0].id if matches else None
                 k = '{0}_id'.format(k)
             img_props[k] = v
 
@@ -59,9 +59,12 @@ class Proxy(_base_proxy.BaseImageProxy):
         # NOTE(mordred) wait and timeout parameters are unused, but
         # are present for ease at calling site.
         if filename and not data:
-            image_data = open(filename, 'rb')
-        else:
-            image_data = data
+            # Stream the file itself, and close it once the upload is done.
+            with open(filename, 'rb') as image_data:
+                return self._upload_image(
+                    name, None, image_data, meta, wait, timeout,
+                    **image_kwargs)
+        image_data = data
         image_kwargs['properties'].update(meta)
         image_kwargs['name'] = name
 
@@ -101,10 +104,12 @@ class Proxy(_base_proxy.BaseImageProxy):
 
     def _update_image_properties(self, image, meta, properties):
         properties.update(meta)
-        img_props = {}
-        for k, v in iter(properties.items()):
-            if image.properties.get(k, None) != v:
-                img_props['x-image-meta-{key}'.format(key=k)] = v
+        if not properties:
+            return False
+        current = image.properties.get
+        img_props = {
+            'x-image-meta-{key}'.format(key=k): v
+            for k, v in properties.items() if current(k) != v}
         if not img_props:
             return False
         self.put(
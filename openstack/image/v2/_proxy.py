@@ -13,6 +13,7 @@
 import time
 import warnings
 
+from openstack.cloud import _utils
 from openstack import exceptions
 from openstack.image import _base_proxy
 from openstack.image.v2 import image as _image
@@ -136,10 +137,12 @@ class Proxy(_base_proxy.BaseImageProxy):
                                           .format(status=image.status))
 
         if filename:
-            image.data = open(filename, 'rb')
-        elif data:
-            image.data = data
-        image.stage(self)
+            with open(filename, 'rb') as image.data:
+                image.stage(self)
+        else:
+            if data:
+                image.data = data
+            image.stage(self)
 
         # Stage does not return content, but updates the object
         image.fetch(self)
@@ -242,7 +245,7 @@ class Proxy(_base_proxy.BaseImageProxy):
 
     def _make_v2_image_params(self, meta, properties):
         ret = {}
-        for k, v in iter(properties.items()):
+        for k, v in properties.items():
             if k in _INT_PROPERTIES:
                 ret[k] = int(v)
             elif k in _RAW_PROPERTIES:
@@ -264,9 +267,17 @@ class Proxy(_base_proxy.BaseImageProxy):
         **image_kwargs,
     ):
         if filename and not data:
-            image_data = open(filename, 'rb')
-        else:
-            image_data = data
+            # requests streams file objects in blocks rather than reading
+            # them into memory, so hand over the file itself, and make sure
+            # it is closed once the upload is done.
+            with open(filename, 'rb') as image_data:
+                return self._upload_image_put(
+                    name, None, image_data, meta, validate_checksum,
+                    use_import=use_import, stores=stores,
+                    all_stores=all_stores,
+                    all_stores_must_succeed=all_stores_must_succeed,
+                    **image_kwargs)
+        image_data = data
 
         properties = image_kwargs.pop('properties', {})
 
@@ -349,15 +360,19 @@ class Proxy(_base_proxy.BaseImageProxy):
                 image_properties=dict(name=name)))
 
         glance_task = self.create_task(**task_args)
-        self._connection.list_images.invalidate(self)
+        self._connection.list_images.invalidate(self._connection)
         if wait:
             start = time.time()
 
             try:
+                # Imports take minutes, so back off rather than polling
+                # the task every couple of seconds all along.
                 glance_task = self.wait_for_task(
                     task=glance_task,
                     status='success',
-                    wait=timeout)
+                    wait=timeout,
+                    max_interval=_utils._MAX_POLL_INTERVAL,
+                    jitter=_utils._POLL_JITTER)
 
                 image_id = glance_task.result['image_id']
                 image = self.get_image(image_id)
@@ -382,7 +397,7 @@ class Proxy(_base_proxy.BaseImageProxy):
                 # Clean up after ourselves. The object we created is not
                 # needed after the import is done.
                 self._connection.delete_object(container, name)
-                self._connection.list_images.invalidate(self)
+                self._connection.list_images.invalidate(self._connection)
             return image
         else:
             return glance_task
@@ -393,13 +408,15 @@ class Proxy(_base_proxy.BaseImageProxy):
             # to properly consume all properties (to calculate the diff).
             # This currently happens from unittests.
             image = _image.Image.existing(**image)
-        img_props = image.properties.copy()
-
-        for k, v in iter(self._make_v2_image_params(meta, properties).items()):
-            if image.get(k, None) != v:
-                img_props[k] = v
-        if not img_props:
+        current = image.get
+        changed = {
+            k: v
+            for k, v in self._make_v2_image_params(meta, properties).items()
+            if current(k) != v}
+        if not changed:
             return False
+        img_props = image.properties.copy()
+        img_props.update(changed)
 
         self.update_image(image, **img_props)
 
@@ -740,7 +757,8 @@ class Proxy(_base_proxy.BaseImageProxy):
         return self._create(_task.Task, **attrs)
 
     def wait_for_task(self, task, status='success', failures=None,
-                      interval=2, wait=120):
+                      interval=2, wait=120, max_interval=None,
+                      jitter=None):
         """Wait for a task to be in a particular status.
 
         :param task: The resource to wait on to reach the specified status.
@@ -753,6 +771,10 @@ class Proxy(_base_proxy.BaseImageProxy):
                          checks. Default to 2.
         :param wait: Maximum number of seconds to wait before the change.
                      Default to 120.
+        :param max_interval: If given, the interval doubles after every check
+                             until it reaches this number of seconds.
+        :param jitter: If given, each interval is randomly spread by up to
+                       this fraction either way.
         :returns: The resource is returned on success.
         :raises: :class:`~openstack.exceptions.ResourceTimeout` if transition
                  to the desired status failed to occur in specified seconds.
@@ -776,7 +798,9 @@ class Proxy(_base_proxy.BaseImageProxy):
         for count in utils.iterate_timeout(
                 timeout=wait,
                 message=msg,
-                wait=interval):
+                wait=interval,
+                max_wait=max_interval,
+                jitter=jitter):
             task = task.fetch(self)
 
             if not task:
@@ -792,7 +816,7 @@ class Proxy(_base_proxy.BaseImageProxy):
                 if task.message == _IMAGE_ERROR_396:
                     task_args = dict(input=task.input, type=task.type)
                     task = self.create_task(**task_args)
-                    self.log.debug('Got error 396. Recreating task %s' % task)
+                    self.log.debug('Got error 396. Recreating task %s', task)
                 else:
                     raise exceptions.ResourceFailure(
                         "{name} transitioned to failure state {status}".format(
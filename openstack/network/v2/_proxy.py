@@ -4165,7 +4165,7 @@ class Proxy(proxy.Proxy):
                 project_id=project_id,
                 network_id=net.id
             ):
-                self.log.debug('Looking at port %s' % port)
+                self.log.debug('Looking at port %s', port)
                 if port.device_owner in [
                     'network:router_interface',
                     'network:router_interface_distributed'
@@ -4184,7 +4184,7 @@ class Proxy(proxy.Proxy):
             if network_has_ports_allocated:
                 # If some ports are on net - we cannot delete it
                 continue
-            self.log.debug('Network %s should be deleted' % net)
+            self.log.debug('Network %s should be deleted', net)
             # __Check__ if we need to drop network according to filters
             network_must_be_deleted = self._service_cleanup_del_res(
                 self.delete_network,
@@ -4208,7 +4208,7 @@ class Proxy(proxy.Proxy):
                             router=port.device_id,
                             port_id=port.id)
                     except exceptions.SDKException:
-                        self.log.error('Cannot delete object %s' % obj)
+                        self.log.error('Cannot delete object %s', obj)
                 # router disconnected, drop it
                 self._service_cleanup_del_res(
                     self.delete_router,
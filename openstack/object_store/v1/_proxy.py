@@ -384,7 +384,9 @@ class Proxy(proxy.Proxy):
         segment_size = self.get_object_segment_size(segment_size)
         file_size = os.path.getsize(filename)
 
-        if self.is_object_stale(container_name, name, filename, md5, sha256):
+        if self.is_object_stale(
+                container_name, name, filename,
+                file_md5=md5, file_sha256=sha256):
 
             self._connection.log.debug(
                 "swift uploading %(filename)s to %(endpoint)s",
@@ -491,12 +493,14 @@ class Proxy(proxy.Proxy):
         return res
 
     def is_object_stale(
-            self, container, name, filename, file_md5=None, file_sha256=None):
+            self, container, name, filename=None, file_md5=None,
+            file_sha256=None):
         """Check to see if an object matches the hashes of a file.
 
         :param container: Name of the container.
         :param name: Name of the object.
-        :param filename: Path to the file.
+        :param filename: Path to the file. Only read when neither hash
+            is given.
         :param file_md5:
             Pre-calculated md5 of the file contents. Defaults to None which
             means calculate locally.
@@ -507,19 +511,24 @@ class Proxy(proxy.Proxy):
         metadata = self._connection.get_object_metadata(container, name)
         if not metadata:
             self._connection.log.debug(
-                "swift stale check, no object: {container}/{name}".format(
-                    container=container, name=name))
+                "swift stale check, no object: %s/%s", container, name)
             return True
 
-        if not (file_md5 or file_sha256):
-            (file_md5, file_sha256) = \
-                self._connection._get_file_hashes(filename)
         md5_key = metadata.get(
             self._connection._OBJECT_MD5_KEY,
             metadata.get(self._connection._SHADE_OBJECT_MD5_KEY, ''))
         sha256_key = metadata.get(
             self._connection._OBJECT_SHA256_KEY, metadata.get(
                 self._connection._SHADE_OBJECT_SHA256_KEY, ''))
+        if not (md5_key or sha256_key):
+            # Nothing to compare against, so don't bother hashing the file
+            self._connection.log.debug(
+                "swift stale check, no checksums: %s/%s", container, name)
+            return True
+
+        if filename and not (file_md5 or file_sha256):
+            (file_md5, file_sha256) = \
+                self._connection._get_file_hashes(filename)
         up_to_date = self._connection._hashes_up_to_date(
             md5=file_md5, sha256=file_sha256,
             md5_key=md5_key, sha256_key=sha256_key)
@@ -41,8 +41,14 @@ def get_events(cloud, stack_id, event_args, marker=None, limit=None):
 
 
 def poll_for_events(
-        cloud, stack_name, action=None, poll_period=5, marker=None):
-    """Continuously poll events and logs for performed action on stack."""
+        cloud, stack_name, action=None, poll_period=5, marker=None,
+        max_poll_period=30):
+    """Continuously poll events and logs for performed action on stack.
+
+    While no new events arrive the delay between polls doubles, up to
+    max_poll_period seconds, and drops back to poll_period as soon as
+    the stack starts producing events again.
+    """
 
     def stop_check_action(a):
         stop_status = ('%s_FAILED' % action, '%s_COMPLETE' % action)
@@ -57,6 +63,7 @@ def poll_for_events(
         stop_check = stop_check_no_action
 
     no_event_polls = 0
+    delay = poll_period
     msg_template = "\n Stack %(name)s %(status)s \n"
 
     def is_stack_event(event):
@@ -79,6 +86,7 @@ def poll_for_events(
             no_event_polls += 1
         else:
             no_event_polls = 0
+            delay = poll_period
             # set marker to last event that was received.
             marker = getattr(events[-1], 'id', None)
 
@@ -102,4 +110,6 @@ def poll_for_events(
             # go back to event polling again
             no_event_polls = 0
 
-        time.sleep(poll_period)
+        time.sleep(delay)
+        if len(events) == 0:
+            delay = min(delay * 2, max(max_poll_period, poll_period))
@@ -13,6 +13,7 @@
 # under the License.
 
 import collections
+import functools
 import json
 from urllib import parse
 from urllib import request
@@ -25,7 +26,7 @@ from openstack import exceptions
 
 def get_template_contents(template_file=None, template_url=None,
                           template_object=None, object_request=None,
-                          files=None, existing=False):
+                          files=None, existing=False, executor=None):
 
     is_object = False
     tpl = None
@@ -66,12 +67,13 @@ def get_template_contents(template_file=None, template_url=None,
     if files is None:
         files = {}
     resolve_template_get_files(template, files, tmpl_base_url, is_object,
-                               object_request)
+                               object_request, executor)
     return files, template
 
 
 def resolve_template_get_files(template, files, template_base_url,
-                               is_object=False, object_request=None):
+                               is_object=False, object_request=None,
+                               executor=None):
 
     def ignore_if(key, value):
         if key != 'get_file' and key != 'type':
@@ -87,7 +89,8 @@ def resolve_template_get_files(template, files, template_base_url,
         return isinstance(value, (dict, list))
 
     get_file_contents(template, files, template_base_url,
-                      ignore_if, recurse_if, is_object, object_request)
+                      ignore_if, recurse_if, is_object, object_request,
+                      executor=executor)
 
 
 def is_template(file_content):
@@ -100,9 +103,60 @@ def is_template(file_content):
     return True
 
 
+def _collect_file_urls(from_data, urls, base_url=None,
+                       ignore_if=None, recurse_if=None):
+    # Mirrors the walk done by get_file_contents without fetching anything
+    if recurse_if and recurse_if(from_data):
+        if isinstance(from_data, dict):
+            recurse_data = from_data.values()
+        else:
+            recurse_data = from_data
+        for value in recurse_data:
+            _collect_file_urls(value, urls, base_url, ignore_if, recurse_if)
+
+    if isinstance(from_data, dict):
+        for key, value in from_data.items():
+            if ignore_if and ignore_if(key, value):
+                continue
+
+            if base_url and not base_url.endswith('/'):
+                base_url = base_url + '/'
+
+            urls.setdefault(parse.urljoin(base_url, value))
+
+
+def _prefetch_file_contents(executor, from_data, files, base_url=None,
+                            ignore_if=None, recurse_if=None,
+                            is_object=False, object_request=None):
+    """Fetch every file referenced by from_data concurrently on executor.
+
+    Large nested stacks can reference dozens of files, which would
+    otherwise be read one after another while walking the template.
+    """
+    urls = {}
+    _collect_file_urls(from_data, urls, base_url, ignore_if, recurse_if)
+    urls = [url for url in urls if url not in files]
+    if len(urls) < 2:
+        return {}
+
+    if is_object and object_request:
+        fetch = functools.partial(object_request, 'GET')
+    else:
+        fetch = utils.read_url_content
+    return dict(zip(urls, executor.map(fetch, urls)))
+
+
 def get_file_contents(from_data, files, base_url=None,
                       ignore_if=None, recurse_if=None,
-                      is_object=False, object_request=None):
+                      is_object=False, object_request=None,
+                      prefetched=None, executor=None):
+
+    if prefetched is None:
+        prefetched = {}
+        if executor is not None:
+            prefetched = _prefetch_file_contents(
+                executor, from_data, files, base_url, ignore_if, recurse_if,
+                is_object, object_request)
 
     if recurse_if and recurse_if(from_data):
         if isinstance(from_data, dict):
@@ -111,7 +165,8 @@ def get_file_contents(from_data, files, base_url=None,
             recurse_data = from_data
         for value in recurse_data:
             get_file_contents(value, files, base_url, ignore_if, recurse_if,
-                              is_object, object_request)
+                              is_object, object_request, prefetched,
+                              executor)
 
     if isinstance(from_data, dict):
         for key, value in from_data.items():
@@ -123,7 +178,9 @@ def get_file_contents(from_data, files, base_url=None,
 
             str_url = parse.urljoin(base_url, value)
             if str_url not in files:
-                if is_object and object_request:
+                if str_url in prefetched:
+                    file_content = prefetched[str_url]
+                elif is_object and object_request:
                     file_content = object_request('GET', str_url)
                 else:
                     file_content = utils.read_url_content(str_url)
@@ -131,10 +188,12 @@ def get_file_contents(from_data, files, base_url=None,
                     if is_object:
                         template = get_template_contents(
                             template_object=str_url, files=files,
-                            object_request=object_request)[1]
+                            object_request=object_request,
+                            executor=executor)[1]
                     else:
                         template = get_template_contents(
-                            template_url=str_url, files=files)[1]
+                            template_url=str_url, files=files,
+                            executor=executor)[1]
                     file_content = json.dumps(template)
                 files[str_url] = file_content
             # replace the data value with the normalised absolute URL
@@ -162,7 +221,8 @@ def process_multiple_environments_and_files(env_paths=None, template=None,
                                             template_url=None,
                                             env_path_is_object=None,
                                             object_request=None,
-                                            env_list_tracker=None):
+                                            env_list_tracker=None,
+                                            executor=None):
     """Reads one or more environment files.
 
     Reads in each specified environment file and returns a dictionary
@@ -187,6 +247,8 @@ def process_multiple_environments_and_files(env_paths=None, template=None,
     :param env_list_tracker: if specified, environment filenames will be
            stored within
     :type  env_list_tracker: list or None
+    :param executor: if specified, files referenced by the environments are
+           fetched concurrently on it
     :return: tuple of files dict and a dict of the consolidated environment
     :rtype:  tuple
     """
@@ -205,7 +267,8 @@ def process_multiple_environments_and_files(env_paths=None, template=None,
                 template_url=template_url,
                 env_path_is_object=env_path_is_object,
                 object_request=object_request,
-                include_env_in_files=include_env_in_files)
+                include_env_in_files=include_env_in_files,
+                executor=executor)
 
             # 'files' looks like {"filename1": contents, "filename2": contents}
             # so a simple update is enough for merging
@@ -227,7 +290,8 @@ def process_environment_and_files(env_path=None,
                                   template_url=None,
                                   env_path_is_object=None,
                                   object_request=None,
-                                  include_env_in_files=False):
+                                  include_env_in_files=False,
+                                  executor=None):
     """Loads a single environment file.
 
     Returns an entry suitable for the files dict which maps the environment
@@ -238,6 +302,8 @@ def process_environment_and_files(env_path=None,
     :param include_env_in_files: if specified, the raw environment file itself
            will be included in the returned files dict
     :type  include_env_in_files: bool
+    :param executor: if specified, files referenced by the environment are
+           fetched concurrently on it
     :return: tuple of files dict and the loaded environment as a dict
     :rtype:  (dict, dict)
     """
@@ -254,7 +320,8 @@ def process_environment_and_files(env_path=None,
         resolve_environment_urls(
             env.get('resource_registry'),
             files,
-            env_base_url, is_object=True, object_request=object_request)
+            env_base_url, is_object=True, object_request=object_request,
+            executor=executor)
 
     elif env_path:
         env_url = utils.normalise_file_path_to_url(env_path)
@@ -266,7 +333,7 @@ def process_environment_and_files(env_path=None,
         resolve_environment_urls(
             env.get('resource_registry'),
             files,
-            env_base_url)
+            env_base_url, executor=executor)
 
         if include_env_in_files:
             files[env_url] = json.dumps(env)
@@ -275,7 +342,8 @@ def process_environment_and_files(env_path=None,
 
 
 def resolve_environment_urls(resource_registry, files, env_base_url,
-                             is_object=False, object_request=None):
+                             is_object=False, object_request=None,
+                             executor=None):
     """Handles any resource URLs specified in an environment.
 
     :param resource_registry: mapping of type name to template filename
@@ -284,6 +352,7 @@ def resolve_environment_urls(resource_registry, files, env_base_url,
     :type  files: dict
     :param env_base_url: base URL to look in when loading files
     :type  env_base_url: str or None
+    :param executor: if specified, the files are fetched concurrently on it
     """
     if resource_registry is None:
         return
@@ -304,10 +373,12 @@ def resolve_environment_urls(resource_registry, files, env_base_url,
             return True
 
     get_file_contents(rr, files, base_url, ignore_if,
-                      is_object=is_object, object_request=object_request)
+                      is_object=is_object, object_request=object_request,
+                      executor=executor)
 
     for res_name, res_dict in rr.get('resources', {}).items():
         res_base_url = res_dict.get('base_url', base_url)
         get_file_contents(
             res_dict, files, res_base_url, ignore_if,
-            is_object=is_object, object_request=object_request)
+            is_object=is_object, object_request=object_request,
+            executor=executor)
@@ -41,6 +41,14 @@ class Proxy(proxy.Proxy):
             del url_parts[2]
         return super(Proxy, self)._extract_name_consume_url_parts(url_parts)
 
+    def _get_executor(self):
+        """Executor for fetching template files, if there is a connection.
+
+        Without a connection the files are fetched one after another.
+        """
+        conn = self._get_connection()
+        return conn._pool_executor if conn else None
+
     def read_env_and_templates(self, template_file=None, template_url=None,
                                template_object=None, files=None,
                                environment_files=None):
@@ -63,14 +71,16 @@ class Proxy(proxy.Proxy):
         if environment_files:
             envfiles, env = \
                 template_utils.process_multiple_environments_and_files(
-                    env_paths=environment_files)
+                    env_paths=environment_files,
+                    executor=self._get_executor())
             stack_attrs['environment'] = env
         if template_file or template_url or template_object:
             tpl_files, template = template_utils.get_template_contents(
                 template_file=template_file,
                 template_url=template_url,
                 template_object=template_object,
-                files=files)
+                files=files,
+                executor=self._get_executor())
             stack_attrs['template'] = template
             if tpl_files or envfiles:
                 stack_attrs['files'] = dict(
@@ -475,7 +485,8 @@ class Proxy(proxy.Proxy):
         try:
             return template_utils.get_template_contents(
                 template_file=template_file, template_url=template_url,
-                template_object=template_object, files=files)
+                template_object=template_object, files=files,
+                executor=self._get_executor())
         except Exception as e:
             raise exceptions.SDKException(
                 "Error in processing template files: %s" % str(e))
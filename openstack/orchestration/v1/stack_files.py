@@ -10,8 +10,28 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import sys
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from urllib3.util import request as urllib3_request
+
+from openstack import exceptions
 from openstack import resource
 
+_HEADERS = {
+    'Accept': 'application/json',
+    # urllib3 decodes these incrementally as the body is streamed, and
+    # includes br when a brotli module is installed.
+    'Accept-Encoding': urllib3_request.ACCEPT_ENCODING,
+}
+
 
 class StackFiles(resource.Resource):
 
@@ -34,9 +54,98 @@ class StackFiles(resource.Resource):
     # Backwards compat
     stack_id = id
 
+    _files_url_cache = None
+
     def fetch(self, session, base_path=None):
         # The stack files response contains a map of filenames and file
         # contents.
-        request = self._prepare_request(requires_id=False, base_path=base_path)
-        resp = session.get(request.url)
-        return resp.json()
+        url = self._files_url(base_path)
+        # The session is the service Proxy, whose keystoneauth session keeps
+        # a pooled keep-alive connection per endpoint. Streamed responses
+        # only go back to that pool once released, so always close them.
+        resp = session.get(url, stream=True, headers=_HEADERS)
+        try:
+            # Filenames recur across the maps of related stacks, so share
+            # a single string object for each of them.
+            return {sys.intern(name): contents
+                    for name, contents in self._iter_files(resp)}
+        finally:
+            resp.close()
+
+    def fetch_file(self, session, filename, base_path=None):
+        """Fetch the contents of a single file used by the stack.
+
+        Parsing stops as soon as ``filename`` has been read, so the other
+        templates in the map are never decoded.
+
+        :param session: The session to use for making this request.
+        :param str filename: Name of the file as referenced by the stack.
+        :param str base_path: Base part of the URI, if different from
+                              :data:`base_path`.
+
+        :returns: The file contents, or ``None`` if the stack does not
+                  reference ``filename``.
+        """
+        resp = session.get(
+            self._files_url(base_path), stream=True, headers=_HEADERS)
+        try:
+            for name, contents in self._iter_files(resp):
+                if name == filename:
+                    return contents
+        finally:
+            resp.close()
+        return None
+
+    @classmethod
+    def fetch_many(cls, session, stack_refs, executor=None):
+        """Fetch the files of several stacks concurrently.
+
+        :param session: The session to use for making the requests.
+        :param stack_refs: An iterable of ``(stack_name, stack_id)`` pairs.
+        :param executor: Executor to run the requests on. Defaults to the
+                         pool of the session's connection, which is sized
+                         by ``pool_executor_max_workers``.
+
+        :returns: A list with the files map of each stack, in the order of
+                  ``stack_refs``.
+        """
+        objs = [cls(stack_name=stack_name, stack_id=stack_id)
+                for stack_name, stack_id in stack_refs]
+        if not objs:
+            return []
+        if executor is None:
+            executor = session._connection._pool_executor
+        return list(executor.map(lambda obj: obj.fetch(session), objs))
+
+    def _files_url(self, base_path=None):
+        # The URL only depends on the stack name and id, so it is built once
+        # per stack. There is no body or header to prepare for these GETs,
+        # so fill in the URI directly rather than via _prepare_request.
+        key = (base_path, self.name, self.stack_id)
+        if self._files_url_cache is None or self._files_url_cache[0] != key:
+            url = (base_path or self.base_path) % self._uri.attributes
+            self._files_url_cache = (key, url)
+        return self._files_url_cache[1]
+
+    @staticmethod
+    def _iter_files(resp):
+        """Yield ``(filename, contents)`` pairs from a files response.
+
+        Templates are inlined in the response, so it can get big. When ijson
+        is available the body is parsed straight off the socket instead of
+        being buffered and decoded in one go.
+        """
+        # Raise before any parser is set up, so error bodies are not decoded
+        # as a files map.
+        exceptions.raise_from_response(resp)
+        if resp.headers.get('Content-Length') == '0':
+            return iter(())
+        # NOTE: keystoneauth reads the whole body when HTTP debug logging is
+        # on, in which case there is nothing left to stream.
+        if ijson is None or getattr(resp, '_content_consumed', True):
+            if orjson is None:
+                return iter(resp.json().items())
+            # orjson decodes the raw bytes, skipping the str round trip.
+            return iter(orjson.loads(resp.content).items())
+        resp.raw.decode_content = True
+        return ijson.kvitems(resp.raw, '')
@@ -631,7 +631,7 @@ class Proxy(adapter.Adapter):
                         # There are filters set, but we can't get required
                         # attribute, so skip the resource
                         self.log.debug('Requested cleanup attribute %s is not '
-                                       'available on the resource' % k)
+                                       'available on the resource', k)
                         part_cond.append(False)
                 except Exception:
                     self.log.exception('Error during condition evaluation')
@@ -663,6 +663,11 @@ def _json_response(response, result_key=None, error_message=None):
 class _ShadeAdapter(Proxy):
     """Wrapper for shade methods that expect json unpacking."""
 
+    # Throttled or temporarily unavailable, the request was not processed.
+    # keystoneauth retries these with exponential backoff, up to
+    # ``<service-type>_status_code_retries`` times.
+    retriable_status_codes = [429, 503]
+
     def request(self, url, method, error_message=None, **kwargs):
         response = super(_ShadeAdapter, self).request(url, method, **kwargs)
         return _json_response(response, error_message=error_message)
@@ -12,6 +12,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import os
+import shutil
+import sqlite3
+import tempfile
 from unittest import mock
 from uuid import uuid4
 
@@ -40,6 +44,14 @@ class TestUtils(base.TestCase):
         ret = _utils._filter_list(data, 'donald', None)
         self.assertEqual([el1], ret)
 
+    def test__filter_list_name_or_id_exact_id(self):
+        el1 = dict(id=100, name='donald')
+        el2 = dict(id=200, name='pluto')
+        el3 = dict(id=300, name='pluto')
+        data = [el1, el2, el3]
+        self.assertEqual([el1], _utils._filter_list(data, '100', None))
+        self.assertEqual([el2, el3], _utils._filter_list(data, 'pluto', None))
+
     def test__filter_list_name_or_id_special(self):
         el1 = dict(id=100, name='donald')
         el2 = dict(id=200, name='pluto[2017-01-10]')
@@ -140,6 +152,52 @@ class TestUtils(base.TestCase):
             }})
         self.assertEqual([el2, el3], ret)
 
+    def test__filter_list_dict_missing_nested(self):
+        el1 = dict(id=100, name='donald', last='duck',
+                   other=dict(category='duck'))
+        el2 = dict(id=200, name='donald', last='duck', other=None)
+        el3 = dict(id=300, name='donald', last='duck')
+        data = [el1, el2, el3]
+        ret = _utils._filter_list(
+            data, None, {'last': 'duck', 'other': {'category': 'duck'}})
+        self.assertEqual([el1], ret)
+
+    def test_shade_exceptions_wraps(self):
+        with testtools.ExpectedException(
+                exc.OpenStackCloudException, 'Error doing things'):
+            with _utils.shade_exceptions('Error doing things'):
+                raise ValueError('boom')
+
+    def test_shade_exceptions_formats_fields(self):
+        with testtools.ExpectedException(
+                exc.OpenStackCloudException, 'Error doing thing 42'):
+            with _utils.shade_exceptions('Error doing thing {id}', id=42):
+                raise ValueError('boom')
+
+    def test_shade_exceptions_default_message(self):
+        with testtools.ExpectedException(exc.OpenStackCloudException, 'boom'):
+            with _utils.shade_exceptions():
+                raise ValueError('boom')
+
+    def test_shade_exceptions_passes_cloud_exceptions(self):
+        with testtools.ExpectedException(
+                exc.OpenStackCloudTimeout, 'timed out'):
+            with _utils.shade_exceptions('Error doing things'):
+                raise exc.OpenStackCloudTimeout('timed out')
+
+    def test_valid_kwargs(self):
+        class Fake:
+            @_utils.valid_kwargs('extra')
+            def method(self, arg, named=None, **kwargs):
+                return arg, named, kwargs
+
+        self.assertEqual(
+            (1, 2, {'extra': 3}), Fake().method(1, named=2, extra=3))
+        with testtools.ExpectedException(
+            TypeError, "method\\(\\) got an unexpected keyword argument 'bad'"
+        ):
+            Fake().method(1, bad=2)
+
     def test_safe_dict_min_ints(self):
         """Test integer comparison"""
         data = [{'f1': 3}, {'f1': 2}, {'f1': 1}]
@@ -356,3 +414,103 @@ class TestUtils(base.TestCase):
         for r in resources:
             self.assertTrue(hasattr(self.cloud, 'get_%s_by_id' % r))
             self.assertTrue(hasattr(self.cloud, 'search_%ss' % r))
+
+    def test_bounded_dict_evicts_least_recently_used(self):
+        cache = _utils.BoundedDict(2)
+        cache['a'] = 1
+        cache['b'] = 2
+        # Reading 'a' makes 'b' the least recently used entry
+        self.assertEqual(1, cache['a'])
+        cache['c'] = 3
+        self.assertEqual(['a', 'c'], list(cache))
+        self.assertNotIn('b', cache)
+        self.assertEqual(3, cache.pop('c'))
+        self.assertIsNone(cache.pop('c', None))
+
+    def test_poll_tolerating_transient(self):
+        poll = mock.Mock(side_effect=[
+            exc.OpenStackCloudHTTPError('boom', http_status=503),
+            'BUILD',
+            exc.OpenStackCloudHTTPError('boom', http_status=503),
+            'ACTIVE',
+        ])
+        self.assertEqual(
+            ['BUILD', 'ACTIVE'],
+            list(_utils._poll_tolerating_transient(poll, range(4), 'thing')))
+
+    def test_poll_tolerating_transient_client_error(self):
+        poll = mock.Mock(side_effect=[
+            exc.OpenStackCloudHTTPError('boom', http_status=404)])
+        self.assertRaises(
+            exc.OpenStackCloudHTTPError,
+            list, _utils._poll_tolerating_transient(poll, range(4), 'thing'))
+
+    def test_poll_tolerating_transient_gives_up(self):
+        poll = mock.Mock(side_effect=exc.OpenStackCloudHTTPError(
+            'boom', http_status=503))
+        self.assertRaises(
+            exc.OpenStackCloudHTTPError,
+            list, _utils._poll_tolerating_transient(poll, range(10), 'thing'))
+        self.assertEqual(_utils._MAX_POLL_FAILURES, poll.call_count)
+
+    def _inline_executor(self):
+        def submit(call):
+            future = mock.Mock()
+            try:
+                future.result.return_value = call()
+            except Exception as e:
+                future.result.side_effect = e
+            return future
+        return mock.Mock(**{'submit.side_effect': submit})
+
+    def test_run_concurrently(self):
+        self.assertEqual(
+            {'a': 1, 'b': 2},
+            _utils._run_concurrently(
+                self._inline_executor(), {'a': lambda: 1, 'b': lambda: 2},
+                'Error'))
+
+    def _fail(self, message):
+        def call():
+            raise exc.OpenStackCloudException(message)
+        return call
+
+    def test_run_concurrently_one_failure(self):
+        error = self.assertRaises(
+            exc.OpenStackCloudException,
+            _utils._run_concurrently, self._inline_executor(),
+            {'a': self._fail('Error with a'), 'b': lambda: 2},
+            'Error with things')
+        self.assertEqual('Error with a', str(error))
+
+    def test_run_concurrently_several_failures(self):
+        calls = {'a': self._fail('Error with a'),
+                 'b': self._fail('Error with b'),
+                 'c': mock.Mock()}
+        error = self.assertRaises(
+            exc.OpenStackCloudException,
+            _utils._run_concurrently, self._inline_executor(),
+            calls, 'Error with things')
+        self.assertEqual(
+            'Error with things: Error with a; Error with b', str(error))
+        calls['c'].assert_called_once_with()
+
+    def test_file_hash_store_creates_schema_once(self):
+        store_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, store_dir)
+        with mock.patch('sqlite3.connect', wraps=sqlite3.connect) as connect:
+            store = _utils.FileHashStore(
+                os.path.join(store_dir, 'hashes', 'file_hashes.sqlite'))
+            self.addCleanup(store.close)
+            stat = os.stat(store_dir)
+            store.set(store_dir, stat, 'md5', 'sha256')
+            self.assertEqual(('md5', 'sha256'), store.get(store_dir, stat))
+        self.assertEqual(1, connect.call_count)
+
+    def test_file_hash_store_ignores_unusable_path(self):
+        with tempfile.NamedTemporaryFile() as not_a_dir:
+            store = _utils.FileHashStore(
+                os.path.join(not_a_dir.name, 'file_hashes.sqlite'))
+            stat = os.stat(not_a_dir.name)
+            store.set(not_a_dir.name, stat, 'md5', 'sha256')
+            self.assertIsNone(store.get(not_a_dir.name, stat))
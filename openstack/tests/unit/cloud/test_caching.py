@@ -10,7 +10,9 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 import concurrent
+import threading
 import time
+from unittest import mock
 
 import testtools
 from testscenarios import load_tests_apply_scenarios as load_tests  # noqa
@@ -107,6 +109,17 @@ class TestMemoryCache(base.TestCase):
     def test_openstack_cloud(self):
         self.assertIsInstance(self.cloud, openstack.connection.Connection)
 
+    def test_make_cache_key(self):
+        def list_things():
+            pass
+
+        generate_key = self.cloud._make_cache_key('ns', list_things)
+        self.assertIs(
+            generate_key, self.cloud._make_cache_key('ns', list_things))
+        self.assertEqual(
+            '_test_cloud_:ns_list_things_a,b_x:1,y:2',
+            generate_key('a', 'b', y=2, x=1, cache=False))
+
     def test_list_projects_v3(self):
         project_one = self._get_project_data()
         project_two = self._get_project_data()
@@ -179,6 +192,40 @@ class TestMemoryCache(base.TestCase):
             self.cloud.list_projects())
         self.assert_calls()
 
+    def test_delete_stack_invalidates_list_stacks(self):
+        stack_id = self.getUniqueString('id')
+        stack_name = self.getUniqueString('name')
+        fake_stack = fakes.make_fake_stack(stack_id, stack_name)
+        list_uri = '{endpoint}/stacks'.format(
+            endpoint=fakes.ORCHESTRATION_ENDPOINT)
+        stack_uri = '{endpoint}/stacks/{name}/{id}'.format(
+            endpoint=fakes.ORCHESTRATION_ENDPOINT,
+            id=stack_id, name=stack_name)
+        self.register_uris([
+            dict(method='GET', uri=list_uri,
+                 json={'stacks': [fake_stack]}),
+            dict(method='GET',
+                 uri='{endpoint}/stacks/{name}?resolve_outputs=False'.format(
+                     endpoint=fakes.ORCHESTRATION_ENDPOINT, name=stack_name),
+                 status_code=302,
+                 headers=dict(
+                     location=stack_uri + '?resolve_outputs=False')),
+            dict(method='GET', uri=stack_uri + '?resolve_outputs=False',
+                 json={'stack': fake_stack}),
+            dict(method='DELETE',
+                 uri='{endpoint}/stacks/{id}'.format(
+                     endpoint=fakes.ORCHESTRATION_ENDPOINT, id=stack_id)),
+            dict(method='GET', uri=list_uri, json={'stacks': []}),
+        ])
+        self.assertEqual(
+            [stack_id], [s['id'] for s in self.cloud.list_stacks()])
+        # Served from the cache
+        self.assertEqual(
+            [stack_id], [s['id'] for s in self.cloud.list_stacks()])
+        self.assertTrue(self.cloud.delete_stack(stack_name))
+        self.assertEqual([], self.cloud.list_stacks())
+        self.assert_calls()
+
     def test_list_servers_no_herd(self):
         self.cloud._SERVER_AGE = 2
         fake_server = fakes.make_fake_server('1234', 'name')
@@ -198,6 +245,57 @@ class TestMemoryCache(base.TestCase):
 
         self.assert_calls()
 
+    def _list_servers_concurrently(self, result):
+        # The first caller refreshes the cold cache and blocks in
+        # _list_servers until released, while a second one waits on it.
+        started = threading.Event()
+        release = threading.Event()
+
+        def _list_servers(**kwargs):
+            started.set()
+            release.wait()
+            if isinstance(result, BaseException):
+                raise result
+            return result
+
+        self.cloud._SERVER_AGE = 2
+        with mock.patch.object(
+                self.cloud, '_list_servers',
+                side_effect=_list_servers) as mock_list:
+            with concurrent.futures.ThreadPoolExecutor(2) as pool:
+                first = pool.submit(self.cloud.list_servers, bare=True)
+                started.wait()
+                second = pool.submit(self.cloud.list_servers, bare=True)
+                self.assertFalse(second.done())
+                release.set()
+                concurrent.futures.wait([first, second])
+        mock_list.assert_called_once_with(
+            detailed=False, all_projects=False, bare=True)
+        return first, second
+
+    def test_list_servers_waits_for_refresh(self):
+        fake_server = fakes.make_fake_server('1234', 'name')
+        first, second = self._list_servers_concurrently([fake_server])
+
+        self.assertEqual([fake_server], first.result())
+        self.assertEqual([fake_server], second.result())
+
+    def test_list_servers_refresh_interrupted(self):
+        class Interrupted(BaseException):
+            pass
+
+        first, second = self._list_servers_concurrently(Interrupted())
+
+        self.assertRaises(Interrupted, first.result)
+        self.assertRaises(Interrupted, second.result)
+        # The failed refresh doesn't block the next one
+        self.assertIsNone(self.cloud._servers_future)
+        with mock.patch.object(
+                self.cloud, '_list_servers', return_value=[]) as mock_list:
+            self.assertEqual([], self.cloud.list_servers(bare=True))
+        mock_list.assert_called_once_with(
+            detailed=False, all_projects=False, bare=True)
+
     def test_list_volumes(self):
         fake_volume = fakes.FakeVolume('volume1', 'available',
                                        'Volume 1 Display Name')
@@ -279,12 +377,12 @@ class TestMemoryCache(base.TestCase):
                  json={'volume': fake_vol_creating}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'volumev2', 'public', append=['volumes', 'detail']),
-                 json={'volumes': [fake_volb4, fake_vol_creating]}),
+                     'volumev2', 'public', append=['volumes', _id]),
+                 json={'volume': fake_vol_creating}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'volumev2', 'public', append=['volumes', 'detail']),
-                 json={'volumes': [fake_volb4, fake_vol_avail]}),
+                     'volumev2', 'public', append=['volumes', _id]),
+                 json={'volume': fake_vol_avail}),
             dict(method='GET',
                  uri=self.get_mock_url(
                      'volumev2', 'public', append=['volumes', 'detail']),
@@ -293,6 +391,10 @@ class TestMemoryCache(base.TestCase):
                  uri=self.get_mock_url(
                      'volumev2', 'public', append=['volumes', _id]),
                  json=now_deleting),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'volumev2', 'public', append=['volumes', _id]),
+                 status_code=404),
             dict(method='GET',
                  uri=self.get_mock_url(
                      'volumev2', 'public', append=['volumes', 'detail']),
@@ -357,7 +459,6 @@ class TestMemoryCache(base.TestCase):
 
         empty_user_list_resp = {'users': []}
         users_list_resp = {'users': [user_data.json_response['user']]}
-        updated_users_list_resp = {'users': [new_resp['user']]}
 
         # Password is None in the original create below
         user_data.json_request['user']['password'] = None
@@ -374,22 +475,13 @@ class TestMemoryCache(base.TestCase):
             # List Users Call
             dict(method='GET', uri=mock_users_url, status_code=200,
                  json=users_list_resp),
-            # List users to get ID for update
-            # Get user using user_id from list
-            # Update user
-            # Get updated user
-            dict(method='GET', uri=mock_users_url, status_code=200,
-                 json=users_list_resp),
+            # Update user, resolving the ID from the cached list
             dict(method='PUT', uri=mock_user_resource_url, status_code=200,
                  json=new_resp, validate=dict(json=new_req)),
-            # List Users Call
-            dict(method='GET', uri=mock_users_url, status_code=200,
-                 json=updated_users_list_resp),
-            # List User to get ID for delete
-            # Get user using user_id from list
+            # The updated user is spliced into the cached list, so there is
+            # no list call here
+            # Get user using user_id from the cached list
             # delete user
-            dict(method='GET', uri=mock_users_url, status_code=200,
-                 json=updated_users_list_resp),
             dict(method='GET', uri=mock_user_resource_url, status_code=200,
                  json=new_resp),
             dict(method='DELETE', uri=mock_user_resource_url, status_code=204),
@@ -478,6 +570,30 @@ class TestMemoryCache(base.TestCase):
 
         self.assert_calls()
 
+    def test_create_image_keeps_unrelated_caches(self):
+        volume_id = self.getUniqueString()
+        image_id = self.getUniqueString()
+        self.register_uris([
+            dict(method='GET',
+                 uri='{endpoint}/stacks'.format(
+                     endpoint=fakes.ORCHESTRATION_ENDPOINT),
+                 json={'stacks': []}),
+            self.get_cinder_discovery_mock_dict(),
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'volumev2', append=['volumes', volume_id, 'action']),
+                 json={'os-volume_upload_image': {'image_id': image_id}}),
+            self.get_glance_discovery_mock_dict(),
+        ])
+
+        self.assertEqual([], self.cloud.list_stacks())
+        self.cloud.create_image(
+            'fake_image', wait=False, volume={'id': volume_id})
+        # Creating an image only invalidates the image list
+        self.assertEqual([], self.cloud.list_stacks())
+
+        self.assert_calls()
+
     def test_list_images_caches_deleted_status(self):
         self.use_glance()
 
@@ -557,6 +673,31 @@ class TestMemoryCache(base.TestCase):
         self.assertCountEqual([down_port], ports)
         self.assert_calls()
 
+    def test_update_subnet_uses_and_invalidates_cache(self):
+        subnet = {'id': 'subnet-id', 'name': 'subnet-name'}
+        updated_subnet = dict(subnet, name='new-name')
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'subnets.json']),
+                 json={'subnets': [subnet]}),
+            dict(method='PUT',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'subnets', 'subnet-id.json']),
+                 json={'subnet': updated_subnet}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'subnets.json']),
+                 json={'subnets': [updated_subnet]}),
+        ])
+        self.assertEqual(subnet, self.cloud.get_subnet('subnet-name'))
+        # The lookup done by update_subnet should hit the cache
+        self.cloud.update_subnet('subnet-name', subnet_name='new-name')
+        # and the update should invalidate it
+        self.assertEqual(updated_subnet, self.cloud.get_subnet('new-name'))
+        self.assert_calls()
+
 
 class TestCacheIgnoresQueuedStatus(base.TestCase):
 
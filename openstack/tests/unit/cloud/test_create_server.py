@@ -17,6 +17,7 @@ test_create_server
 Tests for the `create_server` command.
 """
 import base64
+import threading
 from unittest import mock
 import uuid
 
@@ -117,15 +118,14 @@ class TestCreateServer(base.TestCase):
                          u'max_count': 1,
                          u'min_count': 1,
                          u'name': u'server-name'}})),
-            self.get_nova_discovery_mock_dict(),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'compute', 'public', append=['servers', 'detail']),
-                 json={'servers': [build_server]}),
+                     'compute', 'public', append=['servers', '1234']),
+                 json={'server': build_server}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'compute', 'public', append=['servers', 'detail']),
-                 json={'servers': [error_server]}),
+                     'compute', 'public', append=['servers', '1234']),
+                 json={'server': error_server}),
         ])
         self.assertRaises(
             exc.OpenStackCloudException,
@@ -157,11 +157,10 @@ class TestCreateServer(base.TestCase):
                          u'max_count': 1,
                          u'min_count': 1,
                          u'name': u'server-name'}})),
-            self.get_nova_discovery_mock_dict(),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'compute', 'public', append=['servers', 'detail']),
-                 json={'servers': [fake_server]}),
+                     'compute', 'public', append=['servers', '1234']),
+                 json={'server': fake_server}),
         ])
         self.assertRaises(
             exc.OpenStackCloudTimeout,
@@ -413,8 +412,53 @@ class TestCreateServer(base.TestCase):
         self.assert_calls()
 
     @mock.patch.object(connection.Connection, "get_active_server")
-    @mock.patch.object(connection.Connection, "get_server")
-    def test_wait_for_server(self, mock_get_server, mock_get_active_server):
+    def test_wait_for_server_transient_error(self, mock_get_active_server):
+        """
+        Test that a server side error while polling is waited out.
+        """
+        active_server = fakes.make_fake_server('1234', '', 'ACTIVE')
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['servers', '1234']),
+                 status_code=503),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['servers', '1234']),
+                 json={'server': active_server}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': []}),
+        ])
+        mock_get_active_server.side_effect = lambda server, **kw: server
+
+        server = self.cloud.wait_for_server(active_server)
+
+        self.assertEqual('ACTIVE', server['status'])
+        self.assert_calls()
+
+    def test_wait_for_server_client_error(self):
+        """
+        Test that a client side error while polling is raised right away.
+        """
+        build_server = fakes.make_fake_server('1234', '', 'BUILD')
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['servers', '1234']),
+                 status_code=403),
+        ])
+
+        self.assertRaises(
+            exc.OpenStackCloudHTTPError,
+            self.cloud.wait_for_server, build_server)
+        self.assert_calls()
+
+    @mock.patch.object(connection.Connection, "get_active_server")
+    @mock.patch.object(connection.Connection, "get_server_by_id")
+    def test_wait_for_server(
+            self, mock_get_server_by_id, mock_get_active_server):
         """
         Test that waiting for a server returns the server instance when
         its status changes to "ACTIVE".
@@ -423,27 +467,23 @@ class TestCreateServer(base.TestCase):
         building_server = {'id': 'fake_server_id', 'status': 'BUILDING'}
         active_server = {'id': 'fake_server_id', 'status': 'ACTIVE'}
 
-        mock_get_server.side_effect = iter([building_server, active_server])
-        mock_get_active_server.side_effect = iter([
+        mock_get_server_by_id.side_effect = iter([
             building_server, active_server])
+        mock_get_active_server.side_effect = iter([active_server])
 
         server = self.cloud.wait_for_server(building_server)
 
-        self.assertEqual(2, mock_get_server.call_count)
-        mock_get_server.assert_has_calls([
+        self.assertEqual(2, mock_get_server_by_id.call_count)
+        mock_get_server_by_id.assert_has_calls([
             mock.call(building_server['id']),
             mock.call(active_server['id']),
         ])
 
-        self.assertEqual(2, mock_get_active_server.call_count)
-        mock_get_active_server.assert_has_calls([
-            mock.call(server=building_server, reuse=True, auto_ip=True,
-                      ips=None, ip_pool=None, wait=True, timeout=mock.ANY,
-                      nat_destination=None),
-            mock.call(server=active_server, reuse=True, auto_ip=True,
-                      ips=None, ip_pool=None, wait=True, timeout=mock.ANY,
-                      nat_destination=None),
-        ])
+        # Still building servers are not handed on
+        mock_get_active_server.assert_called_once_with(
+            server=active_server, reuse=True, auto_ip=True,
+            ips=None, ip_pool=None, wait=True, timeout=mock.ANY,
+            nat_destination=None)
 
         self.assertEqual('ACTIVE', server['status'])
 
@@ -510,15 +550,14 @@ class TestCreateServer(base.TestCase):
                          u'max_count': 1,
                          u'min_count': 1,
                          u'name': u'server-name'}})),
-            self.get_nova_discovery_mock_dict(),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'compute', 'public', append=['servers', 'detail']),
-                 json={'servers': [build_server]}),
+                     'compute', 'public', append=['servers', '1234']),
+                 json={'server': build_server}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'compute', 'public', append=['servers', 'detail']),
-                 json={'servers': [fake_server]}),
+                     'compute', 'public', append=['servers', '1234']),
+                 json={'server': fake_server}),
             dict(method='GET',
                  uri=self.get_mock_url(
                      'network', 'public', append=['v2.0', 'ports.json'],
@@ -527,6 +566,7 @@ class TestCreateServer(base.TestCase):
             dict(method='DELETE',
                  uri=self.get_mock_url(
                      'compute', 'public', append=['servers', '1234'])),
+            self.get_nova_discovery_mock_dict(),
             dict(method='GET',
                  uri=self.get_mock_url(
                      'compute', 'public', append=['servers', 'detail']),
@@ -587,6 +627,58 @@ class TestCreateServer(base.TestCase):
             dict(id='image-id'), dict(id='flavor-id'), network='network-name')
         self.assert_calls()
 
+    def test_create_server_network_remembers_network_id(self):
+        """
+        Verify that booting a second server onto the same network doesn't
+        look the network up again.
+        """
+        build_server = fakes.make_fake_server('1234', '', 'BUILD')
+        network = {
+            'id': 'network-id',
+            'name': 'network-name'
+        }
+        create_server = dict(
+            method='POST',
+            uri=self.get_mock_url(
+                'compute', 'public', append=['servers']),
+            json={'server': build_server},
+            validate=dict(
+                json={'server': {
+                    u'flavorRef': u'flavor-id',
+                    u'imageRef': u'image-id',
+                    u'max_count': 1,
+                    u'min_count': 1,
+                    u'networks': [{u'uuid': u'network-id'}],
+                    u'name': u'server-name'}}))
+        get_server = dict(
+            method='GET',
+            uri=self.get_mock_url(
+                'compute', 'public', append=['servers', '1234']),
+            json={'server': build_server})
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': [network]}),
+            dict(create_server),
+            dict(get_server),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': [network]}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'subnets.json']),
+                 json={'subnets': []}),
+            dict(create_server),
+            dict(get_server),
+        ])
+        for _ in range(2):
+            self.cloud.create_server(
+                'server-name', dict(id='image-id'), dict(id='flavor-id'),
+                network='network-name')
+        self.assert_calls()
+
     def test_create_server_network_with_empty_nics(self):
         """
         Verify that if 'network' is supplied, along with an empty 'nics' list,
@@ -916,6 +1008,101 @@ class TestCreateServer(base.TestCase):
 
         self.assert_calls()
 
+    def test_create_boot_attach_volumes_by_name(self):
+        build_server = fakes.make_fake_server('1234', '', 'BUILD')
+        active_server = fakes.make_fake_server('1234', '', 'BUILD')
+
+        vol1 = meta.obj_to_munch(fakes.FakeVolume('01', 'available', 'vol1'))
+        vol2 = meta.obj_to_munch(fakes.FakeVolume('02', 'available', 'vol2'))
+
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': []}),
+            self.get_cinder_discovery_mock_dict(),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'volumev2', 'public', append=['volumes', 'detail']),
+                 json={'volumes': [vol1, vol2]}),
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['os-volumes_boot']),
+                 json={'server': build_server},
+                 validate=dict(
+                     json={'server': {
+                         u'flavorRef': 'flavor-id',
+                         u'imageRef': 'image-id',
+                         u'max_count': 1,
+                         u'min_count': 1,
+                         u'block_device_mapping_v2': [
+                             {
+                                 u'boot_index': 0,
+                                 u'delete_on_termination': True,
+                                 u'destination_type': u'local',
+                                 u'source_type': u'image',
+                                 u'uuid': u'image-id'
+                             },
+                             {
+                                 u'boot_index': u'-1',
+                                 u'delete_on_termination': False,
+                                 u'destination_type': u'volume',
+                                 u'source_type': u'volume',
+                                 u'uuid': u'02'
+                             },
+                             {
+                                 u'boot_index': u'-1',
+                                 u'delete_on_termination': False,
+                                 u'destination_type': u'volume',
+                                 u'source_type': u'volume',
+                                 u'uuid': u'01'
+                             }
+                         ],
+                         u'name': u'server-name'}})),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['servers', '1234']),
+                 json={'server': active_server}),
+        ])
+
+        self.cloud.create_server(
+            name='server-name',
+            image=dict(id='image-id'),
+            flavor=dict(id='flavor-id'),
+            boot_from_volume=False,
+            volumes=['vol2', '01'],
+            wait=False)
+
+        self.assert_calls()
+
+    def test_boot_from_volume_kwargs_lists_volumes_concurrently(self):
+        vol = meta.obj_to_munch(fakes.FakeVolume('01', 'available', 'vol1'))
+        volumes_listed = threading.Event()
+
+        def get_volume_index():
+            volumes_listed.set()
+            return {'vol1': [vol]}
+
+        def get_image(image):
+            # Only returns once the volumes are being listed alongside
+            self.assertTrue(volumes_listed.wait(10))
+            return {'id': 'image-id'}
+
+        with mock.patch.object(
+                self.cloud, '_get_volume_index',
+                side_effect=get_volume_index), \
+                mock.patch.object(
+                    self.cloud, 'get_image', side_effect=get_image), \
+                mock.patch.object(self.cloud, 'list_volumes'):
+            kwargs = self.cloud._get_boot_from_volume_kwargs(
+                image='image-name', boot_from_volume=True, boot_volume=None,
+                volume_size=1, terminate_volume=False, volumes=['vol1'],
+                kwargs={})
+
+        self.assertEqual(
+            ['image-id', '01'],
+            [bdm['uuid'] for bdm in kwargs['block_device_mapping_v2']])
+
     def test_create_boot_from_volume_image_terminate(self):
         build_server = fakes.make_fake_server('1234', '', 'BUILD')
         active_server = fakes.make_fake_server('1234', '', 'BUILD')
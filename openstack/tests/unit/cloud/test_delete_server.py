@@ -16,6 +16,7 @@ test_delete_server
 
 Tests for the `delete_server` command.
 """
+from unittest import mock
 import uuid
 
 from openstack.cloud import exc as shade_exc
@@ -97,6 +98,33 @@ class TestDeleteServer(base.TestCase):
 
         self.assert_calls()
 
+    def test_delete_server_wait_uses_attached_volumes(self):
+        """
+        Test that delete_server doesn't list volumes to find out whether
+        the server had any attached
+        """
+        self.cloud.cache_enabled = True
+        server = fakes.make_fake_server('9999', 'wily', 'ACTIVE')
+        self.register_uris([
+            self.get_nova_discovery_mock_dict(),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['servers', 'detail']),
+                 json={'servers': [server]}),
+            dict(method='DELETE',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['servers', '9999'])),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['servers', 'detail']),
+                 json={'servers': []}),
+        ])
+        with mock.patch.object(self.cloud, 'get_volumes') as get_volumes:
+            self.assertTrue(self.cloud.delete_server('wily', wait=True))
+            get_volumes.assert_not_called()
+
+        self.assert_calls()
+
     def test_delete_server_fails(self):
         """
         Test that delete_server raises non-404 exceptions
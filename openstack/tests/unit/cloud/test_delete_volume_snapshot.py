@@ -96,10 +96,42 @@ class TestDeleteVolumeSnapshot(base.TestCase):
             dict(method='DELETE',
                  uri=self.get_mock_url(
                      'volumev2', 'public',
-                     append=['snapshots', fake_snapshot_dict['id']]))])
+                     append=['snapshots', fake_snapshot_dict['id']])),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'volumev2', 'public',
+                     append=['snapshots', fake_snapshot_dict['id']]),
+                 json={'snapshot': fake_snapshot_dict})])
 
         self.assertRaises(
             exc.OpenStackCloudTimeout,
             self.cloud.delete_volume_snapshot, name_or_id='1234',
             wait=True, timeout=0.01)
         self.assert_calls(do_count=False)
+
+    def test_delete_volume_snapshot_wait(self):
+        """
+        Test that delete_volume_snapshot with a wait polls the snapshot by ID
+        until it is gone.
+        """
+        fake_snapshot = fakes.FakeVolumeSnapshot('1234', 'available',
+                                                 'foo', 'derpysnapshot')
+        fake_snapshot_dict = meta.obj_to_munch(fake_snapshot)
+        snapshot_uri = self.get_mock_url(
+            'volumev2', 'public',
+            append=['snapshots', fake_snapshot_dict['id']])
+
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'volumev2', 'public',
+                     append=['snapshots', 'detail']),
+                 json={'snapshots': [fake_snapshot_dict]}),
+            dict(method='DELETE', uri=snapshot_uri),
+            dict(method='GET', uri=snapshot_uri,
+                 json={'snapshot': fake_snapshot_dict}),
+            dict(method='GET', uri=snapshot_uri, status_code=404)])
+
+        self.assertTrue(
+            self.cloud.delete_volume_snapshot(name_or_id='1234', wait=True))
+        self.assert_calls()
@@ -19,6 +19,8 @@ test_floating_ip_common
 Tests floating IP resource methods for Neutron and Nova-network.
 """
 
+import threading
+import time
 from unittest.mock import patch
 
 from openstack import connection
@@ -29,12 +31,13 @@ from openstack.tests.unit import base
 
 class TestFloatingIP(base.TestCase):
 
+    @patch.object(connection.Connection, '_get_floating_network_id')
     @patch.object(connection.Connection, 'get_floating_ip')
     @patch.object(connection.Connection, '_attach_ip_to_server')
     @patch.object(connection.Connection, 'available_floating_ip')
     def test_add_auto_ip(
             self, mock_available_floating_ip, mock_attach_ip_to_server,
-            mock_get_floating_ip):
+            mock_get_floating_ip, mock_get_floating_network_id):
         server_dict = fakes.make_fake_server(
             server_id='server-id', name='test-server', status="ACTIVE",
             addresses={}
@@ -54,8 +57,58 @@ class TestFloatingIP(base.TestCase):
         self.cloud.add_auto_ip(server=server_dict)
 
         mock_attach_ip_to_server.assert_called_with(
-            timeout=60, wait=False, server=server_dict,
-            floating_ip=floating_ip_dict, skip_attach=False)
+            server=server_dict, floating_ip=floating_ip_dict)
+
+    @patch.object(connection.Connection, '_get_floating_network_id')
+    @patch.object(connection.Connection, '_attach_ip_to_server')
+    @patch.object(connection.Connection, 'available_floating_ip')
+    def test_add_ip_from_pool_reuse_serialized(
+            self, mock_available_floating_ip, mock_attach_ip_to_server,
+            mock_get_floating_network_id):
+        calls = []
+        # The same network, once by name and once by ID
+        mock_get_floating_network_id.return_value = 'nova-id'
+
+        def available_floating_ip(network):
+            calls.append('pick')
+            # Give a concurrent caller the chance to pick the same IP
+            time.sleep(0.01)
+            return {'floating_ip_address': '203.0.113.29'}
+
+        def attach_ip_to_server(server, **kwargs):
+            calls.append('attach')
+            return server
+
+        mock_available_floating_ip.side_effect = available_floating_ip
+        mock_attach_ip_to_server.side_effect = attach_ip_to_server
+        server_dict = fakes.make_fake_server(
+            server_id='server-id', name='test-server', status="ACTIVE",
+            addresses={})
+
+        threads = [
+            threading.Thread(
+                target=self.cloud._add_ip_from_pool,
+                args=(server_dict, network))
+            for network in ('nova', 'nova-id')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(['pick', 'attach', 'pick', 'attach'], calls)
+
+    @patch.object(connection.Connection, 'list_floating_ip_pools')
+    @patch.object(connection.Connection, '_use_neutron_floating')
+    def test_resolve_floating_ip_pool_nova(
+            self, mock_use_neutron_floating, mock_list_floating_ip_pools):
+        mock_use_neutron_floating.return_value = False
+        mock_list_floating_ip_pools.return_value = [{'name': 'nova'}]
+
+        self.assertEqual(
+            ('nova', 'nova'), self.cloud._resolve_floating_ip_pool(None))
+        self.assertEqual(
+            ('nova', 'nova'), self.cloud._resolve_floating_ip_pool('nova'))
+        mock_list_floating_ip_pools.assert_called_once_with()
 
     @patch.object(connection.Connection, '_add_ip_from_pool')
     def test_add_ips_to_server_pool(self, mock_add_ip_from_pool):
@@ -191,6 +244,24 @@ class TestFloatingIP(base.TestCase):
         mock_add_ip_list.assert_called_with(
             server_dict, ips, wait=False, timeout=60, fixed_address=None)
 
+    @patch.object(connection.Connection, 'get_floating_ip')
+    @patch.object(connection.Connection, '_attach_ip_to_server')
+    def test_add_ip_list_uses_first_ip(
+            self, mock_attach_ip_to_server, mock_get_floating_ip):
+        server_dict = fakes.make_fake_server(
+            server_id='server-id', name='test-server', status="ACTIVE",
+            addresses={})
+
+        for ips in (('203.0.113.29', '172.24.4.229'), '203.0.113.29'):
+            self.cloud.add_ip_list(server_dict, ips)
+
+            mock_get_floating_ip.assert_called_with(
+                id=None, filters={'floating_ip_address': '203.0.113.29'})
+            mock_attach_ip_to_server.assert_called_with(
+                server=server_dict,
+                floating_ip=mock_get_floating_ip.return_value,
+                wait=False, timeout=60, fixed_address=None)
+
     @patch.object(connection.Connection, '_needs_floating_ip')
     @patch.object(connection.Connection, '_add_auto_ip')
     def test_add_ips_to_server_auto_ip(
@@ -175,6 +175,26 @@ class TestFloatingIP(base.TestCase):
 
         self.assert_calls()
 
+    def test_list_floating_ips_neutron_missing(self):
+        self.register_uris([
+            dict(method='GET',
+                 uri='https://network.example.com/v2.0/floatingips.json',
+                 status_code=404),
+            dict(method='GET',
+                 uri=self.get_mock_url('compute', append=['os-floating-ips']),
+                 json={'floating_ips': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url('compute', append=['os-floating-ips']),
+                 json={'floating_ips': []}),
+        ])
+
+        # Neutron is only asked once, after that nova is used directly.
+        self.assertEqual([], self.cloud.list_floating_ips())
+        self.assertEqual([], self.cloud.list_floating_ips())
+        self.assertEqual([], self.cloud.list_floating_ips(filters={'Foo': 42}))
+
+        self.assert_calls()
+
     def test_list_floating_ips_with_filters(self):
 
         self.register_uris([
@@ -331,7 +351,11 @@ class TestFloatingIP(base.TestCase):
             dict(method='GET',
                  uri='https://network.example.com/v2.0/subnets.json',
                  json={'subnets': []}),
-            dict(method='GET', uri=fips_mock_uri, json={'floatingips': []}),
+            dict(method='GET',
+                 uri='{0}?floating_network_id={1}&project_id={2}'.format(
+                     fips_mock_uri, self.mock_get_network_rep['id'],
+                     self.cloud.current_project_id),
+                 json={'floatingips': []}),
             dict(method='POST', uri=fips_mock_uri,
                  json=self.mock_floating_ip_new_rep,
                  validate=dict(json={
@@ -356,7 +380,11 @@ class TestFloatingIP(base.TestCase):
             dict(method='GET',
                  uri='https://network.example.com/v2.0/subnets.json',
                  json={'subnets': []}),
-            dict(method='GET', uri=fips_mock_uri, json={'floatingips': []}),
+            dict(method='GET',
+                 uri='{0}?floating_network_id={1}&project_id={2}'.format(
+                     fips_mock_uri, self.mock_get_network_rep['id'],
+                     self.cloud.current_project_id),
+                 json={'floatingips': []}),
             dict(method='POST', uri=fips_mock_uri,
                  json=self.mock_floating_ip_new_rep,
                  validate=dict(json={
@@ -617,7 +645,11 @@ class TestFloatingIP(base.TestCase):
                  json={'subnets': []}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=[
+                         'floating_network_id=my-network-id',
+                         'project_id={0}'.format(
+                             self.cloud.current_project_id)]),
                  json={'floatingips': []}),
             dict(method='POST',
                  uri=self.get_mock_url(
@@ -837,7 +869,11 @@ class TestFloatingIP(base.TestCase):
                  json={'subnets': []}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'network', 'public', append=['v2.0', 'floatingips.json']),
+                     'network', 'public', append=['v2.0', 'floatingips.json'],
+                     qs_elements=[
+                         'floating_network_id={0}'.format(network['id']),
+                         'project_id={0}'.format(
+                             self.cloud.current_project_id)]),
                  json={'floatingips': [fip]}),
             dict(method='POST',
                  uri=self.get_mock_url(
@@ -972,6 +1008,29 @@ class TestFloatingIP(base.TestCase):
             server=dict(id='some-server'))
         self.assert_calls()
 
+    def test_nat_destination_port_skips_ipv6(self):
+        server_port = {
+            "id": "port-id",
+            "device_id": "some-server",
+            'fixed_ips': [
+                {'subnet_id': 'subnet-v6-id', 'ip_address': '2001:db8::2'},
+                {'subnet_id': 'subnet-id', 'ip_address': '172.24.4.2'},
+            ],
+        }
+        self.register_uris([
+            dict(method="GET",
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=['device_id=some-server']),
+                 json={'ports': [server_port]}),
+        ])
+
+        port, fixed_address = self.cloud._nat_destination_port(
+            dict(id='some-server'))
+        self.assertEqual('port-id', port['id'])
+        self.assertEqual('172.24.4.2', fixed_address)
+        self.assert_calls()
+
     def test_find_nat_source_inferred(self):
         # payloads contrived but based on ones from citycloud
         self.register_uris([
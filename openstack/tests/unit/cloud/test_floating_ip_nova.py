@@ -245,9 +245,6 @@ class TestFloatingIP(base.TestCase):
 
     def test_attach_ip_to_server(self):
         self.register_uris([
-            dict(method='GET',
-                 uri=self.get_mock_url('compute', append=['os-floating-ips']),
-                 json={'floating_ips': self.mock_floating_ip_list_rep}),
             dict(method='POST',
                  uri=self.get_mock_url(
                      'compute',
@@ -290,9 +287,6 @@ class TestFloatingIP(base.TestCase):
 
     def test_add_ip_from_pool(self):
         self.register_uris([
-            dict(method='GET',
-                 uri=self.get_mock_url('compute', append=['os-floating-ips']),
-                 json={'floating_ips': self.mock_floating_ip_list_rep}),
             dict(method='GET',
                  uri=self.get_mock_url('compute', append=['os-floating-ips']),
                  json={'floating_ips': self.mock_floating_ip_list_rep}),
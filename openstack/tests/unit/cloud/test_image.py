@@ -370,9 +370,9 @@ class TestImage(BaseTestImage):
                  json=self.fake_image_dict),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'image', append=['images'], base_url_append='v2'),
-                 complete_qs=True,
-                 json=self.fake_search_return)
+                     'image', append=['images', self.image_id],
+                     base_url_append='v2'),
+                 json=self.fake_image_dict)
         ])
 
         self.cloud.create_image(
@@ -381,8 +381,12 @@ class TestImage(BaseTestImage):
             is_public=False, validate_checksum=True)
 
         self.assert_calls()
-        self.assertEqual(self.adapter.request_history[7].text.read(),
-                         self.output)
+        # The image file is streamed as the request body, and closed
+        # once the upload is done.
+        body = self.adapter.request_history[7].text
+        self.assertTrue(body.closed)
+        with open(body.name, 'rb') as image_file:
+            self.assertEqual(image_file.read(), self.output)
 
     def test_create_image_put_v2_import_supported(self):
         self.cloud.image_api_use_tasks = False
@@ -441,9 +445,9 @@ class TestImage(BaseTestImage):
                  json=self.fake_image_dict),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'image', append=['images'], base_url_append='v2'),
-                 complete_qs=True,
-                 json=self.fake_search_return)
+                     'image', append=['images', self.image_id],
+                     base_url_append='v2'),
+                 json=self.fake_image_dict)
         ])
 
         self.cloud.create_image(
@@ -452,8 +456,12 @@ class TestImage(BaseTestImage):
             is_public=False, validate_checksum=True)
 
         self.assert_calls()
-        self.assertEqual(self.adapter.request_history[7].text.read(),
-                         self.output)
+        # The image file is streamed as the request body, and closed
+        # once the upload is done.
+        body = self.adapter.request_history[7].text
+        self.assertTrue(body.closed)
+        with open(body.name, 'rb') as image_file:
+            self.assertEqual(image_file.read(), self.output)
 
     def test_create_image_use_import(self):
         self.cloud.image_api_use_tasks = False
@@ -517,9 +525,9 @@ class TestImage(BaseTestImage):
                  json=self.fake_image_dict),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'image', append=['images'], base_url_append='v2'),
-                 complete_qs=True,
-                 json=self.fake_search_return)
+                     'image', append=['images', self.image_id],
+                     base_url_append='v2'),
+                 json=self.fake_image_dict)
         ])
 
         self.cloud.create_image(
@@ -530,8 +538,12 @@ class TestImage(BaseTestImage):
         )
 
         self.assert_calls()
-        self.assertEqual(self.adapter.request_history[7].text.read(),
-                         self.output)
+        # The image file is streamed as the request body, and closed
+        # once the upload is done.
+        body = self.adapter.request_history[7].text
+        self.assertTrue(body.closed)
+        with open(body.name, 'rb') as image_file:
+            self.assertEqual(image_file.read(), self.output)
 
     def test_create_image_task(self):
         self.cloud.image_api_use_tasks = True
@@ -695,9 +707,9 @@ class TestImage(BaseTestImage):
                      object=self.image_name)),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'image', append=['images'], base_url_append='v2'),
-                 complete_qs=True,
-                 json=self.fake_search_return)
+                     'image', append=['images', self.image_id],
+                     base_url_append='v2'),
+                 json=self.fake_image_dict)
         ])
 
         self.cloud.create_image(
@@ -885,6 +897,10 @@ class TestImage(BaseTestImage):
                      'x-image-meta-checksum': fakes.NO_MD5,
                      'x-glance-registry-purge-props': 'false'
                  })),
+            dict(method='GET',
+                 uri='https://image.example.com/v1/images/{id}'.format(
+                     id=self.image_id),
+                 json={'image': ret}),
             dict(method='GET',
                  uri='https://image.example.com/v1/images/detail',
                  json={'images': [ret]}),
@@ -964,6 +980,55 @@ class TestImage(BaseTestImage):
 
         self.assert_calls()
 
+    def test_update_image_kernel_and_ramdisk(self):
+        kernel = fakes.make_fake_image(
+            image_id=uuid.uuid4().hex, image_name='kernel')
+        ramdisk = fakes.make_fake_image(
+            image_id=uuid.uuid4().hex, image_name='ramdisk')
+        self.register_uris([
+            # Both are resolved from a single listing
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'image', append=['images'], base_url_append='v2'),
+                 json={'images': [kernel, ramdisk]}),
+            dict(method='PATCH',
+                 uri=self.get_mock_url(
+                     'image', append=['images', self.image_id],
+                     base_url_append='v2'),
+                 validate=dict(
+                     json=[
+                         {u'op': u'add', u'value': kernel['id'],
+                          u'path': u'/kernel_id'},
+                         {u'op': u'replace', u'value': ramdisk['id'],
+                          u'path': u'/ramdisk_id'}]),
+                 json=self.fake_image_dict),
+        ])
+
+        self.assertTrue(self.cloud.update_image_properties(
+            image=self._image_dict(self.fake_image_dict),
+            kernel='kernel', ramdisk='ramdisk'))
+
+        self.assert_calls()
+
+    def test_update_image_kernel_multiple_matches(self):
+        kernels = [
+            fakes.make_fake_image(
+                image_id=uuid.uuid4().hex, image_name='kernel')
+            for _ in range(2)]
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'image', append=['images'], base_url_append='v2'),
+                 json={'images': kernels}),
+        ])
+
+        self.assertRaisesRegex(
+            exceptions.SDKException, 'Multiple matches found for kernel',
+            self.cloud.update_image_properties,
+            image=self._image_dict(self.fake_image_dict), kernel='kernel')
+
+        self.assert_calls()
+
     def test_create_image_put_v2_bad_delete(self):
         self.cloud.image_api_use_tasks = False
 
@@ -1141,9 +1206,10 @@ class TestImage(BaseTestImage):
                  ),
                  json=ret),
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
-                 complete_qs=True,
-                 json={'images': [ret]}),
+                 uri='https://image.example.com/v2/images/{id}'.format(
+                     id=self.image_id
+                 ),
+                 json=ret),
         ])
 
         self._call_create_image(
@@ -1206,9 +1272,10 @@ class TestImage(BaseTestImage):
                  ),
                  json=ret),
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
-                 complete_qs=True,
-                 json={'images': [ret]}),
+                 uri='https://image.example.com/v2/images/{id}'.format(
+                     id=self.image_id
+                 ),
+                 json=ret),
         ])
 
         self._call_create_image(
@@ -1272,9 +1339,10 @@ class TestImage(BaseTestImage):
                  ),
                  json=ret),
             dict(method='GET',
-                 uri='https://image.example.com/v2/images',
-                 complete_qs=True,
-                 json={'images': [ret]}),
+                 uri='https://image.example.com/v2/images/{id}'.format(
+                     id=self.image_id
+                 ),
+                 json=ret),
         ])
 
         self._call_create_image(
@@ -1407,8 +1475,9 @@ class TestImageVolume(BaseTestImage):
             self.get_glance_discovery_mock_dict(),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'image', append=['images'], base_url_append='v2'),
-                 json=self.fake_search_return)
+                     'image', append=['images', self.image_id],
+                     base_url_append='v2'),
+                 json=self.fake_image_dict)
         ])
 
         self.cloud.create_image(
@@ -1439,8 +1508,9 @@ class TestImageVolume(BaseTestImage):
             self.get_glance_discovery_mock_dict(),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'image', append=['images'], base_url_append='v2'),
-                 json=self.fake_search_return)
+                     'image', append=['images', self.image_id],
+                     base_url_append='v2'),
+                 json=self.fake_image_dict)
         ])
 
         self.cloud.create_image(
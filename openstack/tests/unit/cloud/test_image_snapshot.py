@@ -54,6 +54,11 @@ class TestImageSnapshot(base.TestCase):
                 method='GET',
                 uri='https://image.example.com/v2/images',
                 json=dict(images=[fake_image])),
+            dict(
+                method='GET',
+                uri='https://image.example.com/v2/images/{id}'.format(
+                    id=self.image_id),
+                json=fake_image),
         ])
 
         self.assertRaises(
@@ -94,8 +99,9 @@ class TestImageSnapshot(base.TestCase):
                 json=dict(images=[pending_image])),
             dict(
                 method='GET',
-                uri='https://image.example.com/v2/images',
-                json=dict(images=[fake_image])),
+                uri='https://image.example.com/v2/images/{id}'.format(
+                    id=self.image_id),
+                json=fake_image),
         ])
         image = self.cloud.create_image_snapshot(
             'test-snapshot', dict(id=self.server_id), wait=True, timeout=2)
@@ -12,6 +12,7 @@
 
 from unittest import mock
 
+import openstack.cloud
 from openstack.cloud import inventory
 import openstack.config
 from openstack.tests import fakes
@@ -73,6 +74,49 @@ class TestInventory(base.TestCase):
         self.assertFalse(inv.clouds[0].get_openstack_vars.called)
         self.assertEqual([server], ret)
 
+    @mock.patch("openstack.config.loader.OpenStackConfig")
+    @mock.patch("openstack.connection.Connection")
+    def test_list_hosts_multiple_clouds(self, mock_cloud, mock_config):
+        mock_config.return_value.get_all.return_value = [{}, {}, {}]
+        mock_cloud.side_effect = lambda config: mock.Mock(
+            **{'config.config': {}})
+
+        inv = inventory.OpenStackInventory()
+
+        self.assertEqual(3, len(inv.clouds))
+        inv.clouds[0].list_servers.return_value = [dict(id='1')]
+        inv.clouds[1].list_servers.side_effect = (
+            openstack.cloud.OpenStackCloudException('broken'))
+        inv.clouds[2].list_servers.return_value = [dict(id='2')]
+
+        ret = inv.list_hosts(fail_on_cloud_config=False)
+
+        self.assertEqual([dict(id='1'), dict(id='2')], ret)
+        for cloud in inv.clouds:
+            cloud.list_servers.assert_called_once_with(
+                detailed=True, all_projects=False)
+        self.assertRaises(
+            openstack.cloud.OpenStackCloudException, inv.list_hosts)
+
+    @mock.patch("concurrent.futures.ThreadPoolExecutor")
+    @mock.patch("openstack.config.loader.OpenStackConfig")
+    @mock.patch("openstack.connection.Connection")
+    def test_list_hosts_pool_size(self, mock_cloud, mock_config,
+                                  mock_executor):
+        mock_config.return_value.get_all.return_value = [{}, {}, {}]
+        mock_cloud.side_effect = [
+            mock.Mock(**{'config.config': {'pool_executor_max_workers': 4}}),
+            mock.Mock(**{'config.config': {'pool_executor_max_workers': 2}}),
+            mock.Mock(**{'config.config': {}}),
+        ]
+        mock_executor.return_value.__enter__.return_value.map.return_value = (
+            [[], [], []])
+
+        inv = inventory.OpenStackInventory()
+        inv.list_hosts()
+
+        mock_executor.assert_called_once_with(max_workers=2)
+
     @mock.patch("openstack.config.loader.OpenStackConfig")
     @mock.patch("openstack.connection.Connection")
     def test_list_hosts_no_detail(self, mock_cloud, mock_config):
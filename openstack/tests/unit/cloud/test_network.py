@@ -72,6 +72,21 @@ class TestNetwork(base.TestCase):
         self.assertEqual([net1, net2], nets)
         self.assert_calls()
 
+    def test_list_networks_revalidated(self):
+        net1 = {'id': '1', 'name': 'net1'}
+        uri = self.get_mock_url(
+            'network', 'public', append=['v2.0', 'networks.json'])
+        self.register_uris([
+            dict(method='GET', uri=uri,
+                 json={'networks': [net1]},
+                 headers={'ETag': '"abc"'}),
+            dict(method='GET', uri=uri, status_code=304,
+                 validate=dict(headers={'If-None-Match': '"abc"'})),
+        ])
+        self.assertEqual([net1], self.cloud.list_networks())
+        self.assertEqual([net1], self.cloud.list_networks())
+        self.assert_calls()
+
     def test_list_networks_filtered(self):
         self.register_uris([
             dict(method='GET',
@@ -83,6 +98,23 @@ class TestNetwork(base.TestCase):
         self.cloud.list_networks(filters={'name': 'test'})
         self.assert_calls()
 
+    def test_list_networks_filtered_by_list(self):
+        net1 = {'id': '1', 'name': 'net1'}
+        uri = self.get_mock_url(
+            'network', 'public', append=['v2.0', 'networks.json'],
+            qs_elements=['id=1', 'id=2'])
+        self.register_uris([
+            dict(method='GET', uri=uri,
+                 json={'networks': [net1]},
+                 headers={'ETag': '"abc"'}),
+            dict(method='GET', uri=uri, status_code=304,
+                 validate=dict(headers={'If-None-Match': '"abc"'})),
+        ])
+        for _ in range(2):
+            self.assertEqual(
+                [net1], self.cloud.list_networks(filters={'id': ['1', '2']}))
+        self.assert_calls()
+
     def test_create_network(self):
         self.register_uris([
             dict(method='POST',
@@ -334,6 +366,48 @@ class TestNetwork(base.TestCase):
                           self.cloud.delete_network, network_name)
         self.assert_calls()
 
+    def _delete_networks_uris(self, delete_status):
+        networks = [{'id': 'net-1', 'name': 'one'},
+                    {'id': 'net-2', 'name': 'two'}]
+        delete_uris = [
+            self.get_mock_url(
+                'network', 'public',
+                append=['v2.0', 'networks', "%s.json" % network['id']])
+            for network in networks]
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': networks}),
+        ] + [dict(method='DELETE', uri=uri, status_code=delete_status)
+             for uri in delete_uris])
+        return delete_uris
+
+    def _assert_deleted(self, delete_uris):
+        # The deletions run concurrently, so they can arrive in any order.
+        self.assertEqual(
+            sorted(delete_uris),
+            sorted(h.url for h in self.adapter.request_history
+                   if h.method == 'DELETE'))
+        self.assertEqual(len(self.calls), len(self.adapter.request_history))
+
+    def test_delete_networks(self):
+        delete_uris = self._delete_networks_uris(204)
+        self.assertEqual(
+            {'one': True, 'net-2': True, 'missing': False},
+            self.cloud.delete_networks(['one', 'net-2', 'missing']))
+        self._assert_deleted(delete_uris)
+
+    def test_delete_networks_exception(self):
+        delete_uris = self._delete_networks_uris(503)
+        # Both deletions are attempted, and both failures are reported
+        with testtools.ExpectedException(
+            openstack.cloud.OpenStackCloudException,
+            'Error deleting networks: .*one.*; .*two'
+        ):
+            self.cloud.delete_networks(['one', 'two'])
+        self._assert_deleted(delete_uris)
+
     def test_get_network_by_id(self):
         network_id = "test-net-id"
         network_name = "network"
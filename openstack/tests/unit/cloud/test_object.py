@@ -12,6 +12,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import hashlib
+import io
+import os
+import shutil
 import tempfile
 from unittest import mock
 
@@ -19,6 +23,8 @@ import testtools
 
 import openstack.cloud
 import openstack.cloud.openstackcloud as oc_oc
+from openstack.cloud import _object_store
+from openstack.cloud import _utils
 from openstack.cloud import exc
 from openstack import exceptions
 from openstack.object_store.v1 import _proxy
@@ -614,6 +620,17 @@ class TestObject(BaseTestObject):
         self.assertEqual(1000, self.cloud.get_object_segment_size(1000))
         self.assertEqual(1000, self.cloud.get_object_segment_size(1100))
 
+    def test_get_object_segment_size_queries_once(self):
+        self.register_uris([
+            dict(method='GET', uri='https://object-store.example.com/info',
+                 json=dict(
+                     swift={'max_file_size': 1000},
+                     slo={'min_segment_size': 500}),
+                 headers={'Content-Type': 'application/json'})])
+        self.assertEqual(500, self.cloud.get_object_segment_size(400))
+        self.assertEqual(1000, self.cloud.get_object_segment_size(1100))
+        self.assert_calls()
+
     def test_get_object_segment_size_http_404(self):
         self.register_uris([
             dict(method='GET', uri='https://object-store.example.com/info',
@@ -645,6 +662,68 @@ class TestObjectUploads(BaseTestObject):
             self.object_file.name)
         self.endpoint = self.cloud._object_store_client.get_endpoint()
 
+    def test_get_file_hashes_rehashes_resized_file(self):
+        mtime_ns = os.stat(self.object_file.name).st_mtime_ns
+        with open(self.object_file.name, 'ab') as f:
+            f.write(b'more')
+        # Same mtime, as with a rewrite within the filesystem's resolution
+        os.utime(self.object_file.name, ns=(mtime_ns, mtime_ns))
+
+        self.assertEqual(
+            self.cloud._calculate_data_hashes(self.content + b'more'),
+            self.cloud._get_file_hashes(self.object_file.name))
+
+    def test_get_file_hashes_rehashes_replaced_file(self):
+        mtime_ns = os.stat(self.object_file.name).st_mtime_ns
+        content = bytes(b ^ 1 for b in self.content)
+        with tempfile.NamedTemporaryFile(
+                dir=os.path.dirname(self.object_file.name),
+                delete=False) as f:
+            f.write(content)
+        # Same size and mtime, as with a copy that preserved the mtime
+        os.utime(f.name, ns=(mtime_ns, mtime_ns))
+        os.replace(f.name, self.object_file.name)
+
+        self.assertEqual(
+            self.cloud._calculate_data_hashes(content),
+            self.cloud._get_file_hashes(self.object_file.name))
+
+    def test_get_file_hashes_from_store(self):
+        store_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, store_dir)
+        store = _utils.FileHashStore(
+            os.path.join(store_dir, 'file_hashes.sqlite'))
+        self.addCleanup(store.close)
+        self.cloud._file_hash_store = store
+        self.cloud._file_hash_cache.clear()
+        self.assertEqual(
+            (self.md5, self.sha256),
+            self.cloud._get_file_hashes(self.object_file.name))
+
+        # As seen from a new process
+        self.cloud._file_hash_cache.clear()
+        with mock.patch.object(
+                self.cloud, '_calculate_data_hashes') as calculate:
+            self.assertEqual(
+                (self.md5, self.sha256),
+                self.cloud._get_file_hashes(self.object_file.name))
+            calculate.assert_not_called()
+
+        # A changed file is hashed again
+        self.cloud._file_hash_cache.clear()
+        with open(self.object_file.name, 'ab') as f:
+            f.write(b'more')
+        self.assertEqual(
+            self.cloud._calculate_data_hashes(self.content + b'more'),
+            self.cloud._get_file_hashes(self.object_file.name))
+
+    def test_calculate_data_hashes_across_chunks(self):
+        data = os.urandom(_object_store.HASH_CHUNK_SIZE * 2 + 1)
+
+        self.assertEqual(
+            (hashlib.md5(data).hexdigest(), hashlib.sha256(data).hexdigest()),
+            self.cloud._calculate_data_hashes(io.BytesIO(data)))
+
     def test_create_object(self):
 
         self.register_uris([
@@ -676,6 +755,43 @@ class TestObjectUploads(BaseTestObject):
 
         self.assert_calls()
 
+    def test_is_object_stale_with_hashes_skips_file(self):
+        self.register_uris([
+            dict(method='HEAD',
+                 uri='{endpoint}/{container}/{object}'.format(
+                     endpoint=self.endpoint, container=self.container,
+                     object=self.object),
+                 headers={
+                     'x-object-meta-x-sdk-md5': self.md5,
+                     'x-object-meta-x-sdk-sha256': self.sha256,
+                 })
+        ])
+
+        with mock.patch.object(
+                self.cloud, '_get_file_hashes') as mock_get_file_hashes:
+            self.assertFalse(self.cloud.is_object_stale(
+                self.container, self.object,
+                file_md5=self.md5, file_sha256=self.sha256))
+            mock_get_file_hashes.assert_not_called()
+
+        self.assert_calls()
+
+    def test_is_object_stale_without_checksums_skips_file(self):
+        self.register_uris([
+            dict(method='HEAD',
+                 uri='{endpoint}/{container}/{object}'.format(
+                     endpoint=self.endpoint, container=self.container,
+                     object=self.object))
+        ])
+
+        with mock.patch.object(
+                self.cloud, '_get_file_hashes') as mock_get_file_hashes:
+            self.assertTrue(self.cloud.is_object_stale(
+                self.container, self.object, self.object_file.name))
+            mock_get_file_hashes.assert_not_called()
+
+        self.assert_calls()
+
     def test_create_directory_marker_object(self):
 
         self.register_uris([
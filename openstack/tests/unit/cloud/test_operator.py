@@ -116,6 +116,15 @@ class TestOperatorCloud(base.TestCase):
         get_session_mock.return_value = session_mock
         self.assertTrue(self.cloud.has_service("image"))
 
+    @mock.patch.object(cloud_region.CloudRegion, 'get_session')
+    def test_has_service_remembered(self, get_session_mock):
+        session_mock = mock.Mock()
+        session_mock.get_endpoint.return_value = 'http://fake.url'
+        get_session_mock.return_value = session_mock
+        self.assertTrue(self.cloud.has_service("image"))
+        self.assertTrue(self.cloud.has_service("image"))
+        session_mock.get_endpoint.assert_called_once()
+
     def test_list_hypervisors(self):
         '''This test verifies that calling list_hypervisors results in a call
         to nova client.'''
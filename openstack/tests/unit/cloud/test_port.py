@@ -164,6 +164,32 @@ class TestPort(base.TestCase):
             network_id='test-net-id', nome='test-port-name',
             stato_amministrativo_porta=True)
 
+    def test_create_ports(self):
+        port = self.mock_neutron_port_create_rep['port']
+        self.register_uris([
+            dict(method="POST",
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json']),
+                 json={'ports': [port, port]},
+                 validate=dict(
+                     json={'ports': [
+                         {'network_id': 'test-net-id', 'name': 'one'},
+                         {'network_id': 'test-net-id', 'name': 'two'}]}))
+        ])
+        ports = self.cloud.create_ports([
+            {'network_id': 'test-net-id', 'name': 'one'},
+            {'network_id': 'test-net-id', 'name': 'two'}])
+        self.assertEqual([port, port], ports)
+        self.assert_calls()
+
+    def test_create_ports_parameters(self):
+        self.assertRaises(
+            TypeError, self.cloud.create_ports,
+            [{'network_id': 'test-net-id', 'nome': 'test-port-name'}])
+        self.assertRaises(
+            OpenStackCloudException, self.cloud.create_ports,
+            [{'name': 'test-port-name'}])
+
     def test_create_port_exception(self):
         self.register_uris([
             dict(method="POST",
@@ -317,6 +343,42 @@ class TestPort(base.TestCase):
 
         self.assertTrue(self.cloud.delete_port(name_or_id='first-port'))
 
+    def test_delete_port_direct(self):
+        port_id = 'd80b1a3b-4fc1-49f3-952e-1e2ab7081d8b'
+        self.cloud.use_direct_get = True
+        self.register_uris([
+            dict(method='DELETE',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'ports', '%s.json' % port_id]),
+                 json={}),
+            dict(method='DELETE',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'ports', '%s.json' % port_id]),
+                 status_code=404),
+        ])
+
+        # The port isn't looked up first, and a 404 means it's gone
+        self.assertTrue(self.cloud.delete_port(name_or_id=port_id))
+        self.assertFalse(self.cloud.delete_port(name_or_id=port_id))
+        self.assert_calls()
+
+    def test_update_port_direct_not_found(self):
+        port_id = 'd80b1a3b-4fc1-49f3-952e-1e2ab7081d8b'
+        self.cloud.use_direct_get = True
+        self.register_uris([
+            dict(method='PUT',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'ports', '%s.json' % port_id]),
+                 status_code=404),
+        ])
+        self.assertRaisesRegex(
+            OpenStackCloudException, "failed to find port",
+            self.cloud.update_port, name_or_id=port_id, name='new-name')
+        self.assert_calls()
+
     def test_delete_port_not_found(self):
         self.register_uris([
             dict(method='GET',
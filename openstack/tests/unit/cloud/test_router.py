@@ -301,6 +301,23 @@ class TestRouter(base.TestCase):
         self.assertTrue(self.cloud.delete_router(self.router_name))
         self.assert_calls()
 
+    def test_delete_routers(self):
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'routers.json']),
+                 json={'routers': [self.mock_router_rep]}),
+            dict(method='DELETE',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'routers', '%s.json' % self.router_id]),
+                 json={})
+        ])
+        self.assertEqual(
+            {self.router_name: True, 'missing': False},
+            self.cloud.delete_routers([self.router_name, 'missing']))
+        self.assert_calls()
+
     def test_delete_router_not_found(self):
         self.register_uris([
             dict(method='GET',
@@ -342,14 +359,6 @@ class TestRouter(base.TestCase):
         self.assertTrue(self.cloud.delete_router("123"))
         self.assert_calls()
 
-    def _get_mock_dict(self, owner, json):
-        return dict(method='GET',
-                    uri=self.get_mock_url(
-                        'network', 'public', append=['v2.0', 'ports.json'],
-                        qs_elements=["device_id=%s" % self.router_id,
-                                     "device_owner=network:%s" % owner]),
-                    json=json)
-
     def _test_list_router_interfaces(self, router, interface_type,
                                      router_type="normal",
                                      expected_result=None):
@@ -385,18 +394,21 @@ class TestRouter(base.TestCase):
             else:
                 expected_result = [internal_port, external_port]
 
-        mock_uris = []
-        for port_type in ['router_interface',
-                          'router_interface_distributed',
-                          'ha_router_replicated_interface']:
-            ports = {}
-            if port_type == device_owner:
-                ports = {'ports': [internal_port]}
-            mock_uris.append(self._get_mock_dict(port_type, ports))
-        mock_uris.append(self._get_mock_dict('router_gateway',
-                                             {'ports': [external_port]}))
-
-        self.register_uris(mock_uris)
+        # L3 HA ports belong to the router too, but are never returned
+        ha_port = {
+            'id': 'ha_port_id',
+            'fixed_ips': [],
+            'device_id': self.router_id,
+            'device_owner': 'network:router_ha_interface'
+        }
+
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'ports.json'],
+                     qs_elements=["device_id=%s" % self.router_id]),
+                 json={'ports': [external_port, ha_port, internal_port]}),
+        ])
         ret = self.cloud.list_router_interfaces(router, interface_type)
         self.assertEqual(expected_result, ret)
         self.assert_calls()
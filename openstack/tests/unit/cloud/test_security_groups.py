@@ -13,6 +13,8 @@
 
 import copy
 
+import testtools
+
 import openstack.cloud
 from openstack.tests.unit import base
 from openstack.tests import fakes
@@ -390,6 +392,88 @@ class TestSecurityGroups(base.TestCase):
         self.assertEqual(expected_new_rule, new_rule)
         self.assert_calls()
 
+    def test_create_security_group_rules_neutron(self):
+        self.cloud.secgroup_source = 'neutron'
+        rules = [
+            dict(secgroup_name_or_id=neutron_grp_dict['name'],
+                 port_range_min=22, port_range_max=22, protocol='tcp'),
+            dict(secgroup_name_or_id=neutron_grp_dict['id'],
+                 port_range_min=-1, port_range_max=-1, protocol='icmp',
+                 direction='egress'),
+        ]
+        expected_args = [
+            dict(security_group_id=neutron_grp_dict['id'],
+                 port_range_min=22, port_range_max=22, protocol='tcp',
+                 remote_ip_prefix=None, remote_group_id=None,
+                 direction='ingress', ethertype='IPv4'),
+            dict(security_group_id=neutron_grp_dict['id'],
+                 port_range_min=None, port_range_max=None, protocol='icmp',
+                 remote_ip_prefix=None, remote_group_id=None,
+                 direction='egress', ethertype='IPv4'),
+        ]
+        new_rules = [dict(args, id=str(i))
+                     for i, args in enumerate(expected_args)]
+
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-groups']),
+                 json={'security_groups': [neutron_grp_dict]}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-groups']),
+                 json={'security_groups': [neutron_grp_dict]}),
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'security-group-rules']),
+                 json={'security_group_rules': new_rules},
+                 validate=dict(json={
+                     'security_group_rules': expected_args}))
+        ])
+        created = self.cloud.create_security_group_rules(rules)
+        self.assertEqual(['0', '1'], [r['id'] for r in created])
+        self.assert_calls()
+
+    def test_create_security_group_rules_nova(self):
+        self.has_neutron = False
+        self.cloud.secgroup_source = 'nova'
+
+        new_rule = fakes.make_fake_nova_security_group_rule(
+            id='xyz', from_port=1, to_port=65535, ip_protocol='tcp',
+            cidr='1.2.3.4/32')
+        rule_uri = '{endpoint}/os-security-group-rules'.format(
+            endpoint=fakes.COMPUTE_ENDPOINT)
+
+        # The group is only looked up once for both rules
+        self.register_uris([
+            dict(method='GET',
+                 uri='{endpoint}/os-security-groups'.format(
+                     endpoint=fakes.COMPUTE_ENDPOINT),
+                 json={'security_groups': [nova_grp_dict]}),
+        ] + [
+            dict(method='POST', uri=rule_uri,
+                 json={'security_group_rule': new_rule},
+                 validate=dict(json={
+                     "security_group_rule": {
+                         "from_port": 1,
+                         "ip_protocol": "tcp",
+                         "to_port": 65535,
+                         "parent_group_id": "2",
+                         "cidr": "1.2.3.4/32",
+                         "group_id": None}}))
+            for _ in range(2)
+        ])
+
+        created = self.cloud.create_security_group_rules([
+            dict(secgroup_name_or_id='2', protocol='tcp',
+                 remote_ip_prefix='1.2.3.4/32')
+            for _ in range(2)])
+        self.assertEqual(2, len(created))
+        self.assert_calls()
+
     def test_create_security_group_rule_neutron_specific_tenant(self):
         self.cloud.secgroup_source = 'neutron'
         args = dict(
@@ -546,6 +630,47 @@ class TestSecurityGroups(base.TestCase):
         self.assertTrue(r)
         self.assert_calls()
 
+    def _delete_security_group_rules_uris(self, *statuses):
+        delete_uris = [
+            self.get_mock_url(
+                'network', 'public',
+                append=['v2.0', 'security-group-rules', 'rule-%d' % i])
+            for i in range(len(statuses))]
+        self.register_uris([
+            dict(method='DELETE', uri=uri, status_code=status)
+            for uri, status in zip(delete_uris, statuses)])
+        return delete_uris
+
+    def _assert_deleted(self, delete_uris):
+        # The deletions run concurrently, so they can arrive in any order.
+        self.assertEqual(
+            sorted(delete_uris),
+            sorted(h.url for h in self.adapter.request_history
+                   if h.method == 'DELETE'))
+        self.assertEqual(len(self.calls), len(self.adapter.request_history))
+
+    def test_delete_security_group_rules_neutron(self):
+        self.cloud.secgroup_source = 'neutron'
+        delete_uris = self._delete_security_group_rules_uris(204, 404)
+        self.assertEqual(
+            {'rule-0': True, 'rule-1': False},
+            self.cloud.delete_security_group_rules(['rule-0', 'rule-1']))
+        self._assert_deleted(delete_uris)
+
+    def test_delete_security_group_rules_exception(self):
+        self.cloud.secgroup_source = 'neutron'
+        delete_uris = self._delete_security_group_rules_uris(503, 204, 503)
+        # Every deletion is attempted, and every failure is reported
+        with testtools.ExpectedException(
+            openstack.cloud.OpenStackCloudException,
+            'Error deleting security group rules: '
+            'Error deleting security group rule rule-0: .*; '
+            'Error deleting security group rule rule-2: '
+        ):
+            self.cloud.delete_security_group_rules(
+                ['rule-0', 'rule-1', 'rule-2'])
+        self._assert_deleted(delete_uris)
+
     def test_delete_security_group_rule_none(self):
         self.has_neutron = False
         self.cloud.secgroup_source = None
@@ -54,6 +54,14 @@ class TestShade(base.TestCase):
     def test_openstack_cloud(self):
         self.assertIsInstance(self.cloud, connection.Connection)
 
+    def test_uncached_methods_leave_class_alone(self):
+        self.assertFalse(self.cloud.cache_enabled)
+        self.cloud.list_volumes.invalidate(self.cloud)
+        # The no-op invalidate belongs to this cloud's own wrapper, not to
+        # the function shared through the class
+        self.assertFalse(hasattr(
+            connection.Connection.list_volumes.func, 'invalidate'))
+
     def test_endpoint_for(self):
         dns_override = 'https://override.dns.example.com'
         self.cloud.config.config['dns_endpoint_override'] = dns_override
@@ -207,6 +215,56 @@ class TestShade(base.TestCase):
 
         self.assert_calls()
 
+    @mock.patch('time.sleep')
+    def test_list_users_retries_throttled(self, mock_sleep):
+        self.cloud.config.config['identity_status_code_retries'] = 1
+        uri = self.get_mock_url(
+            'identity', resource='users', base_url_append='v3')
+        self.register_uris([
+            dict(method='GET', uri=uri, status_code=429),
+            dict(method='GET', uri=uri, status_code=200,
+                 json={'users': []}),
+        ])
+
+        self.assertEqual([], self.cloud.list_users())
+
+        self.assert_calls()
+
+    def test_warmup(self):
+        self.register_uris([
+            self.get_glance_discovery_mock_dict(),
+        ])
+
+        self.cloud.warmup(services=('compute', 'image'))
+
+        self.assertIn('compute', self.cloud._proxies)
+        self.assertIn('image', self.cloud._proxies)
+        self.assertIn(
+            'https://image.example.com/',
+            [h.url for h in self.adapter.request_history])
+
+    def test_list_all(self):
+        self.register_uris([
+            self.get_nova_discovery_mock_dict(),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['os-keypairs']),
+                 json={'keypairs': []}),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'identity', resource='users', base_url_append='v3'),
+                 json={'users': []}),
+        ])
+
+        self.assertEqual(
+            {'keypairs': [], 'users': []},
+            self.cloud.list_all(['keypairs', 'users']))
+
+    def test_list_all_unknown_resource(self):
+        self.assertRaises(
+            exc.OpenStackCloudException,
+            self.cloud.list_all, ['keypairs', 'unicorns'])
+
     def test_neutron_not_found(self):
         self.use_nothing()
         self.cloud.has_service = mock.Mock(return_value=False)
@@ -463,6 +521,49 @@ class TestShade(base.TestCase):
 
         self.assert_calls()
 
+    def test_search_servers_pushes_down_filters(self):
+        '''search_servers passes the filters nova understands to nova and
+        applies all of them locally.'''
+        server1 = fakes.make_fake_server('123', 'mickey')
+        server2 = fakes.make_fake_server('345', 'mouse')
+        self.register_uris([
+            self.get_nova_discovery_mock_dict(),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['servers', 'detail'],
+                     qs_elements=['status=ACTIVE']),
+                 complete_qs=True,
+                 json={'servers': [server1, server2]}),
+        ])
+
+        r = self.cloud.search_servers(
+            filters={'status': 'ACTIVE', 'name': 'mouse'})
+
+        self.assertEqual(['345'], [s['id'] for s in r])
+        self.assert_calls()
+
+    def test_search_servers_keeps_regex_filters_local(self):
+        '''nova matches key_name as a regular expression, so it is only
+        applied locally.'''
+        server1 = fakes.make_fake_server('123', 'mickey')
+        server2 = fakes.make_fake_server('345', 'mouse')
+        server2['key_name'] = 'key+1'
+        self.register_uris([
+            self.get_nova_discovery_mock_dict(),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'compute', 'public', append=['servers', 'detail'],
+                     qs_elements=['status=ACTIVE']),
+                 complete_qs=True,
+                 json={'servers': [server1, server2]}),
+        ])
+
+        r = self.cloud.search_servers(
+            filters={'status': 'ACTIVE', 'key_name': 'key+1'})
+
+        self.assertEqual(['345'], [s['id'] for s in r])
+        self.assert_calls()
+
     def test_iterate_timeout_bad_wait(self):
         with testtools.ExpectedException(
                 exc.OpenStackCloudException,
@@ -487,6 +588,29 @@ class TestShade(base.TestCase):
         next(iter)
         mock_sleep.assert_called_with(1.0)
 
+    @mock.patch('time.sleep')
+    def test_iterate_timeout_max_wait(self, mock_sleep):
+        iter = utils.iterate_timeout(
+            10, "test_iterate_timeout_max_wait", wait=1, max_wait=3)
+        for _ in range(4):
+            next(iter)
+        self.assertEqual(
+            [mock.call(1.0), mock.call(2.0), mock.call(3.0)],
+            mock_sleep.call_args_list)
+
+    @mock.patch('random.uniform', return_value=1.1)
+    @mock.patch('time.sleep')
+    def test_iterate_timeout_jitter(self, mock_sleep, mock_uniform):
+        iter = utils.iterate_timeout(
+            10, "test_iterate_timeout_jitter", wait=1, max_wait=3,
+            jitter=0.2)
+        for _ in range(3):
+            next(iter)
+        mock_uniform.assert_called_with(0.8, 1.2)
+        self.assertEqual(
+            [mock.call(1.1), mock.call(2.2)],
+            mock_sleep.call_args_list)
+
     @mock.patch('time.sleep')
     def test_iterate_timeout_timeout(self, mock_sleep):
         message = "timeout test"
@@ -730,3 +854,9 @@ class TestShade(base.TestCase):
         self.assertIsInstance(retval, list)
         self.assertEqual(1, len(retval))
         self.assertEqual([RANGE_DATA[0]], retval)
+
+    def test_range_search_no_match_first(self):
+        # An empty first result must not be mistaken for "no searches yet"
+        filters = {"key1": "<1", "key2": ">=5"}
+        retval = self.cloud.range_search(RANGE_DATA, filters)
+        self.assertEqual([], retval)
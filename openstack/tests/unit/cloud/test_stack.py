@@ -12,12 +12,16 @@
 
 
 import tempfile
+from unittest import mock
+
+import munch
 import testtools
 
 import openstack.cloud
 from openstack.tests import fakes
 from openstack.tests.unit import base
 
+from openstack.orchestration.util import event_utils
 from openstack.orchestration.v1 import stack
 
 
@@ -142,6 +146,27 @@ class TestStack(base.TestCase):
         self.assertTrue(self.cloud.delete_stack(self.stack_name))
         self.assert_calls()
 
+    def test_delete_stack_by_id(self):
+        stack_id = '2c5d8a41-9e7b-4f36-8d0c-1a3e5f7b9d21'
+        self.register_uris([
+            dict(method='DELETE',
+                 uri='{endpoint}/stacks/{id}'.format(
+                     endpoint=fakes.ORCHESTRATION_ENDPOINT, id=stack_id)),
+        ])
+        self.assertTrue(self.cloud.delete_stack(stack_id))
+        self.assert_calls()
+
+    def test_delete_stack_by_id_not_found(self):
+        stack_id = '2c5d8a41-9e7b-4f36-8d0c-1a3e5f7b9d21'
+        self.register_uris([
+            dict(method='DELETE',
+                 uri='{endpoint}/stacks/{id}'.format(
+                     endpoint=fakes.ORCHESTRATION_ENDPOINT, id=stack_id),
+                 status_code=404),
+        ])
+        self.assertFalse(self.cloud.delete_stack(stack_id))
+        self.assert_calls()
+
     def test_delete_stack_not_found(self):
         resolve = 'resolve_outputs=False'
         self.register_uris([
@@ -464,6 +489,30 @@ class TestStack(base.TestCase):
 
         self.assert_calls()
 
+    def test_poll_for_events_backs_off(self):
+        event = fakes.make_fake_stack_event(
+            self.stack_id, self.stack_name,
+            status='CREATE_COMPLETE', resource_name='name')
+        # Two empty polls, one with an unrelated event, two more empty
+        # polls and finally the stack completing.
+        other = dict(event, resource_name='other', id='other')
+        polls = [[], [], [other], [], [], [event]]
+        get_stack = mock.Mock(
+            return_value={'stack_status': 'CREATE_IN_PROGRESS'})
+        with mock.patch.object(
+                event_utils, 'get_events',
+                side_effect=lambda *a, **kw: [
+                    munch.Munch(e) for e in polls.pop(0)]), \
+                mock.patch.object(event_utils.time, 'sleep') as sleep, \
+                mock.patch.object(self.cloud, 'get_stack', get_stack):
+            status, _ = event_utils.poll_for_events(
+                self.cloud, self.stack_name, action='CREATE',
+                poll_period=5, max_poll_period=15)
+        self.assertEqual('CREATE_COMPLETE', status)
+        self.assertEqual(
+            [5, 10, 5, 5, 10],
+            [c[0][0] for c in sleep.call_args_list])
+
     def test_update_stack(self):
         test_template = tempfile.NamedTemporaryFile(delete=False)
         test_template.write(fakes.FAKE_TEMPLATE.encode('utf-8'))
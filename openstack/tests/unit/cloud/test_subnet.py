@@ -126,6 +126,24 @@ class TestSubnet(base.TestCase):
         self.assertDictEqual(mock_subnet_rep, subnet)
         self.assert_calls()
 
+    def test_create_subnets_remembers_network_id(self):
+        self.register_uris([
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'networks.json']),
+                 json={'networks': [self.mock_network_rep]}),
+        ] + [
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'network', 'public', append=['v2.0', 'subnets.json']),
+                 json={'subnet': self.mock_subnet_rep})
+            for _ in range(2)
+        ])
+        # The network is only looked up for the first subnet
+        for _ in range(2):
+            self.cloud.create_subnet(self.network_name, self.subnet_cidr)
+        self.assert_calls()
+
     def test_create_subnet_string_ip_version(self):
         '''Allow ip_version as a string'''
         self.register_uris([
@@ -330,6 +348,18 @@ class TestSubnet(base.TestCase):
         self.assertTrue(self.cloud.delete_subnet(self.subnet_name))
         self.assert_calls()
 
+    def test_delete_subnet_direct(self):
+        self.cloud.use_direct_get = True
+        self.register_uris([
+            dict(method='DELETE',
+                 uri=self.get_mock_url(
+                     'network', 'public',
+                     append=['v2.0', 'subnets', '%s.json' % self.subnet_id]),
+                 status_code=404)
+        ])
+        self.assertFalse(self.cloud.delete_subnet(self.subnet_id))
+        self.assert_calls()
+
     def test_delete_subnet_not_found(self):
         self.register_uris([
             dict(method='GET',
@@ -391,6 +421,13 @@ class TestSubnet(base.TestCase):
         self.assertDictEqual(expected_subnet, subnet)
         self.assert_calls()
 
+    def test_update_subnet_empty_values_dropped(self):
+        # Empty values are left out, so there is nothing to update
+        self.assertIsNone(self.cloud.update_subnet(
+            self.subnet_id, subnet_name='', dns_nameservers=[],
+            host_routes=[]))
+        self.assertEqual([], self.adapter.request_history)
+
     def test_update_subnet_gateway_ip(self):
         expected_subnet = copy.copy(self.mock_subnet_rep)
         gateway = '192.168.199.3'
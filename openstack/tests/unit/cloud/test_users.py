@@ -10,11 +10,13 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from unittest import mock
 import uuid
 
 import testtools
 
 import openstack.cloud
+from openstack.cloud import openstackcloud
 from openstack.tests.unit import base
 
 
@@ -89,6 +91,69 @@ class TestUsers(base.TestCase):
         self.assertEqual(user_data.user_id, user.id)
         self.assert_calls()
 
+    def test_create_users_default_project_resolved_once(self):
+        project_data = self._get_project_data()
+        domain_id = uuid.uuid4().hex
+        users = [self._get_user_data(domain_id=domain_id) for _ in range(2)]
+
+        uris = [
+            dict(method='GET',
+                 uri=self._get_keystone_mock_url(resource='projects'),
+                 status_code=200,
+                 json={'projects': [
+                     project_data.json_response['project']]}),
+        ]
+        for user_data in users:
+            request = user_data.json_request['user'].copy()
+            request['default_project_id'] = project_data.project_id
+            request['description'] = None
+            uris.append(
+                dict(method='POST',
+                     uri=self._get_keystone_mock_url(resource='users'),
+                     status_code=200, json=user_data.json_response,
+                     validate=dict(json={'user': request})))
+        self.register_uris(uris)
+
+        for user_data in users:
+            self.cloud.create_user(
+                name=user_data.name, email=user_data.email,
+                password=user_data.password, domain_id=domain_id,
+                default_project=project_data.project_name)
+
+        self.assert_calls()
+
+    def test_create_users_default_project_expires(self):
+        project_data = self._get_project_data()
+        domain_id = uuid.uuid4().hex
+        users = [self._get_user_data(domain_id=domain_id) for _ in range(2)]
+
+        uris = []
+        for user_data in users:
+            request = user_data.json_request['user'].copy()
+            request['default_project_id'] = project_data.project_id
+            request['description'] = None
+            uris.extend([
+                dict(method='GET',
+                     uri=self._get_keystone_mock_url(resource='projects'),
+                     status_code=200,
+                     json={'projects': [
+                         project_data.json_response['project']]}),
+                dict(method='POST',
+                     uri=self._get_keystone_mock_url(resource='users'),
+                     status_code=200, json=user_data.json_response,
+                     validate=dict(json={'user': request})),
+            ])
+        self.register_uris(uris)
+
+        with mock.patch.object(openstackcloud, '_PROJECT_PARAM_AGE', 0):
+            for user_data in users:
+                self.cloud.create_user(
+                    name=user_data.name, email=user_data.email,
+                    password=user_data.password, domain_id=domain_id,
+                    default_project=project_data.project_name)
+
+        self.assert_calls()
+
     def test_update_user_password_v2(self):
         self.use_keystone_v2()
 
@@ -182,6 +247,94 @@ class TestUsers(base.TestCase):
         self.cloud.add_user_to_group(user_data.user_id, group_data.group_id)
         self.assert_calls()
 
+    def test_add_users_to_groups(self):
+        user_one = self._get_user_data()
+        user_two = self._get_user_data()
+        group_data = self._get_group_data()
+        put_uris = [
+            self._get_keystone_mock_url(
+                resource='groups',
+                append=[group_data.group_id, 'users', user.user_id])
+            for user in (user_one, user_two)]
+
+        self.register_uris([
+            dict(method='GET',
+                 uri=self._get_keystone_mock_url(resource='users'),
+                 status_code=200,
+                 json={'users': [user_one.json_response['user'],
+                                 user_two.json_response['user']]}),
+            dict(method='GET',
+                 uri=self._get_keystone_mock_url(resource='groups'),
+                 status_code=200,
+                 json={'groups': [group_data.json_response['group']]}),
+        ] + [dict(method='PUT', uri=uri, status_code=200)
+             for uri in put_uris])
+        self.cloud.add_users_to_groups([
+            (user_one.name, group_data.group_id),
+            (user_two.user_id, group_data.group_name)])
+        # The memberships are added concurrently, so the PUTs can arrive
+        # in any order.
+        self.assertEqual(
+            sorted(put_uris),
+            sorted(h.url for h in self.adapter.request_history
+                   if h.method == 'PUT'))
+        self.assertEqual(len(self.calls), len(self.adapter.request_history))
+
+    def test_add_users_to_groups_missing_group(self):
+        user_data = self._get_user_data()
+        group_data = self._get_group_data()
+
+        self.register_uris([
+            dict(method='GET',
+                 uri=self._get_keystone_mock_url(resource='users'),
+                 status_code=200,
+                 json=self._get_user_list(user_data)),
+            dict(method='GET',
+                 uri=self._get_keystone_mock_url(resource='groups'),
+                 status_code=200,
+                 json={'groups': [group_data.json_response['group']]}),
+        ])
+        with testtools.ExpectedException(
+            openstack.cloud.OpenStackCloudException,
+            'Group missing not found'
+        ):
+            # Nothing is added when any of the memberships can't be resolved
+            self.cloud.add_users_to_groups([
+                (user_data.user_id, group_data.group_id),
+                (user_data.user_id, 'missing')])
+        self.assert_calls()
+
+    def test_add_users_to_groups_reports_all_failures(self):
+        user_one = self._get_user_data()
+        user_two = self._get_user_data()
+        group_data = self._get_group_data()
+
+        self.register_uris([
+            dict(method='GET',
+                 uri=self._get_keystone_mock_url(resource='users'),
+                 status_code=200,
+                 json={'users': [user_one.json_response['user'],
+                                 user_two.json_response['user']]}),
+            dict(method='GET',
+                 uri=self._get_keystone_mock_url(resource='groups'),
+                 status_code=200,
+                 json={'groups': [group_data.json_response['group']]}),
+        ] + [dict(method='PUT',
+                  uri=self._get_keystone_mock_url(
+                      resource='groups',
+                      append=[group_data.group_id, 'users', user.user_id]),
+                  status_code=403)
+             for user in (user_one, user_two)])
+        with testtools.ExpectedException(
+            openstack.cloud.OpenStackCloudException,
+            'Error adding users to groups: .*{one}.*; .*{two}'.format(
+                one=user_one.user_id, two=user_two.user_id)
+        ):
+            self.cloud.add_users_to_groups([
+                (user_one.user_id, group_data.group_id),
+                (user_two.user_id, group_data.group_id)])
+        self.assertEqual(len(self.calls), len(self.adapter.request_history))
+
     def test_is_user_in_group(self):
         user_data = self._get_user_data()
         group_data = self._get_group_data()
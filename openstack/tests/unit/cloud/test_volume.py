@@ -11,6 +11,8 @@
 # under the License.
 
 
+from unittest import mock
+
 import testtools
 
 import openstack.cloud
@@ -91,12 +93,12 @@ class TestVolume(base.TestCase):
             self.get_cinder_discovery_mock_dict(),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'volumev2', 'public', append=['volumes', 'detail']),
-                 json={'volumes': [volume]}),
+                     'volumev2', 'public', append=['volumes', volume['id']]),
+                 json={'volume': volume}),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'volumev2', 'public', append=['volumes', 'detail']),
-                 json={'volumes': [attached_volume]})])
+                     'volumev2', 'public', append=['volumes', volume['id']]),
+                 json={'volume': attached_volume})])
         # defaults to wait=True
         ret = self.cloud.attach_volume(server, volume)
         self.assertEqual(rattach, ret)
@@ -124,8 +126,8 @@ class TestVolume(base.TestCase):
             self.get_cinder_discovery_mock_dict(),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'volumev2', 'public', append=['volumes', 'detail']),
-                 json={'volumes': [errored_volume]})])
+                     'volumev2', 'public', append=['volumes', volume['id']]),
+                 json={'volume': errored_volume})])
 
         with testtools.ExpectedException(
             openstack.cloud.OpenStackCloudException,
@@ -134,6 +136,63 @@ class TestVolume(base.TestCase):
             self.cloud.attach_volume(server, volume)
         self.assert_calls()
 
+    def _register_attach_volume_uris(self, server, volume, polls):
+        rattach = {'server_id': server['id'], 'device': 'device001',
+                   'volumeId': volume['id'], 'id': 'attachmentId'}
+        self.register_uris([
+            dict(method='POST',
+                 uri=self.get_mock_url(
+                     'compute', 'public',
+                     append=['servers', server['id'],
+                             'os-volume_attachments']),
+                 json={'volumeAttachment': rattach}),
+            self.get_cinder_discovery_mock_dict(),
+        ] + [
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'volumev2', 'public', append=['volumes', volume['id']]),
+                 **poll)
+            for poll in polls])
+
+    def test_attach_volume_wait_transient_error(self):
+        server = dict(id='server001')
+        vol = {'id': 'volume001', 'status': 'available',
+               'name': '', 'attachments': []}
+        volume = meta.obj_to_munch(fakes.FakeVolume(**vol))
+        vol['attachments'] = [{'server_id': server['id'],
+                               'device': 'device001'}]
+        attached_volume = meta.obj_to_munch(fakes.FakeVolume(**vol))
+        self._register_attach_volume_uris(server, volume, [
+            dict(status_code=503),
+            dict(json={'volume': attached_volume})])
+
+        self.cloud.attach_volume(server, volume)
+        self.assert_calls()
+
+    def test_attach_volume_wait_gives_up(self):
+        server = dict(id='server001')
+        volume = meta.obj_to_munch(fakes.FakeVolume(
+            id='volume001', status='available', name='', attachments=[]))
+        self._register_attach_volume_uris(
+            server, volume, [dict(status_code=503)] * 5)
+
+        self.assertRaises(
+            openstack.cloud.OpenStackCloudHTTPError,
+            self.cloud.attach_volume, server, volume)
+        self.assert_calls()
+
+    def test_attach_volume_wait_not_found(self):
+        server = dict(id='server001')
+        volume = meta.obj_to_munch(fakes.FakeVolume(
+            id='volume001', status='available', name='', attachments=[]))
+        self._register_attach_volume_uris(
+            server, volume, [dict(status_code=404)])
+
+        self.assertRaises(
+            openstack.cloud.OpenStackCloudURINotFound,
+            self.cloud.attach_volume, server, volume)
+        self.assert_calls()
+
     def test_attach_volume_not_available(self):
         server = dict(id='server001')
         volume = dict(id='volume001', status='error', attachments=[])
@@ -216,8 +275,8 @@ class TestVolume(base.TestCase):
             self.get_cinder_discovery_mock_dict(),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'volumev2', 'public', append=['volumes', 'detail']),
-                 json={'volumes': [avail_volume]})])
+                     'volumev2', 'public', append=['volumes', volume.id]),
+                 json={'volume': avail_volume})])
         self.cloud.detach_volume(server, volume)
         self.assert_calls()
 
@@ -239,8 +298,8 @@ class TestVolume(base.TestCase):
             self.get_cinder_discovery_mock_dict(),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'volumev2', 'public', append=['volumes', 'detail']),
-                 json={'volumes': [errored_volume]})])
+                     'volumev2', 'public', append=['volumes', volume.id]),
+                 json={'volume': errored_volume})])
         with testtools.ExpectedException(
             openstack.cloud.OpenStackCloudException,
             "Error in detaching volume %s" % errored_volume['id']
@@ -248,6 +307,44 @@ class TestVolume(base.TestCase):
             self.cloud.detach_volume(server, volume)
         self.assert_calls()
 
+    def test_get_volumes(self):
+        server = dict(id='server001')
+        attached = meta.obj_to_munch(fakes.FakeVolume(
+            id='volume001', status='in-use', name='',
+            attachments=[
+                {'server_id': 'server001', 'device': 'device001'},
+                {'server_id': 'server001', 'device': 'device002'}]))
+        other = meta.obj_to_munch(fakes.FakeVolume(
+            id='volume002', status='in-use', name='',
+            attachments=[{'server_id': 'server002', 'device': 'device001'}]))
+        self.register_uris([
+            self.get_cinder_discovery_mock_dict(),
+            dict(method='GET',
+                 uri=self.get_mock_url(
+                     'volumev2', 'public', append=['volumes', 'detail']),
+                 json={'volumes': [attached, other]})])
+
+        self.assertEqual(
+            ['volume001'],
+            [v['id'] for v in self.cloud.get_volumes(server)])
+        self.assert_calls()
+
+    def test_get_volume_kwargs(self):
+        self.register_uris([self.get_cinder_discovery_mock_dict()])
+        self.assertEqual(
+            {'name': 'vol', 'description': 'desc', 'size': 1},
+            self.cloud._get_volume_kwargs(
+                {'display_name': 'vol', 'description': 'desc', 'size': 1}))
+        with mock.patch.object(
+                self.cloud.block_storage, '_version_matches',
+                return_value=False):
+            self.assertEqual(
+                {'display_name': 'vol', 'display_description': 'desc'},
+                self.cloud._get_volume_kwargs(
+                    {'name': 'vol', 'display_description': 'desc'}))
+        self.assertEqual({}, self.cloud._get_volume_kwargs({'name': None}))
+        self.assert_calls()
+
     def test_delete_volume_deletes(self):
         vol = {'id': 'volume001', 'status': 'attached',
                'name': '', 'attachments': []}
@@ -263,8 +360,8 @@ class TestVolume(base.TestCase):
                      'volumev2', 'public', append=['volumes', volume.id])),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'volumev2', 'public', append=['volumes', 'detail']),
-                 json={'volumes': []})])
+                     'volumev2', 'public', append=['volumes', volume.id]),
+                 status_code=404)])
         self.assertTrue(self.cloud.delete_volume(volume['id']))
         self.assert_calls()
 
@@ -303,8 +400,8 @@ class TestVolume(base.TestCase):
                      json={'os-force_delete': None})),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'volumev2', 'public', append=['volumes', 'detail']),
-                 json={'volumes': []})])
+                     'volumev2', 'public', append=['volumes', volume.id]),
+                 status_code=404)])
         self.assertTrue(self.cloud.delete_volume(volume['id'], force=True))
         self.assert_calls()
 
@@ -513,9 +610,8 @@ class TestVolume(base.TestCase):
                      }})),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'volumev2', 'public',
-                     append=['volumes', 'detail']),
-                 json={'volumes': [vol1]}),
+                     'volumev2', 'public', append=['volumes', '01']),
+                 json={'volume': vol1}),
         ])
 
         self.cloud.create_volume(50, name='vol1')
@@ -536,9 +632,8 @@ class TestVolume(base.TestCase):
                      }})),
             dict(method='GET',
                  uri=self.get_mock_url(
-                     'volumev2', 'public',
-                     append=['volumes', 'detail']),
-                 json={'volumes': [vol1]}),
+                     'volumev2', 'public', append=['volumes', '01']),
+                 json={'volume': vol1}),
             dict(method='POST',
                  uri=self.get_mock_url(
                      'volumev2', 'public',
@@ -287,6 +287,25 @@ class TestCloudRegion(base.TestCase):
             fake_session.additional_user_agent,
             [('openstacksdk', openstack_version.__version__)])
 
+    def test_get_session_connection_pool_size(self):
+        config_dict = defaults.get_defaults()
+        config_dict.update(fake_services_dict)
+        config_dict['connection_pool_size'] = 32
+        cc = cloud_region.CloudRegion(
+            "test1", "region-al", config_dict, auth_plugin=mock.Mock())
+        adapter = cc.get_session().session.get_adapter('https://example.com')
+        self.assertIsInstance(adapter, ksa_session.TCPKeepAliveAdapter)
+        self.assertEqual(32, adapter._pool_maxsize)
+
+    def test_get_session_pool_size_from_pool_executor(self):
+        config_dict = defaults.get_defaults()
+        config_dict.update(fake_services_dict)
+        config_dict['pool_executor_max_workers'] = 20
+        cc = cloud_region.CloudRegion(
+            "test1", "region-al", config_dict, auth_plugin=mock.Mock())
+        adapter = cc.get_session().session.get_adapter('https://example.com')
+        self.assertEqual(20, adapter._pool_maxsize)
+
     @mock.patch.object(ksa_session, 'Session')
     def test_get_session_with_app_name(self, mock_session):
         config_dict = defaults.get_defaults()
@@ -476,6 +476,50 @@ class TestImageProxy(test_proxy_base.TestProxyBase):
 
             self.assertEqual('success', result.status)
 
+    @mock.patch('time.sleep')
+    def test_wait_for_task_max_interval(self, mock_sleep):
+        res = task.Task(id='id', status='waiting')
+
+        mock_fetch = mock.Mock()
+        mock_fetch.side_effect = [
+            task.Task(id='id', status='waiting'),
+            task.Task(id='id', status='waiting'),
+            task.Task(id='id', status='waiting'),
+            task.Task(id='id', status='success'),
+        ]
+
+        with mock.patch.object(task.Task,
+                               'fetch', mock_fetch):
+
+            result = self.proxy.wait_for_task(
+                res, interval=1, wait=10, max_interval=3)
+
+        self.assertEqual('success', result.status)
+        self.assertEqual(
+            [mock.call(1.0), mock.call(2.0), mock.call(3.0)],
+            mock_sleep.call_args_list)
+
+    @mock.patch('random.uniform', return_value=1.1)
+    @mock.patch('time.sleep')
+    def test_wait_for_task_jitter(self, mock_sleep, mock_uniform):
+        res = task.Task(id='id', status='waiting')
+
+        mock_fetch = mock.Mock()
+        mock_fetch.side_effect = [
+            task.Task(id='id', status='waiting'),
+            task.Task(id='id', status='success'),
+        ]
+
+        with mock.patch.object(task.Task,
+                               'fetch', mock_fetch):
+
+            result = self.proxy.wait_for_task(
+                res, interval=1, wait=10, max_interval=3, jitter=0.2)
+
+        self.assertEqual('success', result.status)
+        mock_uniform.assert_called_with(0.8, 1.2)
+        self.assertEqual([mock.call(1.1)], mock_sleep.call_args_list)
+
     def test_tasks_schema_get(self):
         self._verify2("openstack.proxy.Proxy._get",
                       self.proxy.get_tasks_schema,
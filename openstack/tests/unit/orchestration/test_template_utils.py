@@ -0,0 +1,113 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import concurrent.futures
+import os
+from unittest import mock
+
+import fixtures
+
+from openstack import exceptions
+from openstack.orchestration.util import template_utils
+from openstack.orchestration.util import utils
+from openstack.tests.unit import base
+
+MAIN = '''
+heat_template_version: 2015-04-30
+resources:
+  child:
+    type: nested/child.yaml
+  config:
+    type: OS::Heat::SoftwareConfig
+    properties:
+      config: {get_file: script.sh}
+'''
+
+CHILD = '''
+heat_template_version: 2015-04-30
+resources:
+  config:
+    type: OS::Heat::SoftwareConfig
+    properties:
+      config: {get_file: ../data.txt}
+      inputs: [{get_file: extra.txt}]
+'''
+
+BROKEN = '''
+heat_template_version: 2015-04-30
+resources:
+  config:
+    type: OS::Heat::SoftwareConfig
+    properties:
+      config: {get_file: script.sh}
+      inputs: [{get_file: missing.txt}]
+'''
+
+
+class TestGetTemplateContents(base.TestCase):
+
+    def setUp(self):
+        super(TestGetTemplateContents, self).setUp()
+        self.path = self.useFixture(fixtures.TempDir()).path
+        os.mkdir(os.path.join(self.path, 'nested'))
+        for name, content in (
+                ('main.yaml', MAIN),
+                ('broken.yaml', BROKEN),
+                ('script.sh', 'echo hello'),
+                ('data.txt', 'some data'),
+                ('nested/child.yaml', CHILD),
+                ('nested/extra.txt', 'extra data')):
+            with open(os.path.join(self.path, name), 'w') as f:
+                f.write(content)
+
+    def _url(self, name):
+        return utils.normalise_file_path_to_url(
+            os.path.join(self.path, name))
+
+    def _get_template_contents(self, name, prefetch):
+        if prefetch:
+            with concurrent.futures.ThreadPoolExecutor(2) as executor:
+                return template_utils.get_template_contents(
+                    template_file=os.path.join(self.path, name),
+                    executor=executor)
+        with mock.patch.object(
+                template_utils, '_prefetch_file_contents') as mock_prefetch:
+            res = template_utils.get_template_contents(
+                template_file=os.path.join(self.path, name))
+        mock_prefetch.assert_not_called()
+        return res
+
+    def test_prefetch_matches_sequential(self):
+        files, template = self._get_template_contents('main.yaml', True)
+        seq_files, seq_template = self._get_template_contents(
+            'main.yaml', False)
+
+        self.assertEqual(seq_files, files)
+        self.assertEqual(seq_template, template)
+        self.assertEqual(
+            sorted([self._url('script.sh'), self._url('data.txt'),
+                    self._url('nested/child.yaml'),
+                    self._url('nested/extra.txt')]),
+            sorted(files))
+        self.assertEqual('some data', files[self._url('data.txt')])
+        self.assertEqual(
+            self._url('nested/child.yaml'),
+            template['resources']['child']['type'])
+
+    def test_prefetch_failure(self):
+        for prefetch in (True, False):
+            e = self.assertRaises(
+                exceptions.SDKException,
+                self._get_template_contents, 'broken.yaml', prefetch)
+            self.assertEqual(
+                'Could not fetch contents for %s' % self._url('missing.txt'),
+                str(e))
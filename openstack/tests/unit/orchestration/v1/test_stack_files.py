@@ -10,10 +10,13 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import concurrent.futures
+import io
+import json
 from unittest import mock
 
+from openstack import exceptions
 from openstack.orchestration.v1 import stack_files as sf
-from openstack import resource
 from openstack.tests.unit import base
 
 FAKE = {
@@ -37,23 +40,136 @@ class TestStackFiles(base.TestCase):
         self.assertEqual(FAKE['stack_id'], sot.stack_id)
         self.assertEqual(FAKE['stack_name'], sot.stack_name)
 
-    @mock.patch.object(resource.Resource, '_prepare_request')
-    def test_get(self, mock_prepare_request):
+    def _response(self, files=None, status_code=200, headers=None,
+                  streamed=False):
+        body = b'' if files is None else json.dumps(files).encode()
         resp = mock.Mock()
-        resp.json = mock.Mock(return_value={'file': 'file-content'})
+        resp.status_code = status_code
+        if headers is None:
+            headers = {'Content-Type': 'application/json'}
+        resp.headers = headers
+        resp.content = body
+        resp.json = mock.Mock(return_value=files)
+        resp.raw = io.BytesIO(body)
+        # Set explicitly, as a Mock attribute would always look consumed.
+        resp._content_consumed = not streamed
+        return resp
 
+    def _session(self, resp):
         sess = mock.Mock()
         sess.get = mock.Mock(return_value=resp)
+        return sess
 
-        sot = sf.StackFiles(**FAKE)
+    def test_get(self):
+        resp = self._response({'file': 'file-content'})
+        sess = self._session(resp)
 
-        req = mock.MagicMock()
-        req.url = ('/stacks/%(stack_name)s/%(stack_id)s/files' %
-                   {'stack_name': FAKE['stack_name'],
-                    'stack_id': FAKE['stack_id']})
-        mock_prepare_request.return_value = req
+        sot = sf.StackFiles(**FAKE)
 
         files = sot.fetch(sess)
 
-        sess.get.assert_called_once_with(req.url)
+        sess.get.assert_called_once_with(
+            '/stacks/NAME/ID/files', stream=True,
+            headers=sf._HEADERS)
         self.assertEqual({'file': 'file-content'}, files)
+        resp.close.assert_called_once_with()
+
+    def test_get_streamed(self):
+        # ijson comes from test-requirements.txt, so this runs in the gate
+        # rather than being skipped.
+        resp = self._response(
+            {'file': 'file-content', 'other': 'x'}, streamed=True)
+        sess = self._session(resp)
+
+        sot = sf.StackFiles(**FAKE)
+
+        files = sot.fetch(sess)
+
+        resp.json.assert_not_called()
+        resp.close.assert_called_once_with()
+        self.assertEqual({'file': 'file-content', 'other': 'x'}, files)
+
+    @mock.patch.object(sf, 'ijson', None)
+    def test_get_streamed_no_ijson(self):
+        resp = self._response({'file': 'file-content'}, streamed=True)
+        sess = self._session(resp)
+
+        sot = sf.StackFiles(**FAKE)
+
+        self.assertEqual({'file': 'file-content'}, sot.fetch(sess))
+        resp.close.assert_called_once_with()
+
+    @mock.patch.object(sf.StackFiles, 'fetch')
+    def test_fetch_many(self, mock_fetch):
+        mock_fetch.side_effect = [{'a': '1'}, {'b': '2'}]
+        sess = mock.Mock()
+        sess._connection._pool_executor = (
+            concurrent.futures.ThreadPoolExecutor(1))
+        self.addCleanup(sess._connection._pool_executor.shutdown)
+
+        res = sf.StackFiles.fetch_many(sess, [('n1', 'i1'), ('n2', 'i2')])
+
+        self.assertEqual([{'a': '1'}, {'b': '2'}], res)
+        mock_fetch.assert_has_calls([mock.call(sess), mock.call(sess)])
+
+    @mock.patch.object(sf.StackFiles, 'fetch')
+    def test_fetch_many_executor(self, mock_fetch):
+        mock_fetch.return_value = {'a': '1'}
+        sess = mock.Mock()
+        executor = mock.Mock()
+        executor.map.side_effect = map
+
+        res = sf.StackFiles.fetch_many(
+            sess, [('n1', 'i1')], executor=executor)
+
+        self.assertEqual([{'a': '1'}], res)
+        executor.map.assert_called_once_with(mock.ANY, mock.ANY)
+        sess._connection._pool_executor.map.assert_not_called()
+
+    def test_fetch_file(self):
+        resp = self._response(
+            {'file': 'file-content', 'other': 'x'}, streamed=True)
+        sess = self._session(resp)
+
+        sot = sf.StackFiles(**FAKE)
+
+        self.assertEqual('file-content', sot.fetch_file(sess, 'file'))
+        resp.close.assert_called_once_with()
+
+    def test_fetch_file_missing(self):
+        resp = self._response({'file': 'file-content'}, streamed=True)
+        sess = self._session(resp)
+
+        sot = sf.StackFiles(**FAKE)
+
+        self.assertIsNone(sot.fetch_file(sess, 'missing'))
+
+    def test_files_url(self):
+        sot = sf.StackFiles(**FAKE)
+
+        self.assertEqual('/stacks/NAME/ID/files', sot._files_url())
+        self.assertEqual('/stacks/NAME/ID/files', sot._files_url())
+
+        sot.stack_id = 'OTHER'
+        self.assertEqual('/stacks/NAME/OTHER/files', sot._files_url())
+        self.assertEqual('/other/NAME/OTHER',
+                         sot._files_url('/other/%(stack_name)s/%(stack_id)s'))
+
+    def test_get_error(self):
+        resp = self._response(status_code=404, headers={})
+        sess = self._session(resp)
+
+        sot = sf.StackFiles(**FAKE)
+
+        self.assertRaises(exceptions.NotFoundException, sot.fetch, sess)
+        resp.json.assert_not_called()
+        resp.close.assert_called_once_with()
+
+    def test_get_empty(self):
+        resp = self._response(headers={'Content-Length': '0'})
+        sess = self._session(resp)
+
+        sot = sf.StackFiles(**FAKE)
+
+        self.assertEqual({}, sot.fetch(sess))
+        resp.json.assert_not_called()
@@ -263,6 +263,19 @@ class TestConnection(_TestConnectionBase):
         sot = connection.from_config("insecure-cloud-alternative-format")
         self.assertFalse(sot.session.verify)
 
+    def test_pool_executor_max_workers(self):
+        conn = connection.Connection(
+            cloud='sample-cloud', pool_executor_max_workers=2)
+        self.assertEqual(2, conn._pool_executor._max_workers)
+
+    def test_close_resets_pool_executor(self):
+        conn = connection.Connection(cloud='sample-cloud')
+        executor = conn._pool_executor
+        conn.close()
+        self.assertIsNot(executor, conn._pool_executor)
+        self.assertEqual(1, conn._pool_executor.submit(lambda: 1).result())
+        conn.close()
+
 
 class TestOsloConfig(_TestConnectionBase):
     def test_from_conf(self):
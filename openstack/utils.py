@@ -11,6 +11,7 @@
 # under the License.
 
 import queue
+import random
 import string
 import threading
 import time
@@ -32,13 +33,19 @@ def urljoin(*args):
     return '/'.join(str(a or '').strip('/') for a in args)
 
 
-def iterate_timeout(timeout, message, wait=2):
+def iterate_timeout(timeout, message, wait=2, max_wait=None, jitter=None):
     """Iterate and raise an exception on timeout.
 
     This is a generator that will continually yield and sleep for
     wait seconds, and if the timeout is reached, will raise an exception
     with <message>.
 
+    If max_wait is given, the sleep doubles after every iteration until it
+    reaches max_wait seconds. A wait already above max_wait is left alone.
+
+    If jitter is given, each sleep is scaled by a random factor within
+    that fraction either way, so that many callers polling at once do not
+    all hit the API together.
     """
     log = _log.setup_logging('openstack.iterate_timeout')
 
@@ -63,8 +70,13 @@ def iterate_timeout(timeout, message, wait=2):
     while (timeout is None) or (time.time() < start + timeout):
         count += 1
         yield count
-        log.debug('Waiting %s seconds', wait)
-        time.sleep(wait)
+        delay = wait
+        if jitter:
+            delay *= random.uniform(1 - jitter, 1 + jitter)
+        log.debug('Waiting %s seconds', delay)
+        time.sleep(delay)
+        if max_wait is not None and wait < max_wait:
+            wait = min(wait * 2, max_wait)
     raise exceptions.ResourceTimeout(message)
 
 